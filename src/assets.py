@@ -0,0 +1,140 @@
+import base64
+import os
+import re
+from typing import Optional
+
+from hashing import FileHasher, hash_bytes
+from htmlnode import HTMLNode
+from images import resolve_static_path
+
+DEFAULT_CSS_INLINE_THRESHOLD = 14 * 1024
+DEFAULT_IMAGE_INLINE_THRESHOLD = 4 * 1024
+
+STYLESHEET_LINK_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+HREF_PATTERN = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+STYLESHEET_REL_PATTERN = re.compile(
+    r"""\brel\s*=\s*["']stylesheet["']""", re.IGNORECASE
+)
+RELATIVE_CSS_URL_PATTERN = re.compile(
+    r"""url\(\s*(?!["']?(?:[a-z][a-z0-9+.-]*:|/|#))""", re.IGNORECASE
+)
+
+
+class AssetInliner:
+    """Inline small stylesheets and images, encoding each asset once."""
+
+    def __init__(
+        self,
+        static_dir: str,
+        css_threshold: int = DEFAULT_CSS_INLINE_THRESHOLD,
+        image_threshold: int = DEFAULT_IMAGE_INLINE_THRESHOLD,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        """Init an inliner for assets under static_dir up to the thresholds."""
+        self.static_dir = static_dir
+        self.css_threshold = css_threshold
+        self.image_threshold = image_threshold
+        self.hasher = hasher if hasher is not None else FileHasher()
+        self.encoded: dict[str, Optional[str]] = {}
+        self.generated: dict[str, bytes] = {}
+        self.inlined_assets: set[str] = set()
+        self.requests_saved = 0
+        self.bytes_inlined = 0
+
+    def _encode(self, src: str, threshold: int, as_data_uri: bool) -> Optional[str]:
+        """Return the inline form of a local asset, or None if not inlinable."""
+        data = self.generated.get(src)
+        if data is not None:
+            path, digest = src, hash_bytes(data)
+            if len(data) > threshold:
+                return None
+        else:
+            path = resolve_static_path(src, self.static_dir)
+            if path is None or not os.path.isfile(path):
+                return None
+            if os.path.getsize(path) > threshold:
+                return None
+            digest = self.hasher.hash_file(path)
+            if digest is None:
+                return None
+        key = f"{'uri' if as_data_uri else 'css'}:{digest}"
+        if key not in self.encoded:
+            if data is None:
+                with open(path, "rb") as file:
+                    data = file.read()
+            self.encoded[key] = (
+                data_uri(path, data) if as_data_uri else inlinable_css(data)
+            )
+        encoded = self.encoded[key]
+        if encoded is not None:
+            self.inlined_assets.add(path)
+            self.requests_saved += 1
+            self.bytes_inlined += len(encoded)
+        return encoded
+
+    def inline_stylesheets(self, template: str) -> str:
+        """Replace small local stylesheet links with inline style elements."""
+
+        def replace(match: re.Match) -> str:
+            tag = match.group(0)
+            href = HREF_PATTERN.search(tag)
+            if not href or not STYLESHEET_REL_PATTERN.search(tag):
+                return tag
+            css = self._encode(href.group(1), self.css_threshold, False)
+            return tag if css is None else f"<style>{css}</style>"
+
+        if self.css_threshold <= 0:
+            return template
+        return STYLESHEET_LINK_PATTERN.sub(replace, template)
+
+    def inline_images(self, node: HTMLNode) -> None:
+        """Replace the src of small local images with data URIs."""
+        if self.image_threshold <= 0:
+            return
+        for child in node.iter_nodes():
+            if child.tag != "img":
+                continue
+            uri = self._encode(child.props.get("src", ""), self.image_threshold, True)
+            if uri is not None:
+                child.props["src"] = uri
+
+    def add_generated(self, url: str, data: bytes) -> None:
+        """Make an asset generated by the build, such as a bundle, inlinable.
+
+        The asset is kept in memory, as it may not be written to disk.
+        """
+        self.generated[url] = data
+
+    def merge(self, other: "AssetInliner") -> None:
+        """Add the assets inlined by another inliner, such as a worker's."""
+        self.encoded.update(other.encoded)
+        self.inlined_assets |= other.inlined_assets
+        self.requests_saved += other.requests_saved
+        self.bytes_inlined += other.bytes_inlined
+
+    def report(self) -> str:
+        """Summarize the requests saved by inlining."""
+        return (
+            f"Inlined {len(self.inlined_assets)} assets: "
+            f"{self.requests_saved} requests saved, "
+            f"{self.bytes_inlined} bytes inlined"
+        )
+
+
+def data_uri(path: str, data: bytes) -> str:
+    """Encode file data as a base64 data URI."""
+    import mimetypes
+
+    mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def inlinable_css(data: bytes) -> Optional[str]:
+    """Return stylesheet text safe to move into the page, or None."""
+    try:
+        css = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "</style" in css.lower() or RELATIVE_CSS_URL_PATTERN.search(css):
+        return None
+    return css
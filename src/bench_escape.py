@@ -0,0 +1,51 @@
+import html
+import os
+import sys
+import timeit
+
+from converter import markdown_text_to_html_node
+from copytree import list_files
+from htmlnode import escape_attribute, escape_text
+from page import read_file
+
+
+def corpus_strings(content_dir: str) -> tuple[list[str], list[str]]:
+    """Collect the text and attribute values rendered from a content dir."""
+    texts, attributes = [], []
+    for path in list_files(content_dir):
+        if not path.endswith(".md"):
+            continue
+        for node in markdown_text_to_html_node(read_file(path)).iter_nodes():
+            if node.value:
+                texts.append(node.value)
+            attributes.extend(node.props.values())
+    return texts, attributes
+
+
+def bench(label: str, values: list[str], escape, number: int) -> float:
+    """Time escaping every value number times and print the result."""
+    seconds = timeit.timeit(lambda: [escape(v) for v in values], number=number)
+    print(f"{label:<32}{seconds * 1e9 / (number * len(values)):>10.1f} ns/value")
+    return seconds
+
+
+def main() -> None:
+    """Compare the node layer escaping against html.escape on the corpus."""
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else "content"
+    number = int(os.environ.get("BENCH_NUMBER", "2000"))
+    texts, attributes = corpus_strings(content_dir)
+    dirty = [value + " <&>" for value in texts]
+    print(f"{len(texts)} text values, {len(attributes)} attribute values")
+    for label, values in (("text", texts), ("text with specials", dirty)):
+        baseline = bench(
+            f"html.escape {label}", values, lambda v: html.escape(v, False), number
+        )
+        ours = bench(f"escape_text {label}", values, escape_text, number)
+        print(f"{'speedup':<32}{baseline / ours:>10.2f}x")
+    baseline = bench("html.escape attributes", attributes, html.escape, number)
+    ours = bench("escape_attribute attributes", attributes, escape_attribute, number)
+    print(f"{'speedup':<32}{baseline / ours:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import timeit
+
+from converter import (
+    inline_text_to_text_nodes_unchecked,
+    markdown_text_to_blocks,
+    validate_block_text,
+)
+from copytree import list_files
+from inline import (
+    DELIMITER_TO_TEXT_TYPE_MAP,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+)
+from page import read_file
+from textnode import TextNode, TextType
+
+
+def corpus_blocks(content_dir: str) -> list[str]:
+    """Collect the blocks of text of a content dir, leaving out code."""
+    blocks = []
+    for path in list_files(content_dir):
+        if path.endswith(".md"):
+            blocks.extend(
+                block
+                for block in markdown_text_to_blocks(read_file(path))
+                if not block.startswith("```")
+            )
+    return blocks
+
+
+def validated_text_nodes(text: str) -> list[TextNode]:
+    """Parse inline text through the public splits, validating every stage."""
+    validate_block_text(text)
+    nodes = [TextNode(text, TextType.NORMAL)]
+    for split in [split_nodes_image, split_nodes_link]:
+        nodes = split(nodes)
+    for delimiter, text_type in DELIMITER_TO_TEXT_TYPE_MAP.items():
+        nodes = split_nodes_delimiter(nodes, text_type, delimiter)
+    return nodes
+
+
+def bench(label: str, blocks: list[str], convert, number: int) -> float:
+    """Time converting every block number times and print the result."""
+    seconds = timeit.timeit(lambda: [convert(b) for b in blocks], number=number)
+    print(f"{label:<32}{seconds * 1e9 / (number * len(blocks)):>10.1f} ns/block")
+    return seconds
+
+
+def main() -> None:
+    """Compare inline parsing validated at every stage with the fast path."""
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else "content"
+    number = int(os.environ.get("BENCH_NUMBER", "2000"))
+    blocks = corpus_blocks(content_dir)
+    print(f"{len(blocks)} blocks")
+    checked = bench("validated inline parsing", blocks, validated_text_nodes, number)
+    unchecked = bench(
+        "trusted inline parsing", blocks, inline_text_to_text_nodes_unchecked, number
+    )
+    saved = (checked - unchecked) * 1e9 / (number * len(blocks))
+    print(f"{'saved':<32}{saved:>10.1f} ns/block")
+    print(f"{'speedup':<32}{checked / unchecked:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from build import build_site
+from logger import get_logger
+from memory import peak_rss
+
+TEMPLATE = (
+    "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+)
+SECTION_SIZE = 500
+
+
+def write_corpus(root: str, pages: int, paragraphs: int = 1) -> tuple[str, str, str]:
+    """Write a template, static dir and pages of linked sections under root.
+
+    Each page repeats its text paragraphs times. Return the template path,
+    content dir and static dir.
+    """
+    template_path = os.path.join(root, "template.html")
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+    os.makedirs(static_dir, exist_ok=True)
+    with open(template_path, "w", encoding="utf-8") as file:
+        file.write(TEMPLATE)
+    for i in range(pages):
+        section = os.path.join(content_dir, f"section-{i // SECTION_SIZE}")
+        if i % SECTION_SIZE == 0:
+            os.makedirs(section, exist_ok=True)
+        previous = max(i - 1, 0)
+        url = f"/section-{previous // SECTION_SIZE}/page-{previous}.html"
+        with open(os.path.join(section, f"page-{i}.md"), "w", encoding="utf-8") as file:
+            blocks = (
+                f"Some **bold** and *italic* text, `code` and a [link]({url}).\n\n"
+                "- one\n- two\n  - nested\n\n"
+            )
+            file.write(f"# Page {i}\n\n" + blocks * paragraphs)
+    return template_path, content_dir, static_dir
+
+
+def main() -> None:
+    """Build a synthetic site and check its peak RSS against a budget.
+
+    The build uses low_memory unless BENCH_LOW_MEMORY is 0, to compare.
+    """
+    pages = int(os.environ.get("BENCH_PAGES", "100000"))
+    budget_mb = int(os.environ.get("BENCH_RSS_MB", "256"))
+    get_logger().setLevel("WARNING")
+    with tempfile.TemporaryDirectory() as root:
+        template_path, content_dir, static_dir = write_corpus(root, pages)
+        gc.collect()
+        start = time.perf_counter()
+        build_site(
+            template_path,
+            content_dir,
+            os.path.join(root, "public"),
+            static_dir,
+            cache_dir=None,
+            low_memory=os.environ.get("BENCH_LOW_MEMORY", "1") == "1",
+        )
+        seconds = time.perf_counter() - start
+    peak = peak_rss()
+    print(f"{pages} pages in {seconds:.1f} s")
+    if peak is None:
+        print("peak RSS unknown on this platform")
+        return
+    print(f"peak RSS {peak / 2**20:.1f} MB, budget {budget_mb} MB")
+    if peak > budget_mb * 2**20:
+        sys.exit(f"Peak RSS over budget: {peak / 2**20:.1f} MB > {budget_mb} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import threading
+import time
+
+from converter import markdown_text_to_html_node
+from copytree import list_files
+from page import read_file
+from renderer import Renderer
+
+
+def small_documents(content_dir: str, limit: int = 2000) -> list[str]:
+    """Cut the content dir into valid preview-sized documents of a few blocks."""
+    documents = []
+    for path in list_files(content_dir):
+        if not path.endswith(".md"):
+            continue
+        blocks = [b for b in read_file(path).split("\n\n") if b.strip()]
+        for i in range(0, len(blocks), 4):
+            document = "\n\n".join(blocks[i : i + 4])
+            try:
+                markdown_text_to_html_node(document)
+            except ValueError:
+                continue
+            documents.append(document)
+    return documents[:limit]
+
+
+def percentiles(samples: list[int]) -> tuple[float, float]:
+    """Return the p50 and p99 of nanosecond samples, in microseconds."""
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)]
+    return p50 / 1000, p99 / 1000
+
+
+def measure(render, documents: list[str], rounds: int) -> list[int]:
+    """Time each call of render over the documents, rounds times."""
+    samples = []
+    for _ in range(rounds):
+        for document in documents:
+            start = time.perf_counter_ns()
+            render(document)
+            samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def report(label: str, samples: list[int]) -> None:
+    """Print the latency percentiles of a benchmark."""
+    p50, p99 = percentiles(samples)
+    print(f"{label:<36}p50 {p50:>8.1f} us   p99 {p99:>8.1f} us")
+
+
+def main() -> None:
+    """Measure preview rendering latency of small documents."""
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else "content"
+    rounds = int(os.environ.get("BENCH_NUMBER", "20"))
+    documents = small_documents(content_dir)
+    print(f"{len(documents)} documents, {rounds} rounds")
+    report(
+        "markdown_text_to_html_node",
+        measure(lambda d: markdown_text_to_html_node(d).to_html(), documents, rounds),
+    )
+    report(
+        "Renderer, uncached",
+        measure(Renderer(cache_size=0).render_html, documents, rounds),
+    )
+    cached = Renderer(cache_size=len(documents))
+    measure(cached.render_html, documents, 1)
+    report("Renderer, cached", measure(cached.render_html, documents, rounds))
+
+    shared = Renderer(cache_size=0)
+    results: list[list[int]] = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                measure(shared.render_html, documents, rounds)
+            )
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report("Renderer, uncached, 4 threads", [s for r in results for s in r])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import os
+import shutil
+from typing import Optional
+
+from assets import (
+    DEFAULT_CSS_INLINE_THRESHOLD,
+    DEFAULT_IMAGE_INLINE_THRESHOLD,
+    AssetInliner,
+)
+from buildcache import BuildCache
+from copytree import COPY, copy_tree_recursive, copytree, list_files
+from fsutil import WriteStats
+from hashing import FileHasher
+from hints import LINK_HEADERS_PATH, ResourceHints
+from images import ImageIndex
+from linkcheck import LinkChecker
+from listings import feed_listing, generate_listings, plan_listings
+from logger import get_logger
+from memory import memory_report, render_gc
+from metadata import MetadataIndex
+from output import OutputBackend
+from page import generate_page, read_file
+from precache import PRECACHE_MANIFEST_PATH, PrecacheManifest
+from profiling import Tracer, span
+from publish import prepare_staging, publish, remove_stale_files
+from shard import select_shard, write_shard_manifest
+from stylesheets import StylesheetBundler
+
+
+def plan_pages(content_dir: str, public_dir: str) -> list[tuple[str, str]]:
+    """List (source, destination) paths of every markdown page to render."""
+    plan = []
+    for src_path in list_files(content_dir):
+        if not src_path.endswith(".md"):
+            continue
+        relative_path = os.path.relpath(src_path, content_dir)
+        dst_path = os.path.join(public_dir, relative_path[: -len(".md")] + ".html")
+        plan.append((src_path, dst_path))
+    return plan
+
+
+def cache_path(cache_dir: Optional[str], name: str) -> Optional[str]:
+    """Return the path of a cache file, or None when caching is disabled."""
+    return os.path.join(cache_dir, name) if cache_dir else None
+
+
+def render_pages(
+    template_path: str,
+    plan: list[tuple[str, str]],
+    images: ImageIndex,
+    inliner: AssetInliner,
+    checker: LinkChecker,
+    stats: WriteStats,
+    template: Optional[str] = None,
+    cache: Optional[BuildCache] = None,
+    output: Optional[OutputBackend] = None,
+    hints: Optional[ResourceHints] = None,
+) -> tuple[
+    ImageIndex,
+    AssetInliner,
+    LinkChecker,
+    WriteStats,
+    Optional[BuildCache],
+    Optional[ResourceHints],
+]:
+    """Render planned pages, returning the state they updated."""
+    for src_path, dst_path in plan:
+        generate_page(
+            template_path,
+            src_path,
+            dst_path,
+            images,
+            inliner,
+            checker,
+            stats,
+            template,
+            cache,
+            output,
+            hints,
+        )
+    return images, inliner, checker, stats, cache, hints
+
+
+def render_parallel(
+    template_path: str,
+    plan: list[tuple[str, str]],
+    images: ImageIndex,
+    inliner: AssetInliner,
+    checker: LinkChecker,
+    stats: WriteStats,
+    workers: int,
+    template: Optional[str] = None,
+    cache: Optional[BuildCache] = None,
+    hints: Optional[ResourceHints] = None,
+) -> None:
+    """Render pages in worker processes and merge back what they found.
+
+    Each worker renders an interleaved slice of the plan with its own copy
+    of the indexes.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(
+                render_pages,
+                template_path,
+                plan[i::workers],
+                images,
+                inliner,
+                checker,
+                WriteStats(),
+                template,
+                cache,
+                None,
+                hints,
+            )
+            for i in range(min(workers, len(plan)))
+        ]
+        for future in futures:
+            (
+                worker_images,
+                worker_inliner,
+                worker_checker,
+                worker_stats,
+                worker_cache,
+                worker_hints,
+            ) = future.result()
+            images.sizes.update(worker_images.sizes)
+            inliner.merge(worker_inliner)
+            checker.failures.extend(worker_checker.failures)
+            stats.merge(worker_stats)
+            if cache is not None and worker_cache is not None:
+                cache.merge(worker_cache)
+            if hints is not None and worker_hints is not None:
+                hints.merge(worker_hints)
+    checker.failures.sort(key=lambda failure: (failure.src_path, failure.line))
+
+
+def build_site(
+    template_path: str,
+    content_dir: str,
+    public_dir: str,
+    static_dir: str,
+    shard: Optional[tuple[int, int]] = None,
+    cache_dir: Optional[str] = None,
+    include_drafts: bool = False,
+    keep_generations: Optional[int] = None,
+    workers: int = 1,
+    clean: bool = False,
+    tracer: Optional[Tracer] = None,
+    static_mode: str = COPY,
+    build_cache_dir: Optional[str] = None,
+    output: Optional[OutputBackend] = None,
+    low_memory: bool = False,
+    precache: Optional[PrecacheManifest] = None,
+    css_inline_threshold: int = DEFAULT_CSS_INLINE_THRESHOLD,
+    image_inline_threshold: int = DEFAULT_IMAGE_INLINE_THRESHOLD,
+    site_url: Optional[str] = None,
+) -> None:
+    """Copy static files, then render every planned page of the site.
+
+    With a (index, count) shard, only the pages of that shard are rendered
+    and a partial manifest is written for merge_shards. Indexes are kept
+    in cache_dir between builds when it is given, unless clean is set.
+
+    Without keep_generations, public_dir is deleted and rebuilt in place.
+    Otherwise the site is built in a staging dir seeded from the current
+    generation, then published by swapping the public_dir symlink, keeping
+    that many older generations for rollback. Pages are rendered by
+    workers processes when it is above 1. Static files are placed as
+    static_mode says, see copy_tree_recursive. Pages are reused from the
+    shared build cache in build_cache_dir when given. Pages get resource
+    hints, which a full build also writes as a map of Link headers.
+    Stylesheets and images up to css_inline_threshold and
+    image_inline_threshold bytes are inlined into them, none when 0.
+    Listings are generated with the pages, and an Atom feed too when the
+    absolute site_url is given.
+
+    An output that isn't on disk, such as a MemoryOutput or a ZipOutput,
+    receives every file under public_dir instead, rendered in this process
+    and neither staged nor published. Such a build reads the indexes in
+    cache_dir but doesn't save them, as they would describe files that
+    never reached disk.
+
+    With low_memory, pages are rendered one at a time in this process, each
+    released once written, with the GC tuned by render_gc.
+
+    With precache, a full build on disk also writes a precache manifest of
+    its files, revised from the digests computed while writing them.
+    """
+    logger = get_logger()
+    stats = WriteStats()
+    if clean and cache_dir and os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+        logger.info(f'Removed cache dir: "{cache_dir}"')
+    if output is not None and output.on_disk:
+        output = None
+    if output is not None:
+        keep_generations, workers = None, 1
+    if precache is not None and (output is not None or shard is not None):
+        logger.info("Skipped the precache manifest, which needs a full build on disk")
+        precache = None
+    if low_memory and workers > 1:
+        logger.info("Rendering pages in a single process to bound memory")
+        workers = 1
+    with span(tracer, "copy static"):
+        if output is not None:
+            output_dir = public_dir
+            copytree(static_dir, output_dir, stats, output=output)
+        elif keep_generations is None:
+            output_dir = public_dir
+            copytree(static_dir, output_dir, stats, static_mode)
+        else:
+            output_dir = prepare_staging(public_dir, reuse_previous=not clean)
+            copy_tree_recursive(static_dir, output_dir, stats, static_mode)
+    with span(tracer, "scan metadata"):
+        metadata = MetadataIndex(content_dir, cache_path(cache_dir, "metadata.json"))
+        changed = metadata.scan()
+        if output is None:
+            metadata.save()
+    logger.info(f"Scanned page metadata: {len(changed)} new or changed pages")
+    full_plan = [
+        (src_path, dst_path)
+        for src_path, dst_path in plan_pages(content_dir, output_dir)
+        if include_drafts
+        or not metadata.is_draft(os.path.relpath(src_path, content_dir))
+    ]
+    plan = full_plan if shard is None else select_shard(full_plan, content_dir, shard)
+    hasher = FileHasher()
+    images = ImageIndex(static_dir, cache_path(cache_dir, "images.json"), hasher)
+    inliner = AssetInliner(
+        static_dir, css_inline_threshold, image_inline_threshold, hasher
+    )
+    hints = ResourceHints()
+    build_cache = None
+    if build_cache_dir:
+        options = {
+            "css_threshold": inliner.css_threshold,
+            "image_threshold": inliner.image_threshold,
+            **hints.options(),
+        }
+        build_cache = BuildCache(build_cache_dir, static_dir, options, hasher)
+    with span(tracer, "bundle stylesheets"):
+        bundler = StylesheetBundler(
+            static_dir, cache_path(cache_dir, "stylesheets.json"), hasher
+        )
+        template = bundler.rewrite_template(read_file(template_path))
+        bundles = bundler.write(output_dir, stats, output)
+        if output is None:
+            bundler.save()
+    for url, css in bundler.bundles.items():
+        inliner.add_generated(url, css.encode("utf-8"))
+    logger.info(bundler.report())
+    checker = LinkChecker.from_plan(full_plan, output_dir, static_dir)
+    listings = []
+    if shard is None or shard[0] == 1:
+        listings = plan_listings(metadata)
+        if site_url:
+            listings.append(feed_listing(metadata))
+        else:
+            logger.info("Skipped the Atom feed, which needs the URL of the site")
+    for listing in listings:
+        checker.add("/" + listing.path)
+    with span(tracer, "render pages"), render_gc(low_memory):
+        if workers > 1 and len(plan) > 1:
+            render_parallel(
+                template_path,
+                plan,
+                images,
+                inliner,
+                checker,
+                stats,
+                workers,
+                template,
+                build_cache,
+                hints,
+            )
+        else:
+            render_pages(
+                template_path,
+                plan,
+                images,
+                inliner,
+                checker,
+                stats,
+                template,
+                build_cache,
+                output,
+                hints,
+            )
+    if output is None:
+        images.save()
+    hints_path = hints.write(output_dir, output)
+    logger.info(f'{hints.report()}, written to "{hints_path}"')
+    with span(tracer, "generate listings"):
+        generate_listings(
+            template_path,
+            listings,
+            output_dir,
+            cache_path(cache_dir, "listings.json") if output is None else None,
+            site_url,
+            template=template,
+            output=output,
+            stats=stats,
+        )
+    logger.info(inliner.report())
+    logger.info(stats.report())
+    if build_cache is not None:
+        logger.info(build_cache.report())
+    for failure in checker.report():
+        logger.warning(failure)
+    logger.info(f"Checked links: {len(checker.failures)} broken references")
+    if keep_generations is not None:
+        outputs = {dst_path for _, dst_path in plan}
+        outputs.update(os.path.join(output_dir, listing.path) for listing in listings)
+        outputs.update(bundles.values())
+        outputs.add(os.path.join(output_dir, LINK_HEADERS_PATH))
+        if precache is not None:
+            outputs.add(os.path.join(output_dir, PRECACHE_MANIFEST_PATH))
+        outputs.update(
+            os.path.join(output_dir, os.path.relpath(path, static_dir))
+            for path in list_files(static_dir)
+        )
+        removed = remove_stale_files(output_dir, outputs)
+        logger.info(f"Removed {removed} stale files from the previous generation")
+    if precache is not None:
+        with span(tracer, "precache manifest"):
+            precache.update(output_dir, stats.digests)
+            precache_path = precache.write(output_dir)
+        logger.info(f'{precache.report()}, written to "{precache_path}"')
+    if shard is not None and output is None:
+        pages = [os.path.relpath(src_path, content_dir) for src_path, _ in plan]
+        manifest_path = write_shard_manifest(output_dir, shard, pages)
+        logger.info(f'Wrote shard {shard[0]}/{shard[1]} manifest: "{manifest_path}"')
+    if keep_generations is not None:
+        with span(tracer, "publish"):
+            publish(output_dir, public_dir, keep_generations)
+    if tracer is not None:
+        logger.info(f"Build phases: {tracer.summary()}")
+    if low_memory:
+        logger.info(memory_report())
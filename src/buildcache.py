@@ -0,0 +1,194 @@
+import json
+import os
+import re
+from typing import Optional
+
+from fsutil import open_atomic
+from hashing import FileHasher, hash_bytes
+from htmlnode import HTMLNode
+from images import resolve_static_path
+from logger import get_logger
+
+# Bump whenever a change to the parser or the node layer changes the HTML
+# rendered from the same markdown, or entries change layout, to invalidate
+# every shared cache entry.
+RENDER_VERSION = 5
+OBJECTS_DIR = "objects"
+OBJECT_NAME_PATTERN = re.compile(r"^objects/[0-9a-f]{2}/[0-9a-f]{64}$")
+
+
+def static_dependencies(node: HTMLNode) -> list[str]:
+    """List the local URLs of static files a rendered page depends on."""
+    urls = set()
+    for child in node.iter_nodes():
+        src = child.props.get("src", "") if child.tag == "img" else ""
+        if src.startswith("/") and not src.startswith("//"):
+            urls.add(src)
+    return sorted(urls)
+
+
+class BuildCache:
+    """Content-addressed cache of rendered pages, shareable between builds.
+
+    Entries are keyed by the hash of everything a page is rendered from and
+    written atomically, so concurrent builds can read and fill the same
+    directory. Reading an entry marks it as recently used for prune.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        static_dir: str,
+        options: Optional[dict] = None,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        """Init a cache in root for pages rendered with the given options."""
+        self.root = root
+        self.static_dir = static_dir
+        self.options = options or {}
+        self.hasher = hasher if hasher is not None else FileHasher()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown: str, template: str) -> str:
+        """Hash a page source with its template, options and renderer version."""
+        data = json.dumps(
+            [RENDER_VERSION, self.options, hash_bytes(template.encode("utf-8"))],
+            sort_keys=True,
+        )
+        return hash_bytes(f"{data}\0{markdown}".encode("utf-8"))
+
+    def object_path(self, key: str) -> str:
+        """Return the path of the entry stored under key."""
+        return os.path.join(self.root, OBJECTS_DIR, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached page of key, if its static inputs are unchanged."""
+        entry = self.get_entry(key)
+        return entry["output"] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[dict]:
+        """Return the cached entry of key, if its static inputs are unchanged."""
+        path = self.object_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        for url, digest in entry["dependencies"].items():
+            if self.digest(url) != digest:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def digest(self, url: str) -> Optional[str]:
+        """Hash the static file of a URL, or None if there is none."""
+        path = resolve_static_path(url, self.static_dir)
+        return self.hasher.hash_file(path) if path else None
+
+    def put(
+        self,
+        key: str,
+        output: str,
+        dependencies: list[str],
+        links: Optional[list[tuple[str, str]]] = None,
+    ) -> None:
+        """Store a rendered page with the digests of its static inputs.
+
+        The (kind, target) links of the page are kept too, so a page reused
+        from the cache is link-checked without being parsed again.
+        """
+        entry = {
+            "dependencies": {url: self.digest(url) for url in dependencies},
+            "links": links or [],
+            "output": output,
+        }
+        with open_atomic(self.object_path(key)) as file:
+            json.dump(entry, file, sort_keys=True)
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """List (mtime, size, path) of every entry, least recently used first."""
+        found = []
+        objects = os.path.join(self.root, OBJECTS_DIR)
+        for current, _, files in os.walk(objects):
+            for name in files:
+                path = os.path.join(current, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def prune(self, max_bytes: int) -> int:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        get_logger().info(f"Pruned build cache: {removed} entries, {total} bytes left")
+        return removed
+
+    def pack(self, archive_path: str) -> int:
+        """Write every entry to a gzipped tar, such as a CI cache artifact.
+
+        The same entries always pack to the same bytes, as the gzip header
+        and the members carry no timestamps, owners or file names.
+        """
+        import gzip
+        import tarfile
+
+        entries = self.entries()
+        with open_atomic(archive_path, "wb") as file:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=file, mtime=0) as gz:
+                with tarfile.open(fileobj=gz, mode="w") as tar:
+                    for _, _, path in sorted(entries, key=lambda entry: entry[2]):
+                        name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                        info = tar.gettarinfo(path, arcname=name)
+                        info.mtime = 0
+                        info.mode = 0o644
+                        info.uid = info.gid = 0
+                        info.uname = info.gname = ""
+                        with open(path, "rb") as member:
+                            tar.addfile(info, member)
+        return len(entries)
+
+    def unpack(self, archive_path: str) -> int:
+        """Restore the entries of a packed archive that aren't cached yet."""
+        import tarfile
+
+        restored = 0
+        with tarfile.open(archive_path, "r:*") as tar:
+            for member in tar:
+                if not member.isfile() or not OBJECT_NAME_PATTERN.match(member.name):
+                    continue
+                path = os.path.join(self.root, *member.name.split("/"))
+                if os.path.exists(path):
+                    continue
+                data = tar.extractfile(member)
+                if data is None:
+                    continue
+                with open_atomic(path, "wb") as file:
+                    file.write(data.read())
+                restored += 1
+        return restored
+
+    def merge(self, other: "BuildCache") -> None:
+        """Add the hits and misses of another instance, such as a worker's."""
+        self.hits += other.hits
+        self.misses += other.misses
+
+    def report(self) -> str:
+        """Summarize the cache hits of the build."""
+        return f"Build cache: {self.hits} hits, {self.misses} misses"
@@ -1,13 +1,16 @@
 import re
 from enum import Enum
-from typing import Callable
+from typing import Optional, Union
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from inline import (
     DELIMITER_TO_TEXT_TYPE_MAP,
-    split_nodes_delimiter,
-    split_nodes_image,
-    split_nodes_link,
+    IMAGE_PATTERN,
+    LINK_PATTERN,
+    normalize_label,
+    split_nodes_delimiter_unchecked,
+    split_nodes_reference_link,
+    split_nodes_reference_unchecked,
 )
 from textnode import TextNode, TextType
 
@@ -31,6 +34,23 @@ BLOCK_TYPE_TO_REGEX_PATTERN_MAP = {
     BlockType.ORDERED_LIST: r"^(1\.)\s+(.+)(\n\d+\.\s+.+)*$",
 }
 
+HEADING_LINE_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.*\S)")
+LIST_MARKER_PATTERN = re.compile(r"^(?:[*-]|(\d{1,9})\.)(?:([ \t]+)|$)")
+FENCE_CLOSE_PATTERN = re.compile(r"^[ \t]*```+[ \t]*$")
+# [label]: url, with an optional title, which isn't rendered.
+LINK_DEFINITION_PATTERN = re.compile(
+    r"""^\[([^\[\]]*\S[^\[\]]*)\]:[ \t]*<?([^\s<>]+)>?"""
+    r"""(?:[ \t]+(?:"[^"]*"|'[^']*'|\([^()]*\)))?[ \t]*$"""
+)
+LIST_MARKER_CHARS = frozenset("*-0123456789")
+INLINE_DELIMITERS = [
+    (delimiter, text_type)
+    for delimiter, text_type in DELIMITER_TO_TEXT_TYPE_MAP.items()
+    if delimiter
+]
+# Lists nested deeper are kept as text, as nodes are built recursively.
+MAX_LIST_DEPTH = 64
+
 
 def text_node_to_leaf_node(node: TextNode) -> LeafNode:
     """Convert a TextNode to an HTML LeafNode."""
@@ -49,39 +69,46 @@ def text_node_to_leaf_node(node: TextNode) -> LeafNode:
             return LeafNode("", "img", {"src": node.url, "alt": node.text})
 
 
-def validate_text(text: str) -> Callable:
-    """Return a validator that raises error if text is empty."""
-
-    def set_error_message(message: str):
-        if text == "":
-            raise ValueError(message)
-
-    return set_error_message
-
-
 def validate_inline_text(text: str) -> None:
     """Ensure inline text is not empty."""
-    validate_text(text)("Inline text can't be empty")
+    if text == "":
+        raise ValueError("Inline text can't be empty")
 
 
 def validate_block_text(text: str) -> None:
     """Ensure block text is not empty."""
-    validate_text(text)("Block text can't be empty")
+    if text == "":
+        raise ValueError("Block text can't be empty")
 
 
 def validate_markdown_text(text: str) -> None:
     """Ensure markdown text is not empty."""
-    validate_text(text)("Markdown text can't be empty")
+    if text == "":
+        raise ValueError("Markdown text can't be empty")
 
 
 def inline_text_to_text_nodes(text: str) -> list[TextNode]:
     """Convert inline markdown text into a list of TextNodes."""
     validate_block_text(text)
+    return inline_text_to_text_nodes_unchecked(text)
+
+
+def inline_text_to_text_nodes_unchecked(
+    text: str, definitions: Optional[dict[str, str]] = None
+) -> list[TextNode]:
+    """Convert non-empty inline markdown text into a list of TextNodes.
+
+    The splits run unvalidated with constant delimiters and patterns; the
+    block parser uses this once markdown_text_to_html_node checked its input.
+    References to labels in definitions become links and images.
+    """
     nodes = [TextNode(text, TextType.NORMAL)]
-    for split in [split_nodes_image, split_nodes_link]:
-        nodes = split(nodes)
-    for delimiter, text_type in DELIMITER_TO_TEXT_TYPE_MAP.items():
-        nodes = split_nodes_delimiter(nodes, text_type, delimiter)
+    if definitions and "][" in text:
+        nodes = split_nodes_reference_link(nodes, definitions)
+    nodes = split_nodes_reference_unchecked(nodes, IMAGE_PATTERN, TextType.IMAGE)
+    nodes = split_nodes_reference_unchecked(nodes, LINK_PATTERN, TextType.LINK)
+    for delimiter, text_type in INLINE_DELIMITERS:
+        nodes = split_nodes_delimiter_unchecked(nodes, text_type, delimiter)
     return nodes
 
 
@@ -149,8 +176,19 @@ def paragraph_block_to_html_node(block: str) -> ParentNode:
 
 def code_block_to_html_node(block: str) -> ParentNode:
     """Convert a markdown code block to an HTML code element."""
-    lines = "\n".join(block.split("\n")[1:-1])
-    text_node = LeafNode(lines, "code")
+    lines = block.split("\n")
+    return code_to_html_node(lines[0][3:].strip(), "\n".join(lines[1:-1]))
+
+
+def code_to_html_node(language: str, code: str) -> ParentNode:
+    """Convert code in a language, if given, to a highlighted HTML element."""
+    if not language:
+        return ParentNode("pre", [LeafNode(code, "code")])
+    from highlight import highlight
+
+    highlighted = highlight(code, language)
+    value = highlighted if highlighted is not None else code
+    text_node = LeafNode(value, "code", {"class": f"language-{language}"})
     return ParentNode("pre", [text_node])
 
 
@@ -180,25 +218,284 @@ def ordered_block_to_html_node(block: str) -> ParentNode:
     return ParentNode("ol", children_nodes)
 
 
+def split_indent(line: str) -> tuple[int, str]:
+    """Return the indent of a line in columns, tabs counting to 4, and the rest."""
+    columns = 0
+    for i, char in enumerate(line):
+        if char == " ":
+            columns += 1
+        elif char == "\t":
+            columns += 4 - columns % 4
+        else:
+            return columns, line[i:]
+    return columns, ""
+
+
+def dedent(line: str, columns: int) -> str:
+    """Remove up to columns columns of leading whitespace from a line."""
+    removed = 0
+    for i, char in enumerate(line):
+        if removed >= columns or char not in " \t":
+            return line[i:]
+        removed += 1 if char == " " else 4 - removed % 4
+        if removed > columns:
+            return " " * (removed - columns) + line[i + 1 :]
+    return ""
+
+
+def interrupts_paragraph(marker: re.Match, text: str) -> bool:
+    """Check whether a list item can start in the middle of a paragraph."""
+    has_content = bool(text[marker.end() :].strip())
+    return has_content and marker.group(1) in (None, "1")
+
+
+def starts_block(text: str) -> bool:
+    """Check whether unindented text ends a paragraph to open another block."""
+    marker = LIST_MARKER_PATTERN.match(text)
+    return bool(
+        text.startswith(("```", ">"))
+        or HEADING_LINE_PATTERN.match(text)
+        or (marker and interrupts_paragraph(marker, text))
+    )
+
+
+class InlineBlock:
+    """A heading, paragraph or quote whose inline markdown is parsed last.
+
+    Inline text is parsed once the whole document has been read, so that
+    it can refer to links defined further down.
+    """
+
+    def __init__(self, tag: str, text: str, definitions: dict[str, str]) -> None:
+        """Init a block of tag around text, referring to definitions."""
+        self.tag = tag
+        self.text = text
+        self.definitions = definitions
+
+    def to_html_node(self) -> ParentNode:
+        """Build the node of the block, parsing its inline text."""
+        if not self.text:
+            return ParentNode(self.tag, [])
+        text_nodes = inline_text_to_text_nodes_unchecked(self.text, self.definitions)
+        return wrap_into_parent_node(self.tag, text_nodes)
+
+
+class ListItem:
+    """An item of a list, parsing its de-indented lines as blocks of its own."""
+
+    def __init__(
+        self, content_indent: int, depth: int, definitions: dict[str, str]
+    ) -> None:
+        """Init an item whose content starts at column content_indent."""
+        self.content_indent = content_indent
+        self.parser = BlockParser(depth, definitions)
+
+    def to_html_node(self) -> ParentNode:
+        """Build the li node, without p wrappers if it has one paragraph."""
+        nodes = self.parser.finish()
+        if sum(1 for node in nodes if node.tag == "p") > 1:
+            return ParentNode("li", nodes)
+        children = []
+        for node in nodes:
+            children.extend(node.children if node.tag == "p" else [node])
+        return ParentNode("li", children)
+
+
+class ListBlock:
+    """A list being parsed, ordered or with a given bullet."""
+
+    def __init__(
+        self,
+        bullet: str,
+        start: Optional[int],
+        depth: int,
+        definitions: dict[str, str],
+    ) -> None:
+        """Init a list of bullet items, or ordered from start."""
+        self.bullet = bullet
+        self.start = start
+        self.depth = depth
+        self.definitions = definitions
+        self.items: list[ListItem] = []
+        self.blank = False
+
+    def accepts(self, marker: re.Match) -> bool:
+        """Check whether a list marker continues this list."""
+        if self.start is not None:
+            return marker.group(1) is not None
+        return marker.group(0)[0] == self.bullet
+
+    def add_item(self, indent: int, marker: re.Match, rest: str) -> None:
+        """Start an item from the line of its marker."""
+        content = rest[marker.end() :]
+        gap = len(marker.group(2) or "")
+        if not content or gap > 4:
+            gap = 1
+        content_indent = indent + len(marker.group(0).rstrip()) + gap
+        item = ListItem(content_indent, self.depth + 1, self.definitions)
+        if content:
+            item.parser.feed(content)
+        self.items.append(item)
+        self.blank = False
+
+    def to_html_node(self) -> ParentNode:
+        """Build the ul or ol node of the list."""
+        items: list[HTMLNode] = [item.to_html_node() for item in self.items]
+        if self.start is None:
+            return ParentNode("ul", items)
+        props = {"start": str(self.start)} if self.start != 1 else None
+        return ParentNode("ol", items, props)
+
+
+class BlockParser:
+    """Line-oriented state machine building markdown blocks in one pass.
+
+    Each line is classified once, then added to the open block or closes
+    it and opens another. List items feed their de-indented lines to a
+    parser of their own, so they can hold paragraphs, code and lists.
+    Link definitions are collected on the way into a table shared with
+    these parsers, and inline text is parsed by finish, against the table
+    of the whole document.
+    """
+
+    def __init__(
+        self, depth: int = 0, definitions: Optional[dict[str, str]] = None
+    ) -> None:
+        """Init a parser with no open block, inside depth lists."""
+        self.depth = depth
+        self.definitions = definitions if definitions is not None else {}
+        self.blocks: list[Union[HTMLNode, InlineBlock, ListBlock]] = []
+        self.paragraph: list[str] = []
+        self.quote: list[str] = []
+        self.fence: Optional[list[str]] = None
+        self.list: Optional[ListBlock] = None
+
+    def feed(self, line: str) -> None:
+        """Add a line to the document."""
+        if self.fence is not None:
+            if FENCE_CLOSE_PATTERN.match(line):
+                self.close_fence()
+            else:
+                self.fence.append(line)
+            return
+        indent, rest = split_indent(line)
+        if self.list is not None and self.feed_list(line, indent, rest):
+            return
+        if not rest:
+            self.close_blocks()
+            return
+        first = rest[0]
+        marker = None
+        if first in LIST_MARKER_CHARS and self.depth < MAX_LIST_DEPTH:
+            marker = LIST_MARKER_PATTERN.match(rest)
+        heading = HEADING_LINE_PATTERN.match(rest) if first == "#" else None
+        definition = None
+        if first == "[" and not self.paragraph:
+            definition = LINK_DEFINITION_PATTERN.match(rest)
+        if rest.startswith("```"):
+            self.close_blocks()
+            self.fence = [rest]
+        elif heading:
+            self.close_blocks()
+            level, text = len(heading.group(1)), heading.group(2)
+            self.blocks.append(InlineBlock(f"h{level}", text, self.definitions))
+        elif rest.startswith(">"):
+            if not self.quote:
+                self.close_blocks()
+            self.quote.append(rest[2:] if rest.startswith("> ") else rest[1:])
+        elif marker and (not self.paragraph or interrupts_paragraph(marker, rest)):
+            self.close_blocks()
+            start = int(marker.group(1)) if marker.group(1) is not None else None
+            self.list = ListBlock(rest[0], start, self.depth, self.definitions)
+            self.list.add_item(indent, marker, rest)
+        elif definition:
+            self.close_blocks()
+            label, url = normalize_label(definition.group(1)), definition.group(2)
+            self.definitions.setdefault(label, url)
+        else:
+            if self.quote:
+                self.close_blocks()
+            self.paragraph.append(rest.rstrip())
+
+    def feed_list(self, line: str, indent: int, rest: str) -> bool:
+        """Add a line to the open list; return False if it ends the list."""
+        if self.list is None:
+            return False
+        item = self.list.items[-1]
+        if not rest:
+            self.list.blank = True
+            item.parser.feed("")
+            return True
+        if indent >= item.content_indent:
+            item.parser.feed(dedent(line, item.content_indent))
+            self.list.blank = False
+            return True
+        marker = LIST_MARKER_PATTERN.match(rest)
+        if marker and self.list.accepts(marker):
+            self.list.add_item(indent, marker, rest)
+            return True
+        if (
+            not self.list.blank
+            and item.parser.in_paragraph()
+            and not starts_block(rest)
+        ):
+            item.parser.feed(rest)
+            return True
+        self.close_list()
+        return False
+
+    def in_paragraph(self) -> bool:
+        """Check whether a line of text would continue an open paragraph."""
+        if self.list is not None:
+            return not self.list.blank and self.list.items[-1].parser.in_paragraph()
+        return bool(self.paragraph)
+
+    def close_fence(self) -> None:
+        """Add the open code block."""
+        if self.fence is not None:
+            language = self.fence[0][3:].strip()
+            self.blocks.append(code_to_html_node(language, "\n".join(self.fence[1:])))
+            self.fence = None
+
+    def close_list(self) -> None:
+        """Add the open list."""
+        if self.list is not None:
+            self.blocks.append(self.list)
+            self.list = None
+
+    def close_blocks(self) -> None:
+        """Add the open paragraph or quote."""
+        if self.paragraph:
+            text = "\n".join(self.paragraph)
+            self.blocks.append(InlineBlock("p", text, self.definitions))
+            self.paragraph = []
+        if self.quote:
+            text = "\n".join(self.quote).strip()
+            self.blocks.append(InlineBlock("blockquote", text, self.definitions))
+            self.quote = []
+
+    def finish(self) -> list[HTMLNode]:
+        """Close every open block and return the nodes of the document."""
+        self.close_fence()
+        self.close_list()
+        self.close_blocks()
+        return [
+            block if isinstance(block, HTMLNode) else block.to_html_node()
+            for block in self.blocks
+        ]
+
+
 def markdown_text_to_html_node(text: str) -> HTMLNode:
-    """Convert markdown text to an HTMLNode tree."""
-    nodes = []
+    """Convert markdown text to an HTMLNode tree.
+
+    Lines are read in a single block pass, which also collects link
+    definitions, then inline text is parsed with every definition known.
+    Lines may end with "\r\n" or "\r" as well as "\n".
+    """
     validate_markdown_text(text)
-    blocks = markdown_text_to_blocks(text)
-    for b in blocks:
-        b_type = block_text_to_block_type(b)
-        match b_type:
-            case BlockType.HEADING:
-                nodes.append(heading_block_to_html_node(b))
-            case BlockType.PARAGRAPH:
-                nodes.append(paragraph_block_to_html_node(b))
-            case BlockType.CODE:
-                nodes.append(code_block_to_html_node(b))
-            case BlockType.QUOTE:
-                nodes.append(quote_block_to_html_node(b))
-            case BlockType.UNORDERED_LIST:
-                nodes.append(unordered_block_to_html_node(b))
-            case BlockType.ORDERED_LIST:
-                nodes.append(ordered_block_to_html_node(b))
-
-    return ParentNode("div", nodes)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    parser = BlockParser()
+    for line in text.split("\n"):
+        parser.feed(line)
+    return ParentNode("div", parser.finish())
@@ -1,31 +1,222 @@
 import os
 import shutil
+from typing import Optional
 
+from fsutil import WriteStats, copy_file, file_digest, link_file
 from logger import get_logger
+from output import OutputBackend
 
+COPY, HARDLINK, SYMLINK = "copy", "hardlink", "symlink"
+STATIC_MODES = (COPY, HARDLINK, SYMLINK)
+WRITTEN, SKIPPED, LINKED = "written", "skipped", "linked"
 
-def copy_tree_recursive(current_src: str, current_dst: str) -> None:
-    """Recursively copy files from source to destination directory."""
+
+def list_files(root_dir: str, follow_links: bool = False) -> list[str]:
+    """List every file under root_dir, sorted for a stable order.
+
+    With follow_links, directory symlinks are walked too, except those
+    leading back to a directory they are in.
+    """
+    paths = []
+    chains: dict[str, frozenset[str]] = {}
+    for current, dirs, files in os.walk(root_dir, followlinks=follow_links):
+        dirs.sort()
+        if follow_links:
+            chain = chains.pop(current, frozenset()) | {os.path.realpath(current)}
+            dirs[:] = [
+                name
+                for name in dirs
+                if os.path.realpath(os.path.join(current, name)) not in chain
+            ]
+            chains.update((os.path.join(current, name), chain) for name in dirs)
+        paths.extend(os.path.join(current, name) for name in sorted(files))
+    return paths
+
+
+def is_same_copy(src_path: str, dst_path: str) -> bool:
+    """Check whether dst_path is an unchanged copy of src_path."""
+    try:
+        src, dst = os.stat(src_path), os.lstat(dst_path)
+    except OSError:
+        return False
+    return (src.st_size, src.st_mtime_ns) == (dst.st_size, dst.st_mtime_ns)
+
+
+def duplicate_digests(paths: list[str]) -> dict[str, str]:
+    """Hash the files that share their size with another file."""
+    by_size: dict[int, list[str]] = {}
+    for path in paths:
+        by_size.setdefault(os.path.getsize(path), []).append(path)
+    digests = {}
+    for same_size in by_size.values():
+        if len(same_size) > 1:
+            for path in same_size:
+                digests[path] = file_digest(path) or ""
+    return digests
+
+
+def place_file(src_path: str, dst_path: str, mode: str) -> str:
+    """Copy or hardlink a file unless it is up to date; return the outcome."""
+    if is_same_copy(src_path, dst_path):
+        return SKIPPED
+    if mode == HARDLINK:
+        try:
+            link_file(src_path, dst_path)
+            return LINKED
+        except OSError:
+            pass
+    copy_file(src_path, dst_path)
+    return WRITTEN
+
+
+def place_duplicate(src_path: str, dst_path: str, first_copy: str, mode: str) -> str:
+    """Hardlink a file to an identical copy placed earlier in the build."""
+    if os.path.exists(dst_path) and os.path.samefile(first_copy, dst_path):
+        return SKIPPED
+    try:
+        link_file(first_copy, dst_path)
+        return LINKED
+    except OSError:
+        return place_file(src_path, dst_path, mode)
+
+
+def symlink_files(
+    pairs: list[tuple[str, str]],
+    stats: Optional[WriteStats] = None,
+) -> None:
+    """Symlink each destination of (source, destination) pairs to its source.
+
+    Destinations are in real directories, so files the build writes next
+    to the links never land in the source dir.
+    """
+    stats = stats if stats is not None else WriteStats()
+    for src_path, dst_path in pairs:
+        target = os.path.abspath(src_path)
+        if os.path.islink(dst_path) and os.readlink(dst_path) == target:
+            stats.record(dst_path, None, 0, stats.skipped)
+            continue
+        if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+            shutil.rmtree(dst_path)
+        directory, name = os.path.split(dst_path)
+        tmp_path = os.path.join(directory, f".tmp-link-{name}")
+        if os.path.lexists(tmp_path):
+            os.unlink(tmp_path)
+        os.symlink(target, tmp_path)
+        os.replace(tmp_path, dst_path)
+        stats.record(dst_path, None, 0, stats.linked)
+
+
+def copy_tree_recursive(
+    current_src: str,
+    current_dst: str,
+    stats: Optional[WriteStats] = None,
+    mode: str = COPY,
+    workers: Optional[int] = None,
+) -> None:
+    """Copy files from source to destination directory.
+
+    The file list is computed once, then files are copied over a pool of
+    workers threads. Files whose copy is already up to date are skipped,
+    and files with the same content are hardlinked to a single copy. The
+    HARDLINK mode links to the sources themselves when possible, and the
+    SYMLINK mode symlinks each file from real directories.
+    """
     logger = get_logger()
+    stats = stats if stats is not None else WriteStats()
+    src_paths = list_files(current_src)
+    dst_paths = [
+        os.path.join(current_dst, os.path.relpath(path, current_src))
+        for path in src_paths
+    ]
+    directories = set()
+    for path in src_paths:
+        parent = os.path.dirname(os.path.relpath(path, current_src))
+        while parent and parent not in directories:
+            directories.add(parent)
+            parent = os.path.dirname(parent)
+    for directory in [os.path.join(current_dst, path) for path in sorted(directories)]:
+        if os.path.islink(directory):
+            os.unlink(directory)
+        os.makedirs(directory, exist_ok=True)
     os.makedirs(current_dst, exist_ok=True)
-    for branch in os.listdir(current_src):
-        src_path = os.path.join(current_src, branch)
-        dst_path = os.path.join(current_dst, branch)
-        if os.path.isfile(src_path):
-            shutil.copy2(src_path, dst_path)
+    if mode == SYMLINK:
+        symlink_files(list(zip(src_paths, dst_paths)), stats)
+        return
+
+    digests = duplicate_digests(src_paths)
+    first_copies: dict[str, str] = {}
+    unique, duplicates = [], []
+    for src_path, dst_path in zip(src_paths, dst_paths):
+        digest = digests.get(src_path)
+        first_copy = first_copies.setdefault(digest, dst_path) if digest else dst_path
+        if first_copy == dst_path:
+            unique.append((src_path, dst_path))
+        else:
+            duplicates.append((src_path, dst_path, first_copy))
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(workers) as executor:
+        outcomes = list(
+            executor.map(
+                lambda pair: place_file(pair[0], pair[1], mode),
+                unique,
+            )
+        )
+        outcomes += executor.map(
+            lambda entry: place_duplicate(entry[0], entry[1], entry[2], mode),
+            duplicates,
+        )
+    counters = {WRITTEN: stats.written, SKIPPED: stats.skipped, LINKED: stats.linked}
+    for (src_path, dst_path, *_), outcome in zip([*unique, *duplicates], outcomes):
+        size = os.path.getsize(src_path)
+        stats.record(dst_path, digests.get(src_path), size, counters[outcome])
+        if outcome == WRITTEN:
             logger.info(f'Copied file: "{src_path}" to "{dst_path}"')
-        elif os.path.isdir(src_path):
-            copy_tree_recursive(src_path, dst_path)
+        elif outcome == LINKED:
+            logger.info(f'Linked file: "{dst_path}"')
+
 
+def copy_tree_to_output(
+    src_dir: str,
+    dst_dir: str,
+    output: OutputBackend,
+    stats: Optional[WriteStats] = None,
+) -> None:
+    """Write every file of src_dir to dst_dir in an output, such as a zip."""
+    for src_path in list_files(src_dir):
+        with open(src_path, "rb") as file:
+            data = file.read()
+        dst_path = os.path.join(dst_dir, os.path.relpath(src_path, src_dir))
+        output.write(dst_path, data, stats)
 
-def copytree(src_dir: str, dst_dir: str) -> None:
-    """Copy entire directory tree, removing dst if it exists."""
+
+def copytree(
+    src_dir: str,
+    dst_dir: str,
+    stats: Optional[WriteStats] = None,
+    mode: str = COPY,
+    workers: Optional[int] = None,
+    output: Optional[OutputBackend] = None,
+) -> None:
+    """Copy entire directory tree, removing dst if it exists.
+
+    An output that isn't on disk receives copies of the files instead.
+    """
     logger = get_logger()
 
     if not os.path.exists(src_dir):
         raise FileNotFoundError(f'Source directory "{src_dir}" doesn\'t not exist')
 
-    if os.path.exists(dst_dir):
+    if output is not None and not output.on_disk:
+        copy_tree_to_output(src_dir, dst_dir, output, stats)
+        logger.info(f'Copied directory: "{src_dir}" to output "{dst_dir}"')
+        return
+
+    if os.path.islink(dst_dir):
+        os.unlink(dst_dir)
+        logger.info(f'Unlinked published generation: "{dst_dir}"')
+    elif os.path.exists(dst_dir):
         try:
             shutil.rmtree(dst_dir)
             logger.info(f'Cleaned up directory: "{dst_dir}"')
@@ -36,5 +227,5 @@ def copytree(src_dir: str, dst_dir: str) -> None:
         except OSError as e:
             raise OSError(f'Failed to delete "{dst_dir}": {e}') from e
 
-    copy_tree_recursive(src_dir, dst_dir)
+    copy_tree_recursive(src_dir, dst_dir, stats, mode, workers)
     logger.info(f'Copied directory: "{src_dir}" to "{dst_dir}"')
@@ -0,0 +1,182 @@
+import io
+import json
+import os
+import sys
+from typing import IO, Optional
+
+from copytree import list_files
+from fsutil import file_digest, open_atomic
+from logger import get_logger
+
+DEPLOY_MANIFEST_VERSION = 1
+DELTA_MEMBER_NAME = ".deploy-delta.json"
+PENDING_SUFFIX = ".pending"
+
+
+class Delta:
+    """Files added, changed and removed between two deploy manifests."""
+
+    def __init__(
+        self,
+        added: dict[str, dict],
+        changed: dict[str, dict],
+        removed: dict[str, dict],
+    ) -> None:
+        """Init a delta from {path: {"sha256", "size"}} entries."""
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+
+    def upload_paths(self) -> list[str]:
+        """List the paths whose content has to be shipped, in order."""
+        return sorted([*self.added, *self.changed])
+
+    def to_dict(self) -> dict:
+        """Return the machine-readable form of the delta."""
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "upload_bytes": sum(
+                entry["size"]
+                for entry in [*self.added.values(), *self.changed.values()]
+            ),
+        }
+
+
+def public_entry(entry: dict) -> dict:
+    """Drop the stat fields only used to reuse hashes."""
+    return {"sha256": entry["sha256"], "size": entry["size"]}
+
+
+def load_manifest(path: Optional[str]) -> dict[str, dict]:
+    """Load a deploy manifest, or an empty one if missing or incompatible."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError) as e:
+        get_logger().info(f'Ignored deploy manifest "{path}": {e}')
+        return {}
+    if data.get("version") != DEPLOY_MANIFEST_VERSION:
+        return {}
+    return data["files"]
+
+
+def save_manifest(path: str, files: dict[str, dict]) -> None:
+    """Persist a deploy manifest."""
+    data = {"version": DEPLOY_MANIFEST_VERSION, "files": files}
+    with open_atomic(path) as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def confirm_deploy(manifest_path: str) -> bool:
+    """Promote the manifest of the last exported delta, once deployed.
+
+    Return False if no delta was exported since the last confirmation.
+    """
+    pending_path = manifest_path + PENDING_SUFFIX
+    if not os.path.exists(pending_path):
+        return False
+    os.replace(pending_path, manifest_path)
+    return True
+
+
+def build_manifest(
+    public_dir: str,
+    previous: Optional[dict[str, dict]] = None,
+) -> dict[str, dict]:
+    """Hash every file of public_dir into {path: {"sha256", "size", "mtime_ns"}}.
+
+    Files whose size and mtime match the previous manifest keep their hash
+    without being read again.
+    """
+    previous = previous or {}
+    files = {}
+    for path in list_files(public_dir):
+        relative_path = os.path.relpath(path, public_dir).replace(os.sep, "/")
+        stat = os.stat(path)
+        entry = previous.get(relative_path)
+        if entry is None or (entry.get("mtime_ns"), entry["size"]) != (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            entry = {"sha256": file_digest(path), "size": stat.st_size}
+        files[relative_path] = {**public_entry(entry), "mtime_ns": stat.st_mtime_ns}
+    return files
+
+
+def diff_manifests(previous: dict[str, dict], current: dict[str, dict]) -> Delta:
+    """Compare two manifests by content hash."""
+    added, changed, removed = {}, {}, {}
+    for path, entry in sorted(current.items()):
+        if path not in previous:
+            added[path] = public_entry(entry)
+        elif previous[path]["sha256"] != entry["sha256"]:
+            changed[path] = public_entry(entry)
+    for path, entry in sorted(previous.items()):
+        if path not in current:
+            removed[path] = public_entry(entry)
+    return Delta(added, changed, removed)
+
+
+def write_delta_tar(public_dir: str, delta: Delta, file: IO[bytes]) -> None:
+    """Stream a tar of the added and changed files to a binary file.
+
+    The delta itself is the first member, so the receiver knows which
+    files to delete.
+    """
+    data = json.dumps(delta.to_dict(), indent=2, sort_keys=True).encode("utf-8")
+    import tarfile
+
+    with tarfile.open(fileobj=file, mode="w|") as tar:
+        info = tarfile.TarInfo(DELTA_MEMBER_NAME)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+        for relative_path in delta.upload_paths():
+            path = os.path.join(public_dir, relative_path)
+            info = tar.gettarinfo(path, arcname=relative_path)
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            with open(path, "rb") as member:
+                tar.addfile(info, member)
+
+
+def export_delta(
+    public_dir: str,
+    manifest_path: Optional[str],
+    delta_path: Optional[str] = None,
+    tar_path: Optional[str] = None,
+) -> Delta:
+    """Diff public_dir against the previous build's manifest and export it.
+
+    The delta is written as JSON to delta_path and as a tar of the changed
+    files to tar_path, where "-" means stdout. The new manifest is kept
+    beside the previous one until confirm_deploy promotes it, so a delta
+    whose deploy failed is exported again. Without manifest_path, every
+    file is new and no manifest is kept.
+    """
+    logger = get_logger()
+    previous = load_manifest(manifest_path)
+    current = build_manifest(public_dir, previous)
+    delta = diff_manifests(previous, current)
+    if delta_path == "-":
+        json.dump(delta.to_dict(), sys.stdout, indent=2, sort_keys=True)
+    elif delta_path:
+        with open_atomic(delta_path) as file:
+            json.dump(delta.to_dict(), file, indent=2, sort_keys=True)
+    if tar_path == "-":
+        write_delta_tar(public_dir, delta, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    elif tar_path:
+        with open_atomic(tar_path, "wb") as file:
+            write_delta_tar(public_dir, delta, file)
+    if manifest_path:
+        save_manifest(manifest_path + PENDING_SUFFIX, current)
+    logger.info(
+        f"Deploy delta: {len(delta.added)} added, {len(delta.changed)} changed, "
+        f"{len(delta.removed)} removed ({delta.to_dict()['upload_bytes']} bytes)"
+    )
+    return delta
@@ -0,0 +1,188 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+from hashing import hash_bytes
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl request sharing the blocks of a file with another, see ioctl_ficlone(2).
+FICLONE = 0x40049409
+
+
+class WriteStats:
+    """Files and bytes written, skipped as unchanged, or hardlinked."""
+
+    def __init__(self) -> None:
+        """Init empty counters."""
+        self.written = [0, 0]
+        self.skipped = [0, 0]
+        self.linked = [0, 0]
+        self.digests: dict[str, str] = {}
+
+    def record(
+        self,
+        path: str,
+        digest: Optional[str],
+        size: int,
+        outcome: list[int],
+    ) -> None:
+        """Count a file of size bytes under one of the outcome counters."""
+        outcome[0] += 1
+        outcome[1] += size
+        if digest:
+            self.digests[path] = digest
+
+    def merge(self, other: "WriteStats") -> None:
+        """Add the counters of another instance, such as a worker's."""
+        for mine, theirs in [
+            (self.written, other.written),
+            (self.skipped, other.skipped),
+            (self.linked, other.linked),
+        ]:
+            mine[0] += theirs[0]
+            mine[1] += theirs[1]
+        self.digests.update(other.digests)
+
+    def report(self) -> str:
+        """Summarize written vs skipped bytes."""
+        return (
+            f"Wrote {self.written[0]} files ({self.written[1]} bytes), "
+            f"skipped {self.skipped[0]} unchanged ({self.skipped[1]} bytes), "
+            f"hardlinked {self.linked[0]} duplicates ({self.linked[1]} bytes)"
+        )
+
+
+@contextmanager
+def open_atomic(path: str, mode: str = "w") -> Iterator[IO]:
+    """Open a temporary file that replaces path only once fully written.
+
+    Replacing instead of writing in place also leaves other hardlinks to
+    the old file, such as a previous site generation, untouched.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with os.fdopen(fd, mode, encoding=encoding) as file:
+            yield file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def file_digest(path: str) -> Optional[str]:
+    """Return the content hash of a file, or None if it doesn't exist."""
+    try:
+        with open(path, "rb") as file:
+            return hash_bytes(file.read())
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def write_bytes(path: str, data: bytes, stats: Optional[WriteStats] = None) -> bool:
+    """Write data to path unless the file already holds the same bytes.
+
+    Return True if the file was written.
+    """
+    digest = hash_bytes(data)
+    try:
+        unchanged = os.path.getsize(path) == len(data) and file_digest(path) == digest
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        with open_atomic(path, "wb") as file:
+            file.write(data)
+    if stats is not None:
+        outcome = stats.skipped if unchanged else stats.written
+        stats.record(path, digest, len(data), outcome)
+    return not unchanged
+
+
+def link_file(src_path: str, dst_path: str) -> None:
+    """Hardlink src_path as dst_path, replacing dst_path atomically."""
+    tmp_path = os.path.join(
+        os.path.dirname(dst_path) or ".", f".tmp-link-{os.path.basename(dst_path)}"
+    )
+    if os.path.lexists(tmp_path):
+        os.unlink(tmp_path)
+    os.link(src_path, tmp_path)
+    os.replace(tmp_path, dst_path)
+
+
+def clone_file(src_fd: int, dst_fd: int) -> bool:
+    """Share the blocks of src_fd with dst_fd (a reflink) if supported."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def copy_contents(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy size bytes between file descriptors inside the kernel.
+
+    Tries a reflink, then copy_file_range, which network filesystems can
+    turn into a server-side copy, then sendfile, then plain reads.
+    """
+    if clone_file(src_fd, dst_fd):
+        return
+    for method in ("copy_file_range", "sendfile"):
+        if not hasattr(os, method):
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if method == "copy_file_range":
+                    copied = os.copy_file_range(
+                        src_fd, dst_fd, size - offset, offset, offset
+                    )
+                else:
+                    copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            if offset == 0:
+                continue
+            raise
+        if offset == size:
+            return
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    os.ftruncate(dst_fd, 0)
+    with (
+        open(src_fd, "rb", closefd=False) as src,
+        open(dst_fd, "wb", closefd=False) as dst,
+    ):
+        shutil.copyfileobj(src, dst)
+
+
+def copy_file(src_path: str, dst_path: str) -> None:
+    """Copy a file with its metadata, replacing dst_path atomically."""
+    directory = os.path.dirname(dst_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with open(src_path, "rb") as src:
+            copy_contents(src.fileno(), fd, os.fstat(src.fileno()).st_size)
+        os.close(fd)
+        fd = -1
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,33 @@
+import hashlib
+import os
+from typing import Optional
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex SHA-256 digest of some bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileHasher:
+    """Content hashes of files, recomputed only when size or mtime change."""
+
+    def __init__(self) -> None:
+        """Init an empty hasher."""
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+
+    def hash_file(self, path: str) -> Optional[str]:
+        """Return the content hash of a file, or None if it can't be read."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self._hashes.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            with open(path, "rb") as file:
+                digest = hash_bytes(file.read())
+        except OSError:
+            return None
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
@@ -0,0 +1,195 @@
+import builtins
+import io
+import keyword
+import re
+import threading
+import token
+import tokenize
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from hashing import hash_bytes
+from htmlnode import Markup, escape_text
+
+Lexer = Callable[[str], list[tuple[str, str]]]
+
+PYTHON_CONSTANTS = {"True", "False", "None"}
+PYTHON_BUILTINS = set(dir(builtins))
+DEFAULT_SNIPPET_CACHE_SIZE = 1024
+
+
+def python_lexer(code: str) -> list[tuple[str, str]]:
+    """Split Python code into (css class, text) tokens using tokenize."""
+    # Offsets of the lines tokenize reads, which only end at "\n" unlike
+    # those of str.splitlines.
+    line_offsets, offset = [0], 0
+    for line in io.StringIO(code):
+        offset += len(line)
+        line_offsets.append(offset)
+
+    tokens, position, previous = [], 0, ""
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            name = token.tok_name[tok.type]
+            if tok.type == token.NAME:
+                if tok.string in PYTHON_CONSTANTS:
+                    css_class = "kc"
+                elif keyword.iskeyword(tok.string):
+                    css_class = "k"
+                elif previous == "def":
+                    css_class = "nf"
+                elif previous == "class":
+                    css_class = "nc"
+                elif previous == "@":
+                    css_class = "nd"
+                elif tok.string in PYTHON_BUILTINS:
+                    css_class = "nb"
+                else:
+                    css_class = ""
+            elif tok.type == token.STRING or name.startswith("FSTRING"):
+                css_class = "s"
+            elif tok.type == token.NUMBER:
+                css_class = "m"
+            elif tok.type == token.COMMENT:
+                css_class = "c"
+            elif tok.type == token.OP:
+                css_class = "o"
+            else:
+                continue
+            start = line_offsets[tok.start[0] - 1] + tok.start[1]
+            end = line_offsets[tok.end[0] - 1] + tok.end[1]
+            if start > position:
+                tokens.append(("", code[position:start]))
+            tokens.append((css_class, code[start:end]))
+            position, previous = end, tok.string
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    if position < len(code):
+        tokens.append(("", code[position:]))
+    return tokens
+
+
+def regex_lexer(rules: Iterable[tuple[str, str]]) -> Lexer:
+    """Build a lexer from (css class, pattern) rules tried in order."""
+    rules = list(rules)
+    pattern = re.compile(
+        "|".join(f"(?P<t{i}>{rule})" for i, (_, rule) in enumerate(rules)),
+        re.MULTILINE,
+    )
+    classes = {f"t{i}": css_class for i, (css_class, _) in enumerate(rules)}
+
+    def lex(code: str) -> list[tuple[str, str]]:
+        tokens, position = [], 0
+        for match in pattern.finditer(code):
+            if match.start() > position:
+                tokens.append(("", code[position : match.start()]))
+            tokens.append((classes[match.lastgroup or ""], match.group()))
+            position = match.end()
+        if position < len(code):
+            tokens.append(("", code[position:]))
+        return tokens
+
+    return lex
+
+
+DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED = r"'[^'\n]*'"
+
+shell_lexer = regex_lexer(
+    [
+        ("c", r"(?<!\S)#.*$"),
+        ("s", DOUBLE_QUOTED),
+        ("s", SINGLE_QUOTED),
+        ("nv", r"\$\{[^}\n]*\}|\$\w+|\$[@#?$!*-]"),
+        (
+            "k",
+            r"\b(?:if|then|else|elif|fi|for|while|until|do|done|case|esac|in"
+            r"|function|return|select)\b",
+        ),
+        (
+            "nb",
+            r"\b(?:echo|cd|export|source|set|unset|local|read|exit|alias|test"
+            r"|printf|pwd)\b",
+        ),
+        ("o", r"[|&;<>]+"),
+    ]
+)
+
+json_lexer = regex_lexer(
+    [
+        ("nt", DOUBLE_QUOTED + r"(?=\s*:)"),
+        ("s", DOUBLE_QUOTED),
+        ("m", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+        ("kc", r"\b(?:true|false|null)\b"),
+        ("p", r"[{}\[\],:]"),
+    ]
+)
+
+html_lexer = regex_lexer(
+    [
+        ("c", r"<!--[\s\S]*?-->"),
+        ("cp", r"<![A-Za-z][^>]*>"),
+        ("nt", r"</?[A-Za-z][\w:-]*|/?>"),
+        ("na", r"\b[\w:-]+(?=\s*=)"),
+        ("s", r'"[^"]*"|' + SINGLE_QUOTED),
+        ("ni", r"&(?:\w+|#\d+|#x[0-9a-fA-F]+);"),
+    ]
+)
+
+
+class Highlighter:
+    """Syntax highlighter with a thread-safe cache of recent snippets."""
+
+    def __init__(self, cache_size: int = DEFAULT_SNIPPET_CACHE_SIZE) -> None:
+        """Init a highlighter without lexers, caching cache_size snippets."""
+        self.lexers: dict[str, Lexer] = {}
+        self.cache_size = cache_size
+        self.cache: OrderedDict[str, Markup] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def register(self, names: Iterable[str], lexer: Lexer) -> None:
+        """Use lexer for code fences tagged with any of the given names."""
+        for name in names:
+            self.lexers[name.lower()] = lexer
+
+    def highlight(self, code: str, language: str) -> Optional[Markup]:
+        """Return code as HTML with classed spans, or None if unsupported."""
+        lexer = self.lexers.get(language.lower())
+        if lexer is None:
+            return None
+        key = hash_bytes(f"{language.lower()}\0{code}".encode("utf-8"))
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+        html = tokens_to_html(lexer(code))
+        if self.cache_size > 0:
+            with self.lock:
+                self.cache[key] = html
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return html
+
+
+def tokens_to_html(tokens: list[tuple[str, str]]) -> Markup:
+    """Render (css class, text) tokens as escaped HTML spans."""
+    parts = []
+    for css_class, text in tokens:
+        if css_class:
+            parts.append(f'<span class="{css_class}">{escape_text(text)}</span>')
+        else:
+            parts.append(escape_text(text))
+    return Markup("".join(parts))
+
+
+DEFAULT_HIGHLIGHTER = Highlighter()
+DEFAULT_HIGHLIGHTER.register(["python", "py", "python3"], python_lexer)
+DEFAULT_HIGHLIGHTER.register(["shell", "sh", "bash", "zsh", "console"], shell_lexer)
+DEFAULT_HIGHLIGHTER.register(["json"], json_lexer)
+DEFAULT_HIGHLIGHTER.register(["html", "htm", "xml"], html_lexer)
+
+
+def highlight(code: str, language: str) -> Optional[Markup]:
+    """Highlight code with the default highlighter."""
+    return DEFAULT_HIGHLIGHTER.highlight(code, language)
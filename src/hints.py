@@ -0,0 +1,132 @@
+import json
+import os
+import re
+from typing import Optional
+
+from assets import HREF_PATTERN, STYLESHEET_LINK_PATTERN, STYLESHEET_REL_PATTERN
+from htmlnode import HTMLNode
+from output import FileSystemOutput, OutputBackend
+
+DEFAULT_PRELOAD_IMAGES = 2
+DEFAULT_PREFETCH_PAGES = 3
+LINK_HEADERS_PATH = "_link-headers.json"
+
+HEAD_END_PATTERN = re.compile(r"</head\s*>", re.IGNORECASE)
+HINT_TAG_PATTERN = re.compile(
+    r'<link rel="(preload|prefetch)" href="([^"]+)"(?: as="([a-z]+)")?>'
+)
+# Characters that would have to be escaped in a Link header or an attribute.
+UNSAFE_URL_PATTERN = re.compile(r"""[\s<>"',;&\\]""")
+PAGE_PATH_PATTERN = re.compile(r"(?:/|\.html|/[^./]+)$")
+
+
+def is_hintable(url: str) -> bool:
+    """Check whether a URL is a path on this site that a hint can name."""
+    return (
+        url.startswith("/")
+        and not url.startswith("//")
+        and not UNSAFE_URL_PATTERN.search(url)
+    )
+
+
+class ResourceHints:
+    """Preload and prefetch hints of each page, for tags and Link headers.
+
+    A page preloads the local stylesheets left in its template and its
+    first images, and prefetches the first pages it links to. Hints are
+    added as tags to the head of the page, and kept by page to be written
+    as a map of Link headers next to the site.
+    """
+
+    def __init__(
+        self,
+        max_images: int = DEFAULT_PRELOAD_IMAGES,
+        max_pages: int = DEFAULT_PREFETCH_PAGES,
+    ) -> None:
+        """Init hints of up to max_images images and max_pages pages a page."""
+        self.max_images = max_images
+        self.max_pages = max_pages
+        self.headers: dict[str, list[str]] = {}
+
+    def options(self) -> dict[str, int]:
+        """Return the settings that change the hints of a page."""
+        return {"preload_images": self.max_images, "prefetch_pages": self.max_pages}
+
+    def collect(self, template: str, node: HTMLNode) -> list[tuple[str, str, str]]:
+        """List the (rel, url, as) hints of a page rendered from node.
+
+        Preloaded images are loaded eagerly, since a lazy image would still
+        wait for layout before using its preloaded copy.
+        """
+        hints, seen = [], set()
+        for match in STYLESHEET_LINK_PATTERN.finditer(template):
+            href = HREF_PATTERN.search(match.group(0))
+            if href and STYLESHEET_REL_PATTERN.search(match.group(0)):
+                hints.append(("preload", href.group(1), "style"))
+        images, pages = [], []
+        for child in node.iter_nodes():
+            if child.tag == "img" and len(images) < self.max_images:
+                if is_hintable(child.props.get("src", "")):
+                    images.append(("preload", child.props["src"], "image"))
+                    child.props["loading"] = "eager"
+            elif child.tag == "a" and len(pages) < self.max_pages:
+                href = child.props.get("href", "").split("#")[0]
+                if is_hintable(href) and PAGE_PATH_PATTERN.search(href):
+                    pages.append(("prefetch", href, ""))
+        hints += images + pages
+        unique = []
+        for hint in hints:
+            if is_hintable(hint[1]) and hint[1] not in seen:
+                seen.add(hint[1])
+                unique.append(hint)
+        return unique
+
+    def add_tags(self, page: str, hints: list[tuple[str, str, str]]) -> str:
+        """Add hints as link tags at the end of the head of a page."""
+        head_end = HEAD_END_PATTERN.search(page)
+        if head_end is None or not hints:
+            return page
+        tags = "".join(
+            f'<link rel="{rel}" href="{url}"'
+            + (f' as="{as_type}">' if as_type else ">")
+            for rel, url, as_type in hints
+        )
+        return page[: head_end.start()] + tags + page[head_end.start() :]
+
+    def record(self, dst_path: str, page: str) -> None:
+        """Keep the Link headers of the hint tags of a written page."""
+        headers = []
+        for rel, url, as_type in HINT_TAG_PATTERN.findall(page):
+            headers.append(
+                f"<{url}>; rel={rel}" + (f"; as={as_type}" if as_type else "")
+            )
+        if headers:
+            self.headers[dst_path] = headers
+
+    def merge(self, other: "ResourceHints") -> None:
+        """Add the headers recorded by another instance, such as a worker's."""
+        self.headers.update(other.headers)
+
+    def write(self, public_dir: str, output: Optional[OutputBackend] = None) -> str:
+        """Write the Link headers by page file relative to public_dir."""
+        output = output if output is not None else FileSystemOutput(public_dir)
+        headers = {
+            os.path.relpath(path, public_dir).replace(os.sep, "/"): values
+            for path, values in self.headers.items()
+        }
+        path = os.path.join(public_dir, LINK_HEADERS_PATH)
+        data = json.dumps(headers, indent=2, sort_keys=True).encode("utf-8")
+        output.write(path, data)
+        return path
+
+    def report(self) -> str:
+        """Summarize the hints recorded."""
+        count = sum(len(values) for values in self.headers.values())
+        return f"Resource hints: {count} on {len(self.headers)} pages"
+
+
+def load_link_headers(data: Optional[bytes]) -> dict[str, str]:
+    """Parse a written map of Link headers into a header value by file."""
+    if not data:
+        return {}
+    return {name: ", ".join(values) for name, values in json.loads(data).items()}
@@ -1,4 +1,33 @@
-from typing import Optional
+from typing import Iterator, Optional
+
+
+class Markup(str):
+    """String of HTML that is already safe and must not be escaped again."""
+
+    __slots__ = ()
+
+
+def escape_text(value: str) -> str:
+    """Escape a string for use as HTML text content."""
+    if isinstance(value, Markup):
+        return value
+    if "&" not in value and "<" not in value and ">" not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value: str) -> str:
+    """Escape a string for use as a double-quoted HTML attribute value."""
+    if isinstance(value, Markup):
+        return value
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
 
 
 class HTMLNode:
@@ -36,11 +65,19 @@ class HTMLNode:
         """Convert node to HTML; must be implemented by subclasses."""
         raise NotImplementedError("Child classes will override this method")
 
+    def iter_nodes(self) -> Iterator["HTMLNode"]:
+        """Yield this node and all of its descendants in document order."""
+        stack: list[HTMLNode] = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
     def props_to_html(self) -> str:
         """Render properties as HTML attributes."""
         if not self.props:
             return ""
-        return "".join(f' {k}="{v}"' for k, v in self.props.items())
+        return "".join(f' {k}="{escape_attribute(v)}"' for k, v in self.props.items())
 
 
 class LeafNode(HTMLNode):
@@ -58,10 +95,12 @@ class LeafNode(HTMLNode):
     def to_html(self) -> str:
         """Convert leaf node to HTML string."""
         if self.tag == "":
-            return self.value
+            return escape_text(self.value)
         if self.tag == "img":
             return f"<{self.tag}{self.props_to_html()}/>"
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return (
+            f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+        )
 
 
 class ParentNode(HTMLNode):
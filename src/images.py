@@ -0,0 +1,161 @@
+import json
+import os
+import struct
+from typing import Optional
+
+from fsutil import open_atomic
+from hashing import FileHasher
+from htmlnode import HTMLNode
+from logger import get_logger
+
+JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}  # fmt: skip
+
+EXTERNAL_URL_PREFIXES = ("http://", "https://", "//", "data:", "mailto:")
+
+
+def png_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Read width and height from a PNG IHDR chunk."""
+    if len(data) < 24 or data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+
+def gif_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Read width and height from a GIF logical screen descriptor."""
+    if len(data) < 10 or data[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+    return struct.unpack("<HH", data[6:10])
+
+
+def webp_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Read width and height from a lossy, lossless or extended WebP header."""
+    if len(data) < 30 or data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def jpeg_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Read width and height from the first JPEG start-of-frame segment."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        if marker in JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def image_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Detect the image format from its header and return (width, height)."""
+    for reader in (png_size, jpeg_size, gif_size, webp_size):
+        size = reader(data)
+        if size is not None:
+            return size
+    return None
+
+
+def resolve_static_path(src: str, static_dir: str) -> Optional[str]:
+    """Map a root-relative image URL to a file path under the static dir."""
+    if not src.startswith("/") or src.startswith(EXTERNAL_URL_PREFIXES):
+        return None
+    src = src.split("#", 1)[0].split("?", 1)[0]
+    root = os.path.abspath(static_dir)
+    path = os.path.normpath(os.path.join(root, src.lstrip("/")))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+class ImageIndex:
+    """Cache of image dimensions for the static dir, keyed by file hash."""
+
+    def __init__(
+        self,
+        static_dir: str,
+        cache_path: Optional[str] = None,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        """Init an index over static_dir, optionally persisted to cache_path."""
+        self.static_dir = static_dir
+        self.cache_path = cache_path
+        self.sizes: dict[str, tuple[int, int]] = {}
+        self.hasher = hasher if hasher is not None else FileHasher()
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def load(self) -> None:
+        """Load previously computed dimensions from the cache file."""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as e:
+            get_logger().info(f'Ignored image index "{self.cache_path}": {e}')
+            return
+        self.sizes.update({k: (v[0], v[1]) for k, v in entries.items()})
+
+    def save(self) -> None:
+        """Persist computed dimensions to the cache file."""
+        if not self.cache_path:
+            return
+        with open_atomic(self.cache_path) as file:
+            json.dump(self.sizes, file, sort_keys=True)
+
+    def dimensions(self, src: str) -> Optional[tuple[int, int]]:
+        """Return (width, height) of a local image URL, or None if unknown."""
+        path = resolve_static_path(src, self.static_dir)
+        if path is None or not os.path.isfile(path):
+            return None
+        digest = self.hasher.hash_file(path)
+        if digest is None:
+            return None
+        if digest not in self.sizes:
+            with open(path, "rb") as file:
+                size = image_size(file.read())
+            if size is None:
+                return None
+            self.sizes[digest] = size
+        return self.sizes[digest]
+
+
+def annotate_images(node: HTMLNode, index: Optional[ImageIndex] = None) -> None:
+    """Add intrinsic size and lazy-loading attributes to every img node."""
+    for child in node.iter_nodes():
+        if child.tag != "img":
+            continue
+        if index is not None and "width" not in child.props:
+            size = index.dimensions(child.props.get("src", ""))
+            if size is not None:
+                child.props["width"] = str(size[0])
+                child.props["height"] = str(size[1])
+        child.props.setdefault("loading", "lazy")
+        child.props.setdefault("decoding", "async")
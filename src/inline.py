@@ -1,3 +1,4 @@
+import bisect
 import re
 from typing import Callable, Optional
 
@@ -10,20 +11,23 @@ DELIMITER_TO_TEXT_TYPE_MAP = {
     "_": TextType.ITALIC,
     "`": TextType.CODE,
 }
+DELIMITER_TEXT_TYPES = frozenset(DELIMITER_TO_TEXT_TYPE_MAP.values())
+DELIMITERS = frozenset(DELIMITER_TO_TEXT_TYPE_MAP)
+REFERENCE_TEXT_TYPES = frozenset({TextType.IMAGE, TextType.LINK})
 
 
 def validate_text_type(text_type: TextType) -> None:
     """Raise error if text type is invalid for delimiters."""
-    valid_text_types = set(DELIMITER_TO_TEXT_TYPE_MAP.values())
-    if text_type not in valid_text_types:
-        raise ValueError(f"TextType must be one of {valid_text_types} not {text_type}")
+    if text_type not in DELIMITER_TEXT_TYPES:
+        raise ValueError(
+            f"TextType must be one of {set(DELIMITER_TEXT_TYPES)} not {text_type}"
+        )
 
 
 def validate_delimiter(delimiter: str) -> None:
     """Raise error if delimiter is not valid for markdown."""
-    valid_delimiters = set(DELIMITER_TO_TEXT_TYPE_MAP.keys())
-    if delimiter not in valid_delimiters:
-        raise ValueError(f"Delimiter must be one of {valid_delimiters} not {delimiter}")
+    if delimiter not in DELIMITERS:
+        raise ValueError(f"Delimiter must be one of {set(DELIMITERS)} not {delimiter}")
 
 
 def validate_delimiter_match_text_type(delimiter: str, text_type: TextType) -> None:
@@ -47,54 +51,79 @@ def split_nodes_delimiter(
 
     if not delimiter:
         return old_nodes
+    return split_nodes_delimiter_unchecked(old_nodes, text_type, delimiter)
 
+
+def split_nodes_delimiter_unchecked(
+    old_nodes: list[TextNode],
+    text_type: TextType,
+    delimiter: str,
+) -> list[TextNode]:
+    """Split TextNodes by a non-empty delimiter known to match text_type.
+
+    This is split_nodes_delimiter without validation, for callers that
+    pass constants such as the items of DELIMITER_TO_TEXT_TYPE_MAP.
+    """
     new_nodes = []
+    size = len(delimiter)
     for old_node in old_nodes:
-        text = old_node.text
-        if delimiter not in text:
+        source, start, end = old_node.source, old_node.start, old_node.end
+        found = source.find(delimiter, start, end)
+        if found == -1:
             new_nodes.append(old_node)
             continue
-        sections = text.split(delimiter)
+        sections = []
+        while found != -1:
+            sections.append((start, found))
+            start = found + size
+            found = source.find(delimiter, start, end)
+        sections.append((start, end))
         if len(sections) % 2 == 0:
             raise ValueError(f"Invalid Markdown, unclosed delimiter '{delimiter}'")
-        for i, section in enumerate(sections):
-            if not section:
+        for i, (section_start, section_end) in enumerate(sections):
+            if section_start == section_end:
                 continue
-            if i % 2 == 0:
-                new_nodes.append(TextNode(section, old_node.text_type))
-            else:
-                new_nodes.append(TextNode(section, text_type))
+            section_type = old_node.text_type if i % 2 == 0 else text_type
+            new_nodes.append(
+                TextNode(source, section_type, None, section_start, section_end)
+            )
     return new_nodes
 
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     """Extract markdown image links from text."""
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     """Extract markdown links from text."""
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return LINK_PATTERN.findall(text)
 
 
-def get_separator(text_type: TextType, text_ref: str, ref: str) -> str:
-    """Return markdown separator for link or image based on type."""
-    base_separator = f"[{text_ref}]({ref})"
-    return "!" + base_separator if text_type == TextType.IMAGE else base_separator
+EXTRACTOR_TO_PATTERN_MAP: dict[Callable[[str], list[tuple[str, str]]], re.Pattern] = {
+    extract_markdown_images: IMAGE_PATTERN,
+    extract_markdown_links: LINK_PATTERN,
+}
 
 
 def validate_image_or_link_text_type(text_type: TextType) -> None:
     """Raise error if text type is not IMAGE or LINK."""
-    valid_text_types = {TextType.IMAGE, TextType.LINK}
-    if text_type not in valid_text_types:
-        raise ValueError(f"TextType must be one of {valid_text_types} not {text_type}")
+    if text_type not in REFERENCE_TEXT_TYPES:
+        raise ValueError(
+            f"TextType must be one of {set(REFERENCE_TEXT_TYPES)} not {text_type}"
+        )
 
 
 def validate_extractor(extractor: Callable) -> None:
     """Raise error if extractor is not a valid markdown extractor."""
-    valid_extractors = {extract_markdown_images, extract_markdown_links}
-    if extractor not in valid_extractors:
-        raise ValueError(f"Extractor must be one of {valid_extractors} not {extractor}")
+    if extractor not in EXTRACTOR_TO_PATTERN_MAP:
+        raise ValueError(
+            f"Extractor must be one of {set(EXTRACTOR_TO_PATTERN_MAP)} not {extractor}"
+        )
 
 
 def split_nodes_reference(
@@ -102,27 +131,53 @@ def split_nodes_reference(
     extractor: Callable[[str], list[tuple[str, str]]],
     new_text_type: TextType,
 ) -> list[TextNode]:
-    """Split TextNodes into references using the provided extractor."""
+    """Split TextNodes into references using the provided extractor.
+
+    Matches are taken from the extractor's pattern by offset within each
+    node's span, so the text is scanned once and never re-split.
+    """
     validate_image_or_link_text_type(new_text_type)
     validate_extractor(extractor)
+    return split_nodes_reference_unchecked(
+        old_nodes, EXTRACTOR_TO_PATTERN_MAP[extractor], new_text_type
+    )
+
 
+def split_nodes_reference_unchecked(
+    old_nodes: list[TextNode],
+    pattern: re.Pattern,
+    new_text_type: TextType,
+) -> list[TextNode]:
+    """Split TextNodes into references matched by a pattern, unvalidated.
+
+    This is split_nodes_reference for callers passing IMAGE_PATTERN or
+    LINK_PATTERN with their text type.
+    """
     new_nodes = []
     for old_node in old_nodes:
-        _text_type, text = old_node.text_type, old_node.text
-        matches = extractor(text)
-        if not matches:
-            new_nodes.append(TextNode(text, _text_type, old_node.url))
-            continue
-        for text_ref, ref in matches:
-            separator = get_separator(new_text_type, text_ref, ref)
-            parts = text.split(separator, 1)
-            outside, inside = parts[0], parts[1]
-            if outside:
-                new_nodes.append(TextNode(outside, _text_type, old_node.url))
-            new_nodes.append(TextNode(text_ref, new_text_type, ref))
-            text = inside if len(parts) > 1 else ""
-        if text:
-            new_nodes.append(TextNode(text, _text_type, old_node.url))
+        source, start, end = old_node.source, old_node.start, old_node.end
+        position = start
+        for match in pattern.finditer(source, start, end):
+            if match.start() > position:
+                new_nodes.append(
+                    TextNode(
+                        source,
+                        old_node.text_type,
+                        old_node.url,
+                        position,
+                        match.start(),
+                    )
+                )
+            new_nodes.append(
+                TextNode(source, new_text_type, match.group(2), *match.span(1))
+            )
+            position = match.end()
+        if position == start:
+            new_nodes.append(old_node)
+        elif position < end:
+            new_nodes.append(
+                TextNode(source, old_node.text_type, old_node.url, position, end)
+            )
     return new_nodes
 
 
@@ -134,3 +189,63 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """Process TextNodes to handle markdown link syntax."""
     return split_nodes_reference(old_nodes, extract_markdown_links, TextType.LINK)
+
+
+REFERENCE_LINK_PATTERN = re.compile(r"(!?)\[([^\[\]]*)\]\[([^\[\]]*)\]")
+CODE_DELIMITER = "`"
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a link label to match it case and whitespace insensitively."""
+    return " ".join(label.split()).casefold()
+
+
+def split_nodes_reference_link(
+    old_nodes: list[TextNode],
+    definitions: dict[str, str],
+) -> list[TextNode]:
+    """Split TextNodes into links and images to defined reference labels.
+
+    [text][label], its collapsed form [text][] and ![alt][label] images
+    whose label is in definitions become references; each is a single
+    dict lookup. Undefined labels are left as text, and so are references
+    overlapping a `code` span, as code delimiters are split afterwards.
+    """
+    new_nodes = []
+    for old_node in old_nodes:
+        source, start, end = old_node.source, old_node.start, old_node.end
+        position = start
+        ticks = []
+        found = source.find(CODE_DELIMITER, start, end)
+        while found != -1:
+            ticks.append(found)
+            found = source.find(CODE_DELIMITER, found + 1, end)
+        for match in REFERENCE_LINK_PATTERN.finditer(source, start, end):
+            if ticks:
+                before = bisect.bisect_left(ticks, match.start())
+                if before % 2 or (before < len(ticks) and ticks[before] < match.end()):
+                    continue
+            label = match.group(3) or match.group(2)
+            url = definitions.get(normalize_label(label))
+            if url is None:
+                continue
+            if match.start() > position:
+                new_nodes.append(
+                    TextNode(
+                        source,
+                        old_node.text_type,
+                        old_node.url,
+                        position,
+                        match.start(),
+                    )
+                )
+            text_type = TextType.IMAGE if match.group(1) else TextType.LINK
+            new_nodes.append(TextNode(source, text_type, url, *match.span(2)))
+            position = match.end()
+        if position == start:
+            new_nodes.append(old_node)
+        elif position < end:
+            new_nodes.append(
+                TextNode(source, old_node.text_type, old_node.url, position, end)
+            )
+    return new_nodes
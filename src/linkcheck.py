@@ -0,0 +1,133 @@
+import os
+import posixpath
+from typing import Iterable
+
+from copytree import list_files
+from htmlnode import HTMLNode
+
+SKIPPED_TARGET_PREFIXES = ("//", "#")
+
+
+class BrokenReference:
+    """A link or image target that doesn't resolve to a built file."""
+
+    def __init__(self, src_path: str, line: int, target: str, kind: str) -> None:
+        """Init a broken reference found in src_path at a given line."""
+        self.src_path = src_path
+        self.line = line
+        self.target = target
+        self.kind = kind
+
+    def __eq__(self, other: object) -> bool:
+        """Check equality by comparing location, target and kind."""
+        if not isinstance(other, BrokenReference):
+            return NotImplemented
+        return (self.src_path, self.line, self.target, self.kind) == (
+            other.src_path,
+            other.line,
+            other.target,
+            other.kind,
+        )
+
+    def __repr__(self) -> str:
+        """Return a string representation of the broken reference."""
+        return f"BrokenReference(src_path={self.src_path!r}, line={self.line!r}, target={self.target!r}, kind={self.kind!r})"
+
+    def __str__(self) -> str:
+        """Return a compiler-style "file:line: message" description."""
+        return f'{self.src_path}:{self.line}: broken {self.kind} "{self.target}"'
+
+
+def url_path(path: str, root_dir: str) -> str:
+    """Return the root-relative URL path of a file under root_dir."""
+    return "/" + os.path.relpath(path, root_dir).replace(os.sep, "/")
+
+
+def url_aliases(url: str) -> list[str]:
+    """Return every URL a server answers with the file at url."""
+    if url == "/index.html":
+        return [url, "/"]
+    if url.endswith("/index.html"):
+        directory = url[: -len("index.html")]
+        return [url, directory, directory.rstrip("/")]
+    return [url]
+
+
+def link_targets(node: HTMLNode) -> list[tuple[str, str]]:
+    """List the (kind, target) of every link and image of a parsed page."""
+    targets = []
+    for child in node.iter_nodes():
+        if child.tag == "a" and "href" in child.props:
+            targets.append(("link", child.props["href"]))
+        elif child.tag == "img" and "src" in child.props:
+            targets.append(("image", child.props["src"]))
+    return targets
+
+
+class LinkChecker:
+    """Validate internal links and images against a set of output URLs."""
+
+    def __init__(self, public_dir: str, urls: Iterable[str]) -> None:
+        """Init a checker for pages under public_dir and the known URLs."""
+        self.public_dir = public_dir
+        self.urls: set[str] = set()
+        for url in urls:
+            self.add(url)
+        self.failures: list[BrokenReference] = []
+
+    def add(self, url: str) -> None:
+        """Index a URL that the build will produce."""
+        self.urls.update(url_aliases(url))
+
+    @classmethod
+    def from_plan(
+        cls,
+        plan: list[tuple[str, str]],
+        public_dir: str,
+        static_dir: str,
+    ) -> "LinkChecker":
+        """Index the planned pages and the static files they will sit beside."""
+        urls = [url_path(dst, public_dir) for _, dst in plan]
+        if os.path.isdir(static_dir):
+            urls.extend(url_path(path, static_dir) for path in list_files(static_dir))
+        return cls(public_dir, urls)
+
+    def resolve(self, page_url: str, target: str) -> str:
+        """Return the root-relative path of a target, or "" if not internal."""
+        target = target.strip().split("#", 1)[0].split("?", 1)[0]
+        if not target or target.startswith(SKIPPED_TARGET_PREFIXES) or ":" in target:
+            return ""
+        if not target.startswith("/"):
+            target = posixpath.join(posixpath.dirname(page_url), target)
+        resolved = posixpath.normpath(target)
+        return resolved + "/" if target.endswith("/") and resolved != "/" else resolved
+
+    def check(
+        self,
+        src_path: str,
+        dst_path: str,
+        markdown: str,
+        targets: list[tuple[str, str]],
+    ) -> None:
+        """Record every (kind, target) of a page that isn't a known URL.
+
+        Targets are those of link_targets, in document order, so references
+        and code are told apart by the parser. Each broken one is reported
+        at the line of its next occurrence in the markdown source.
+        """
+        page_url = url_path(dst_path, self.public_dir)
+        positions: dict[str, int] = {}
+        for kind, target in targets:
+            path = self.resolve(page_url, target)
+            if not path or path in self.urls:
+                continue
+            found = markdown.find(target, positions.get(target, 0))
+            if found == -1:
+                found = markdown.find(target)
+            positions[target] = found + 1
+            number = markdown.count("\n", 0, max(found, 0)) + 1
+            self.failures.append(BrokenReference(src_path, number, target, kind))
+
+    def report(self) -> list[str]:
+        """Describe each broken reference found so far."""
+        return [str(failure) for failure in self.failures]
@@ -0,0 +1,314 @@
+import json
+import os
+import posixpath
+import re
+from typing import Optional, TextIO
+
+from fsutil import WriteStats, file_digest, open_atomic
+from hashing import hash_bytes
+from htmlnode import (
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    escape_attribute,
+    escape_text,
+)
+from logger import get_logger
+from metadata import MetadataIndex, Value
+from output import FileSystemOutput, OutputBackend
+
+LISTING_PAGE_SIZE = 10
+FEED_SIZE = 20
+FEED_PATH = "feed.xml"
+CONTENT_PLACEHOLDER = "{{ Content }}"
+
+
+class ListingError(Exception):
+    """Exception for listings that can't be generated."""
+
+    pass
+
+
+class Listing:
+    """A generated page listing other pages, such as a tag or an archive."""
+
+    def __init__(
+        self,
+        path: str,
+        title: str,
+        items: list[tuple[str, str, str]],
+        previous_url: Optional[str] = None,
+        next_url: Optional[str] = None,
+    ) -> None:
+        """Init a listing written to path with (url, title, date) items."""
+        self.path = path
+        self.title = title
+        self.items = items
+        self.previous_url = previous_url
+        self.next_url = next_url
+
+    def signature(self) -> str:
+        """Hash everything the listing renders, to detect when it changes."""
+        data = [self.path, self.title, self.items, self.previous_url, self.next_url]
+        return hash_bytes(json.dumps(data).encode("utf-8"))
+
+
+def page_url(relative_path: str) -> str:
+    """Return the URL of the page rendered from a markdown path."""
+    url = "/" + relative_path[: -len(".md")] + ".html"
+    return url[: -len("index.html")] if url.endswith("/index.html") else url
+
+
+def slugify(text: str) -> str:
+    """Turn a tag into a lowercase URL path segment."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "tag"
+
+
+def page_items(
+    pages: list[tuple[str, dict[str, Value]]],
+) -> list[tuple[str, str, str]]:
+    """Turn indexed pages into (url, title, date) listing items."""
+    return [
+        (page_url(path), str(meta.get("title") or path), str(meta.get("date", "")))
+        for path, meta in pages
+    ]
+
+
+def paginate(
+    base_path: str,
+    title: str,
+    items: list[tuple[str, str, str]],
+    page_size: int,
+) -> list[Listing]:
+    """Split items into numbered listing pages under base_path."""
+    chunks = [items[i : i + page_size] for i in range(0, len(items), page_size)]
+    paths = [
+        posixpath.join(base_path, "index.html")
+        if number == 1
+        else posixpath.join(base_path, "page", str(number), "index.html")
+        for number in range(1, len(chunks) + 1)
+    ]
+    urls = ["/" + path[: -len("index.html")] for path in paths]
+    return [
+        Listing(
+            paths[i],
+            title if i == 0 else f"{title} (page {i + 1})",
+            chunk,
+            urls[i - 1] if i > 0 else None,
+            urls[i + 1] if i + 1 < len(chunks) else None,
+        )
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def plan_listings(
+    index: MetadataIndex,
+    page_size: int = LISTING_PAGE_SIZE,
+) -> list[Listing]:
+    """Plan directory listings, tag pages and the archive from metadata.
+
+    Directory listings are only generated for directories that have no
+    index.md of their own. Tags whose slugs collide get a numbered one.
+    """
+    pages = index.pages()
+    listings = []
+
+    directories: dict[str, list[tuple[str, dict[str, Value]]]] = {}
+    for path, meta in pages:
+        directories.setdefault(posixpath.dirname(path), []).append((path, meta))
+    for directory, children in sorted(directories.items()):
+        if not directory or posixpath.join(directory, "index.md") in index.entries:
+            continue
+        title = posixpath.basename(directory).replace("-", " ").title()
+        listings.extend(paginate(directory, title, page_items(children), page_size))
+
+    tags: set[str] = set()
+    for _, meta in pages:
+        page_tags = meta.get("tags", [])
+        tags.update(page_tags if isinstance(page_tags, list) else [str(page_tags)])
+    slugs: dict[str, str] = {}
+    for tag in sorted(tags):
+        slug = base = slugify(tag)
+        number = 1
+        while slug in slugs:
+            number += 1
+            slug = f"{base}-{number}"
+        if slug != base:
+            get_logger().warning(
+                f'Tag "{tag}" has the same slug as "{slugs[base]}", '
+                f'listed under "tags/{slug}/"'
+            )
+        slugs[slug] = tag
+        items = page_items(index.pages(tag=tag))
+        listings.extend(
+            paginate(posixpath.join("tags", slug), f"Tag: {tag}", items, page_size)
+        )
+
+    dated = sorted(
+        (page for page in pages if page[1].get("date")),
+        key=lambda page: str(page[1]["date"]),
+        reverse=True,
+    )
+    listings.extend(paginate("archive", "Archive", page_items(dated), page_size))
+    return listings
+
+
+def listing_nodes(listing: Listing) -> list[ParentNode]:
+    """Build the heading and pagination nodes around the items of a listing."""
+    links = []
+    if listing.previous_url:
+        links.append(
+            LeafNode("Newer", "a", {"href": listing.previous_url, "rel": "prev"})
+        )
+    if listing.next_url:
+        links.append(LeafNode("Older", "a", {"href": listing.next_url, "rel": "next"}))
+    return [
+        ParentNode("h1", [LeafNode(listing.title)]),
+        ParentNode("nav", links, {"class": "pagination"}),
+    ]
+
+
+def item_html(url: str, title: str, date: str) -> str:
+    """Render one listing item as an HTML list element."""
+    children: list[HTMLNode] = [LeafNode(title, "a", {"href": url})]
+    if date:
+        children.append(LeafNode(" "))
+        children.append(LeafNode(date, "time", {"datetime": date}))
+    return ParentNode("li", children).to_html()
+
+
+def write_listing(
+    template: str,
+    dst_path: str,
+    listing: Listing,
+    output: Optional[OutputBackend] = None,
+    stats: Optional[WriteStats] = None,
+) -> None:
+    """Stream a listing into the template, one item at a time."""
+    head, _, tail = template.partition(CONTENT_PLACEHOLDER)
+    heading, pagination = listing_nodes(listing)
+    output = (
+        output if output is not None else FileSystemOutput(os.path.dirname(dst_path))
+    )
+    with output.open(dst_path, stats) as file:
+        file.write(head.replace("{{ Title }}", escape_text(listing.title)))
+        file.write(heading.to_html())
+        file.write("<ul>")
+        for item in listing.items:
+            file.write(item_html(*item))
+        file.write("</ul>")
+        file.write(pagination.to_html())
+        file.write(tail.replace("{{ Title }}", escape_text(listing.title)))
+
+
+def atom_date(date: str) -> str:
+    """Turn a front matter date into an RFC 3339 timestamp."""
+    return date if "T" in date else f"{date}T00:00:00Z"
+
+
+def write_feed(
+    file: TextIO,
+    title: str,
+    site_url: str,
+    items: list[tuple[str, str, str]],
+) -> None:
+    """Stream an Atom feed of (url, title, date) items, newest first."""
+    updated = atom_date(items[0][2]) if items else "1970-01-01T00:00:00Z"
+    file.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    file.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+    file.write(f"<title>{escape_text(title)}</title>\n")
+    file.write(f"<id>{escape_text(site_url + '/')}</id>\n")
+    file.write(f'<link href="{escape_attribute(site_url + "/")}"/>\n')
+    file.write(f"<updated>{updated}</updated>\n")
+    for url, item_title, date in items:
+        file.write("<entry>\n")
+        file.write(f"<title>{escape_text(item_title)}</title>\n")
+        file.write(f'<link href="{escape_attribute(site_url + url)}"/>\n')
+        file.write(f"<id>{escape_text(site_url + url)}</id>\n")
+        file.write(f"<updated>{atom_date(date)}</updated>\n")
+        file.write("</entry>\n")
+    file.write("</feed>\n")
+
+
+def feed_listing(index: MetadataIndex, size: int = FEED_SIZE) -> Listing:
+    """Plan the Atom feed of the most recent dated pages."""
+    dated = [page for page in index.pages() if page[1].get("date")]
+    dated.sort(key=lambda page: str(page[1]["date"]), reverse=True)
+    return Listing(FEED_PATH, "Feed", page_items(dated[:size]))
+
+
+def generate_listings(
+    template_path: str,
+    listings: list[Listing],
+    public_dir: str,
+    state_path: Optional[str] = None,
+    site_url: Optional[str] = None,
+    template: Optional[str] = None,
+    output: Optional[OutputBackend] = None,
+    stats: Optional[WriteStats] = None,
+) -> int:
+    """Write the listings and feed whose content changed since last build.
+
+    Signatures of the written listings are kept in state_path with the
+    digest of the file written on disk, so a page edit only regenerates the
+    listings it appears on, and a file that changed since, such as one of a
+    generation rolled back to, is written again. Return the number of
+    files written. A template text already read replaces template_path.
+    Files are written to output when given, otherwise to disk, and counted
+    in stats. The feed needs the absolute site_url its entries are
+    identified by.
+    """
+    logger = get_logger()
+    stats = stats if stats is not None else WriteStats()
+    previous: dict[str, list] = {}
+    if state_path and os.path.exists(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                previous = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.info(f'Ignored listings state "{state_path}": {e}')
+        if not isinstance(previous, dict):
+            previous = {}
+    if template is None:
+        with open(template_path, "r", encoding="utf-8") as file:
+            template = file.read()
+
+    output = output if output is not None else FileSystemOutput(public_dir)
+    template_digest = hash_bytes(template.encode("utf-8"))
+    signatures: dict[str, list] = {}
+    written = 0
+    for listing in listings:
+        dst_path = os.path.join(public_dir, listing.path)
+        data = listing.signature() + template_digest
+        if listing.path == FEED_PATH:
+            if not site_url:
+                raise ListingError("The Atom feed needs the URL of the site")
+            data += site_url
+        signature = hash_bytes(data.encode())
+        entry = previous.get(listing.path)
+        if (
+            isinstance(entry, list)
+            and entry[0] == signature
+            and output.exists(dst_path)
+            and (not output.on_disk or file_digest(dst_path) == entry[1])
+        ):
+            signatures[listing.path] = entry
+            size = os.path.getsize(dst_path) if output.on_disk else 0
+            stats.record(dst_path, entry[1], size, stats.skipped)
+            continue
+        if listing.path == FEED_PATH:
+            with output.open(dst_path, stats) as file:
+                write_feed(
+                    file, listing.title, str(site_url).rstrip("/"), listing.items
+                )
+        else:
+            write_listing(template, dst_path, listing, output, stats)
+        digest = stats.digests.get(dst_path) if output.on_disk else None
+        signatures[listing.path] = [signature, digest]
+        written += 1
+
+    if state_path:
+        with open_atomic(state_path) as file:
+            json.dump(signatures, file, indent=2, sort_keys=True)
+    logger.info(f"Generated listings: {written} of {len(signatures)} changed")
+    return written
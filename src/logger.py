@@ -1,11 +1,16 @@
 import logging
 import sys
+from typing import Optional, TextIO
 
 
-def get_logger() -> logging.Logger:
-    """Provide a basic logging system displaying info to standard output."""
+def get_logger(stream: Optional[TextIO] = None) -> logging.Logger:
+    """Provide a basic logging system displaying info to standard output.
+
+    The stream of the first call wins, so commands writing data to standard
+    output can send the log to standard error instead.
+    """
     logging.basicConfig(
-        stream=sys.stdout,
+        stream=stream or sys.stdout,
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
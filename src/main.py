@@ -1,11 +1,498 @@
-from copytree import copytree
-from page import generate_pages_recursive
+import argparse
+import logging
+import os
+import shutil
+import sys
+from typing import Any, BinaryIO, Optional, cast
 
+from assets import DEFAULT_CSS_INLINE_THRESHOLD, DEFAULT_IMAGE_INLINE_THRESHOLD
+from build import build_site
+from buildcache import BuildCache
+from copytree import COPY, STATIC_MODES
+from delta import confirm_deploy, export_delta
+from fsutil import open_atomic
+from logger import get_logger
+from output import MemoryOutput, OutputBackend, ZipOutput
+from precache import DEFAULT_MAX_FILE_SIZE, PrecacheManifest
+from profiling import Tracer
+from publish import PublishError, prepare_staging, publish, rollback
+from shard import ShardError, merge_shards, parse_shard
 
-def main() -> None:
+DEFAULT_CONFIG_PATH = "site.toml"
+DEPLOY_MANIFEST_NAME = "deploy-manifest.json"
+
+
+def shard_spec(spec: str) -> tuple[int, int]:
+    """Parse a --shard value, reporting errors through argparse."""
+    try:
+        return parse_shard(spec)
+    except ShardError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def worker_count(value: str) -> int:
+    """Parse a --workers value, where 0 means one per CPU."""
+    try:
+        workers = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f'Expected a number, got "{value}"') from e
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"Expected 0 or more workers, got {workers}")
+    return workers or os.cpu_count() or 1
+
+
+def absolute_url(value: str) -> str:
+    """Parse a --site-url value, which must be an absolute http(s) URL."""
+    scheme, _, rest = value.partition("://")
+    if scheme not in ("http", "https") or not rest.strip("/"):
+        raise argparse.ArgumentTypeError(
+            f'Expected an absolute URL such as "https://example.com", got "{value}"'
+        )
+    return value.rstrip("/")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Describe the command-line options of the site generator."""
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "--config",
+        metavar="PATH",
+        help=f"read option defaults from a TOML file (default: {DEFAULT_CONFIG_PATH} "
+        "if it exists)",
+    )
+    paths = parser.add_argument_group("paths")
+    paths.add_argument("--content", default="content/", metavar="DIR")
+    paths.add_argument("--static", default="static", metavar="DIR")
+    paths.add_argument("--template", default="template.html", metavar="PATH")
+    paths.add_argument("--output", default="public", metavar="DIR")
+    paths.add_argument(
+        "--cache-dir",
+        default=".cache",
+        metavar="DIR",
+        help="where indexes are kept between builds (default: .cache)",
+    )
+    paths.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't read or write indexes in the cache dir",
+    )
+
+    build = parser.add_argument_group("build")
+    build.add_argument(
+        "-j",
+        "--workers",
+        type=worker_count,
+        default=1,
+        metavar="N",
+        help="render pages in N processes, 0 for one per CPU (default: 1)",
+    )
+    build.add_argument(
+        "--clean",
+        action="store_true",
+        help="discard the cache and previous outputs instead of building incrementally",
+    )
+    build.add_argument(
+        "--static-mode",
+        choices=STATIC_MODES,
+        default=COPY,
+        help="copy static files, hardlink them when possible, or symlink each "
+        "file of the static dir for local previews (default: copy)",
+    )
+    build.add_argument(
+        "--site-url",
+        type=absolute_url,
+        metavar="URL",
+        help="absolute URL the site is served from, such as https://example.com, "
+        "which the Atom feed needs to be written",
+    )
+    build.add_argument(
+        "--inline-css-max-size",
+        type=int,
+        default=DEFAULT_CSS_INLINE_THRESHOLD // 1024,
+        metavar="KB",
+        help="inline local stylesheets up to KB into pages, 0 for none "
+        f"(default: {DEFAULT_CSS_INLINE_THRESHOLD // 1024})",
+    )
+    build.add_argument(
+        "--inline-image-max-size",
+        type=int,
+        default=DEFAULT_IMAGE_INLINE_THRESHOLD // 1024,
+        metavar="KB",
+        help="inline local images up to KB into pages as data URIs, 0 for none "
+        f"(default: {DEFAULT_IMAGE_INLINE_THRESHOLD // 1024})",
+    )
+    build.add_argument(
+        "--shard",
+        type=shard_spec,
+        help='render only shard "i/n" of the pages and write a partial manifest',
+    )
+    build.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also render pages marked with draft: true",
+    )
+    build.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="render pages one at a time in a single process with the GC tuned, "
+        "to bound peak memory",
+    )
+    build.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help="assemble the outputs of every shard build into the output dir",
+    )
+
+    shared = parser.add_argument_group("shared build cache")
+    shared.add_argument(
+        "--build-cache",
+        metavar="DIR",
+        help="reuse pages rendered from the same inputs by any build sharing DIR",
+    )
+    shared.add_argument(
+        "--build-cache-size",
+        type=int,
+        metavar="MB",
+        help="prune least recently used pages until the build cache fits MB",
+    )
+    shared.add_argument(
+        "--unpack-cache",
+        metavar="ARCHIVE",
+        help="restore build cache entries from ARCHIVE before building",
+    )
+    shared.add_argument(
+        "--pack-cache",
+        metavar="ARCHIVE",
+        help="save the build cache to ARCHIVE after building",
+    )
+
+    output = parser.add_argument_group("publishing")
+    output.add_argument(
+        "--keep-generations",
+        type=int,
+        default=3,
+        metavar="N",
+        help="previous generations of the output kept for rollback (default: 3)",
+    )
+    output.add_argument(
+        "--in-place",
+        action="store_true",
+        help="delete and rebuild the output in place instead of publishing atomically",
+    )
+    output.add_argument(
+        "--rollback",
+        action="store_true",
+        help="point the output back to the previous generation",
+    )
+    output.add_argument(
+        "--delta",
+        metavar="PATH",
+        help="write the files added, changed and removed since the previous build "
+        'as JSON to PATH ("-" for stdout)',
+    )
+    output.add_argument(
+        "--delta-tar",
+        metavar="PATH",
+        help='write a tar of the added and changed files to PATH ("-" for stdout)',
+    )
+    output.add_argument(
+        "--confirm-deploy",
+        action="store_true",
+        help="record the last delta as deployed, so the next one is computed "
+        "from it; until then deltas are computed from the previous confirmed one",
+    )
+
+    offline = parser.add_argument_group("offline")
+    offline.add_argument(
+        "--precache",
+        action="store_true",
+        help="write a precache manifest of the revision of every output file "
+        "for a service worker",
+    )
+    offline.add_argument(
+        "--precache-include",
+        action="extend",
+        nargs="+",
+        metavar="GLOB",
+        help="only list the files matching GLOB, which can be repeated "
+        "(default: every file)",
+    )
+    offline.add_argument(
+        "--precache-exclude",
+        action="extend",
+        nargs="+",
+        metavar="GLOB",
+        help="leave out the files matching GLOB, which can be repeated",
+    )
+    offline.add_argument(
+        "--precache-max-size",
+        type=int,
+        default=DEFAULT_MAX_FILE_SIZE // 1024,
+        metavar="KB",
+        help="leave out files larger than KB "
+        f"(default: {DEFAULT_MAX_FILE_SIZE // 1024})",
+    )
+
+    preview = parser.add_argument_group("previews")
+    preview.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="build into memory and serve the site on PORT, without writing it",
+    )
+    preview.add_argument(
+        "--zip",
+        metavar="PATH",
+        help='build the site straight into a zip at PATH ("-" for stdout)',
+    )
+
+    diagnostics = parser.add_argument_group("diagnostics")
+    diagnostics.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="save cProfile statistics of the build to PATH",
+    )
+    diagnostics.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="save build phase timings as a Chrome trace to PATH",
+    )
+    diagnostics.add_argument(
+        "-v",
+        "--verbose",
+        action="store_const",
+        const=logging.DEBUG,
+        dest="log_level",
+        help="log debugging details",
+    )
+    diagnostics.add_argument(
+        "-q",
+        "--quiet",
+        action="store_const",
+        const=logging.WARNING,
+        dest="log_level",
+        help="only log warnings and errors",
+    )
+    parser.set_defaults(log_level=logging.INFO)
+    return parser
+
+
+def config_arguments(option: str, value: Any) -> list[str]:
+    """Spell a config value as the command-line arguments that set it."""
+    if value is True:
+        return [option]
+    if isinstance(value, list):
+        return [option, *(str(item) for item in value)]
+    return [f"{option}={value}"]
+
+
+def read_config(parser: argparse.ArgumentParser, path: str) -> dict[str, Any]:
+    """Read option defaults from a TOML file, keyed by long option name.
+
+    Each value is parsed as if given on the command line, so it goes through
+    the type and choices of its option.
+    """
+    import tomllib
+
+    try:
+        with open(path, "rb") as file:
+            config = tomllib.load(file)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        parser.error(f'Could not read config "{path}": {e}')
+    dests = set(vars(parser.parse_args([]))) - {"config", "log_level"}
+    defaults = {}
+    for key, value in config.items():
+        dest = key.replace("-", "_")
+        if dest == "verbosity":
+            level = logging.getLevelName(str(value).upper())
+            if not isinstance(level, int):
+                parser.error(f'Unknown verbosity "{value}" in config "{path}"')
+            defaults["log_level"] = level
+            continue
+        if dest not in dests:
+            parser.error(f'Unknown option "{key}" in config "{path}"')
+        if value is False and parser.get_default(dest) is False:
+            defaults[dest] = False
+            continue
+        option = "--" + dest.replace("_", "-")
+        parsed, extra = parser.parse_known_args(config_arguments(option, value))
+        if extra or value is False:
+            parser.error(f'Invalid value for "{key}" in config "{path}": {value!r}')
+        defaults[dest] = getattr(parsed, dest)
+    return defaults
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse options, taking defaults from the config file first."""
+    parser = build_parser()
+    known, _ = parser.parse_known_args(argv)
+    config_path = known.config
+    if config_path is None and os.path.exists(DEFAULT_CONFIG_PATH):
+        config_path = DEFAULT_CONFIG_PATH
+    if config_path is not None:
+        parser.set_defaults(**read_config(parser, config_path))
+    args = parser.parse_args(argv)
+    if args.delta == "-" and args.delta_tar == "-":
+        parser.error("--delta and --delta-tar can't both write to stdout")
+    if (args.pack_cache or args.unpack_cache) and not args.build_cache:
+        parser.error("--pack-cache and --unpack-cache need --build-cache")
+    if args.serve is not None and args.zip:
+        parser.error("--serve and --zip can't be used together")
+    if (args.serve is not None or args.zip) and (
+        args.merge or args.rollback or args.shard or args.delta or args.delta_tar
+    ):
+        parser.error(
+            "--serve and --zip build a whole site without writing the output dir, "
+            "so they can't be used with --merge, --rollback, --shard or --delta"
+        )
+    if args.low_memory and args.serve is not None:
+        parser.error("--low-memory can't keep a whole site in memory for --serve")
+    if args.precache and (
+        args.serve is not None or args.zip or args.shard or args.merge
+    ):
+        parser.error(
+            "--precache lists the files of a full build on disk, so it can't be "
+            "used with --serve, --zip, --shard or --merge"
+        )
+    if args.confirm_deploy and args.no_cache:
+        parser.error("--confirm-deploy needs the deploy manifest of the cache dir")
+    if args.rollback and args.in_place:
+        parser.error("--rollback needs published generations, not --in-place")
+    return args
+
+
+def build(
+    args: argparse.Namespace,
+    tracer: Optional[Tracer],
+    output: Optional[OutputBackend] = None,
+) -> None:
+    """Build the site as the options ask, into output when given."""
+    precache = None
+    if args.precache:
+        precache = PrecacheManifest(
+            args.precache_include,
+            args.precache_exclude,
+            args.precache_max_size * 1024,
+            None if args.no_cache else os.path.join(args.cache_dir, "precache.json"),
+        )
+    build_site(
+        args.template,
+        args.content,
+        args.output,
+        args.static,
+        args.shard,
+        None if args.no_cache else args.cache_dir,
+        args.drafts,
+        None if args.in_place else args.keep_generations,
+        args.workers,
+        args.clean,
+        tracer,
+        args.static_mode,
+        args.build_cache,
+        output,
+        args.low_memory,
+        precache,
+        args.inline_css_max_size * 1024,
+        args.inline_image_max_size * 1024,
+        args.site_url,
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Build, merge or roll back the site as the options ask."""
+    keep_generations = None if args.in_place else args.keep_generations
+    if args.rollback:
+        rollback(args.output)
+        return
+    if args.confirm_deploy:
+        if confirm_deploy(os.path.join(args.cache_dir, DEPLOY_MANIFEST_NAME)):
+            get_logger().info("Confirmed the deploy of the last delta")
+        else:
+            get_logger().warning("No delta was exported since the last confirmation")
+        return
+    tracer = Tracer() if args.trace else None
+    logger = get_logger()
+    preview = MemoryOutput(args.output) if args.serve is not None else None
+    build_cache = (
+        BuildCache(args.build_cache, args.static) if args.build_cache else None
+    )
+    if build_cache is not None and args.unpack_cache:
+        restored = build_cache.unpack(args.unpack_cache)
+        logger.info(
+            f'Restored {restored} build cache entries from "{args.unpack_cache}"'
+        )
+    if args.merge:
+        if keep_generations is None:
+            merge_shards(args.merge, args.output, args.content, args.drafts)
+        else:
+            staging = prepare_staging(args.output, reuse_previous=False)
+            try:
+                merge_shards(args.merge, staging, args.content, args.drafts)
+            except ShardError:
+                shutil.rmtree(staging)
+                raise
+            publish(staging, args.output, keep_generations)
+    elif preview is not None:
+        build(args, tracer, preview)
+    elif args.zip == "-":
+        archive = ZipOutput(args.output, sys.stdout.buffer)
+        build(args, tracer, archive)
+        archive.close()
+    elif args.zip:
+        with open_atomic(args.zip, "wb") as file:
+            archive = ZipOutput(args.output, cast(BinaryIO, file))
+            build(args, tracer, archive)
+            archive.close()
+        logger.info(f'Wrote site zip: "{args.zip}"')
+    else:
+        build(args, tracer)
+    if build_cache is not None and args.build_cache_size is not None:
+        build_cache.prune(args.build_cache_size * 1024 * 1024)
+    if build_cache is not None and args.pack_cache:
+        packed = build_cache.pack(args.pack_cache)
+        logger.info(f'Packed {packed} build cache entries into "{args.pack_cache}"')
+    if args.delta or args.delta_tar:
+        export_delta(
+            args.output,
+            None
+            if args.no_cache
+            else os.path.join(args.cache_dir, DEPLOY_MANIFEST_NAME),
+            args.delta,
+            args.delta_tar,
+        )
+    if tracer is not None:
+        tracer.write(args.trace)
+    if preview is not None and args.serve is not None:
+        from preview import serve
+
+        serve(preview, args.serve)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
     """Copy static files and generate pages for the site."""
-    copytree("static", "public")
-    generate_pages_recursive("template.html", "content/", "public/")
+    args = parse_args(argv)
+    logger = get_logger(
+        sys.stderr if "-" in (args.delta, args.delta_tar, args.zip) else None
+    )
+    logger.setLevel(args.log_level)
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    try:
+        if profiler is not None:
+            profiler.runcall(run, args)
+        else:
+            run(args)
+    except (PublishError, ShardError) as e:
+        logger.error(e)
+        sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+            logger.info(f'Saved profile: "{args.profile}"')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+import os
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipapp
+
+DEFAULT_TARGET = os.path.join("dist", "site-gen.pyz")
+INTERPRETER = "/usr/bin/env python3"
+
+
+def is_runtime_module(name: str) -> bool:
+    """Check whether a file of src/ is needed to run the generator."""
+    return (
+        name.endswith(".py")
+        and not name.startswith(("test_", "bench_"))
+        and name != os.path.basename(__file__)
+    )
+
+
+def build_zipapp(src_dir: str, target: str) -> str:
+    """Package the runtime modules of src_dir as an executable zipapp.
+
+    Each module is shipped with bytecode compiled next to it, which the
+    zip importer loads without checking the source, since it can't write
+    a __pycache__ of its own.
+    """
+    with tempfile.TemporaryDirectory() as staging:
+        for name in sorted(os.listdir(src_dir)):
+            if not is_runtime_module(name):
+                continue
+            src_path = os.path.join(staging, name)
+            shutil.copy2(os.path.join(src_dir, name), src_path)
+            py_compile.compile(
+                src_path,
+                cfile=src_path + "c",
+                dfile=name,
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        zipapp.create_archive(
+            staging, target, interpreter=INTERPRETER, compressed=False
+        )
+    return target
+
+
+def main() -> None:
+    """Build the zipapp at the path given as argument."""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TARGET
+    print(f'Built "{build_zipapp(src_dir, target)}"')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import gc
+import sys
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Allocations between young collections while rendering. Page trees have
+# no cycles and are freed by reference counting as each page is written,
+# so the default of 700 mostly rescans nodes that are still in use.
+RENDER_GC_THRESHOLDS = (50_000, 20, 100)
+
+
+@contextmanager
+def render_gc(enabled: bool = True) -> Iterator[None]:
+    """Collect less often while rendering, never rescanning older objects.
+
+    Objects alive on entry, such as modules, the plan and the indexes, are
+    collected once and frozen, so later collections only scan what the
+    render allocates. Workers forked from the process inherit both.
+    """
+    if not enabled:
+        yield
+        return
+    gc.collect()
+    gc.freeze()
+    thresholds = gc.get_threshold()
+    gc.set_threshold(*RENDER_GC_THRESHOLDS)
+    try:
+        yield
+    finally:
+        gc.set_threshold(*thresholds)
+        gc.unfreeze()
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident set size of the process in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_report() -> str:
+    """Summarize the peak memory of the process."""
+    peak = peak_rss()
+    if peak is None:
+        return "Peak memory: unknown on this platform"
+    return f"Peak memory: {peak / 2**20:.1f} MB resident"
@@ -0,0 +1,210 @@
+import json
+import os
+from typing import Optional, Union
+
+from copytree import list_files
+from fsutil import open_atomic
+from logger import get_logger
+
+FRONT_MATTER_DELIMITER = "---"
+HEADER_SCAN_BYTES = 8192
+METADATA_INDEX_VERSION = 1
+
+Value = Union[str, int, bool, list[str]]
+
+
+class FrontMatterError(Exception):
+    """Exception for malformed front matter."""
+
+    pass
+
+
+def parse_value(raw: str) -> Value:
+    """Parse a front matter scalar, boolean, integer or [list] value."""
+    raw = raw.strip()
+    if raw.startswith("[") and raw.endswith("]"):
+        return [str(parse_value(item)) for item in raw[1:-1].split(",") if item.strip()]
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        return raw[1:-1]
+    if raw.lower() in ("true", "false"):
+        return raw.lower() == "true"
+    if raw.lstrip("-").isdigit():
+        return int(raw)
+    return raw
+
+
+def parse_front_matter(lines: list[str]) -> dict[str, Value]:
+    """Parse "key: value" lines of a front matter block."""
+    metadata: dict[str, Value] = {}
+    for number, line in enumerate(lines, start=2):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, separator, raw = line.partition(":")
+        if not separator or not key.strip():
+            raise FrontMatterError(f'Expected "key: value" on line {number}: {line}')
+        metadata[key.strip()] = parse_value(raw)
+    return metadata
+
+
+def split_front_matter(text: str) -> tuple[dict[str, Value], str]:
+    """Split markdown into its front matter metadata and body.
+
+    Lines may end with "\r\n" or "\r", as in text posted from a form; the
+    body is returned with "\n" line endings.
+    """
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if not text.startswith(FRONT_MATTER_DELIMITER + "\n"):
+        return {}, text
+    lines = text.split("\n")
+    for i, line in enumerate(lines[1:], start=1):
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            body = "\n".join(lines[i + 1 :]).lstrip("\n")
+            return parse_front_matter(lines[1:i]), body
+    raise FrontMatterError('Front matter is never closed by a "---" line')
+
+
+def heading_title(line: str) -> Optional[str]:
+    """Return the text of a level-1 heading line, if it is one."""
+    if line.startswith("# "):
+        return line[2:].strip()
+    return None
+
+
+def read_header(path: str) -> dict[str, Value]:
+    """Read only the front matter and title line of a markdown file."""
+    with open(path, "r", encoding="utf-8") as file:
+        first = file.readline()
+        if first.rstrip("\n") != FRONT_MATTER_DELIMITER:
+            title = heading_title(first)
+            return {"title": title} if title else {}
+        lines, scanned = [], len(first)
+        for line in file:
+            scanned += len(line)
+            if scanned > HEADER_SCAN_BYTES:
+                raise FrontMatterError(
+                    f'Front matter of "{path}" is longer than {HEADER_SCAN_BYTES} bytes'
+                )
+            if line.rstrip() == FRONT_MATTER_DELIMITER:
+                break
+            lines.append(line.rstrip("\n"))
+        else:
+            raise FrontMatterError(f'Front matter of "{path}" is never closed')
+        metadata = parse_front_matter(lines)
+        if "title" not in metadata:
+            for line in file:
+                if line.strip():
+                    title = heading_title(line)
+                    if title:
+                        metadata["title"] = title
+                    break
+        return metadata
+
+
+class MetadataIndex:
+    """Persisted page metadata, refreshed from file headers when stale."""
+
+    def __init__(self, content_dir: str, cache_path: Optional[str] = None) -> None:
+        """Init an index of content_dir, optionally persisted to cache_path."""
+        self.content_dir = content_dir
+        self.cache_path = cache_path
+        self.entries: dict[str, dict] = {}
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def load(self) -> None:
+        """Load a previously saved index, ignoring incompatible files."""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            get_logger().info(f'Ignored metadata index "{self.cache_path}": {e}')
+            return
+        if data.get("version") == METADATA_INDEX_VERSION:
+            self.entries = data["entries"]
+
+    def save(self) -> None:
+        """Persist the index to its cache file."""
+        if not self.cache_path:
+            return
+        data = {"version": METADATA_INDEX_VERSION, "entries": self.entries}
+        with open_atomic(self.cache_path) as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+    def scan(self) -> list[str]:
+        """Refresh entries of new or modified pages; return their paths."""
+        changed, seen = [], set()
+        for path in list_files(self.content_dir):
+            if not path.endswith(".md"):
+                continue
+            relative_path = os.path.relpath(path, self.content_dir).replace(os.sep, "/")
+            seen.add(relative_path)
+            stat = os.stat(path)
+            entry = self.entries.get(relative_path)
+            if entry and (entry["mtime_ns"], entry["size"]) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                continue
+            try:
+                meta = read_header(path)
+            except (FrontMatterError, UnicodeDecodeError) as e:
+                get_logger().info(f'Ignored metadata of "{path}": {e}')
+                meta = {}
+            self.entries[relative_path] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "meta": meta,
+            }
+            changed.append(relative_path)
+        for relative_path in set(self.entries) - seen:
+            del self.entries[relative_path]
+        return changed
+
+    def get(self, relative_path: str) -> dict[str, Value]:
+        """Return the metadata of a page, or an empty dict if unknown."""
+        entry = self.entries.get(relative_path.replace(os.sep, "/"))
+        return entry["meta"] if entry else {}
+
+    def is_draft(self, relative_path: str) -> bool:
+        """Check whether a page is marked as a draft."""
+        return self.get(relative_path).get("draft") is True
+
+    def pages(
+        self,
+        directory: str = "",
+        tag: Optional[str] = None,
+        include_drafts: bool = False,
+    ) -> list[tuple[str, dict[str, Value]]]:
+        """List pages under directory, in navigation order.
+
+        Pages are sorted by their "order" value, then newest "date" first,
+        then path. A tag keeps only the pages listing it in "tags".
+        """
+        prefix = directory.strip("/") + "/" if directory.strip("/") else ""
+        pages = []
+        for relative_path, entry in self.entries.items():
+            meta = entry["meta"]
+            if not relative_path.startswith(prefix):
+                continue
+            if not include_drafts and meta.get("draft") is True:
+                continue
+            tags = meta.get("tags", [])
+            if tag is not None and tag not in (
+                tags if isinstance(tags, list) else [tags]
+            ):
+                continue
+            pages.append((relative_path, meta))
+        pages.sort(key=lambda page: page[0])
+        pages.sort(key=lambda page: str(page[1].get("date", "")), reverse=True)
+        pages.sort(key=lambda page: order_key(page[1].get("order")))
+        return pages
+
+
+def order_key(order: object) -> tuple[int, int]:
+    """Sort pages with an integer order first, in ascending order."""
+    return (
+        (0, order) if isinstance(order, int) and not isinstance(order, bool) else (1, 0)
+    )
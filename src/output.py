@@ -0,0 +1,162 @@
+import io
+import os
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, TextIO, cast
+
+from fsutil import WriteStats, file_digest, open_atomic, write_bytes
+from hashing import hash_bytes
+from logger import get_logger
+
+# Fixed timestamp of zip members, so the same site always zips the same.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class OutputError(Exception):
+    """Exception for files written outside of an output."""
+
+    pass
+
+
+class OutputBackend:
+    """Where a build writes its files, under paths rooted at root.
+
+    Subclasses store the bytes of each file in write and tell whether a
+    file exists; opening text files is built on those.
+    """
+
+    on_disk = False
+
+    def __init__(self, root: str) -> None:
+        """Init an output for paths under root."""
+        self.root = root
+
+    def name(self, path: str) -> str:
+        """Return the slash-separated path of a file relative to the root."""
+        name = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if name == "." or name.startswith("../"):
+            raise OutputError(f'Path "{path}" is outside of output "{self.root}"')
+        return name
+
+    def write(self, path: str, data: bytes, stats: Optional[WriteStats] = None) -> bool:
+        """Store data as the file at path; return True unless unchanged."""
+        raise NotImplementedError("Child classes will override this method")
+
+    def exists(self, path: str) -> bool:
+        """Check whether the file at path was written."""
+        raise NotImplementedError("Child classes will override this method")
+
+    def makedirs(self, path: str) -> None:
+        """Create a directory, for outputs that have directories."""
+        pass
+
+    @contextmanager
+    def open(self, path: str, stats: Optional[WriteStats] = None) -> Iterator[TextIO]:
+        """Open a text file that is written to path once closed."""
+        buffer = io.StringIO()
+        yield buffer
+        self.write(path, buffer.getvalue().encode("utf-8"), stats)
+
+    def close(self) -> None:
+        """Finish writing the output."""
+        pass
+
+
+class FileSystemOutput(OutputBackend):
+    """Write files to disk, skipping those that are unchanged."""
+
+    on_disk = True
+
+    def write(self, path: str, data: bytes, stats: Optional[WriteStats] = None) -> bool:
+        """Write data to path unless the file already holds the same bytes."""
+        return write_bytes(path, data, stats)
+
+    def exists(self, path: str) -> bool:
+        """Check whether path exists on disk."""
+        return os.path.exists(path)
+
+    def makedirs(self, path: str) -> None:
+        """Create a directory and its parents."""
+        os.makedirs(path, exist_ok=True)
+
+    @contextmanager
+    def open(self, path: str, stats: Optional[WriteStats] = None) -> Iterator[TextIO]:
+        """Open a file that atomically replaces path once closed."""
+        with open_atomic(path) as file:
+            yield cast(TextIO, file)
+        if stats is not None:
+            stats.record(path, file_digest(path), os.path.getsize(path), stats.written)
+
+
+class MemoryOutput(OutputBackend):
+    """Keep files in memory, such as a preview served without touching disk."""
+
+    def __init__(self, root: str) -> None:
+        """Init an empty tree for paths under root."""
+        super().__init__(root)
+        self.files: dict[str, bytes] = {}
+        self.lock = threading.Lock()
+
+    def write(self, path: str, data: bytes, stats: Optional[WriteStats] = None) -> bool:
+        """Keep data as the file at path."""
+        name = self.name(path)
+        with self.lock:
+            unchanged = self.files.get(name) == data
+            self.files[name] = data
+        if stats is not None:
+            outcome = stats.skipped if unchanged else stats.written
+            stats.record(path, hash_bytes(data), len(data), outcome)
+        return not unchanged
+
+    def exists(self, path: str) -> bool:
+        """Check whether the file at path was written."""
+        return self.name(path) in self.files
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Return the file at a path relative to the root, if written."""
+        return self.files.get(name)
+
+
+class ZipOutput(OutputBackend):
+    """Stream files into a zip archive, such as a preview to upload.
+
+    The archive can be written to a pipe, as members are never revisited.
+    """
+
+    def __init__(self, root: str, file: BinaryIO) -> None:
+        """Init a zip of paths under root written to a binary file."""
+        import zipfile
+
+        super().__init__(root)
+        self.zip = zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED)
+        self.digests: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def write(self, path: str, data: bytes, stats: Optional[WriteStats] = None) -> bool:
+        """Add data as a member, unless the same member was already added."""
+        import zipfile
+
+        name, digest = self.name(path), hash_bytes(data)
+        with self.lock:
+            previous = self.digests.get(name)
+            if previous is None:
+                info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                self.zip.writestr(info, data)
+                self.digests[name] = digest
+        if previous is not None and previous != digest:
+            raise OutputError(f'Zip member "{name}" was already written')
+        if stats is not None:
+            outcome = stats.written if previous is None else stats.skipped
+            stats.record(path, digest, len(data), outcome)
+        return previous is None
+
+    def exists(self, path: str) -> bool:
+        """Check whether the member of path was added."""
+        return self.name(path) in self.digests
+
+    def close(self) -> None:
+        """Write the central directory of the archive."""
+        self.zip.close()
+        get_logger().info(f"Zipped {len(self.digests)} files")
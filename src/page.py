@@ -1,7 +1,17 @@
 import os
+from typing import Optional
 
+from assets import AssetInliner
+from buildcache import BuildCache, static_dependencies
 from converter import markdown_text_to_html_node
+from fsutil import WriteStats, write_bytes
+from hints import ResourceHints
+from htmlnode import escape_text
+from images import ImageIndex, annotate_images
+from linkcheck import LinkChecker, link_targets
 from logger import get_logger
+from metadata import split_front_matter
+from output import FileSystemOutput, OutputBackend
 
 
 class MarkdownTitleError(Exception):
@@ -37,27 +47,80 @@ def read_file(file_path: str) -> str:
     return content
 
 
-def write_file(file_path: str, data: str) -> None:
-    """Write data to file, ensuring directory exists."""
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+def write_file(
+    file_path: str,
+    data: str,
+    stats: Optional[WriteStats] = None,
+) -> bool:
+    """Write data to file unless it is unchanged; return True if written."""
     try:
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(data)
+        return write_bytes(file_path, data.encode("utf-8"), stats)
     except IOError as e:
         raise IOError(f'Could not write data to "{file_path}": {e}')
 
 
-def generate_page(template_path: str, src_path: str, dst_path: str) -> None:
-    """Generate an HTML page from markdown and a template."""
+def generate_page(
+    template_path: str,
+    src_path: str,
+    dst_path: str,
+    images: Optional[ImageIndex] = None,
+    inliner: Optional[AssetInliner] = None,
+    checker: Optional[LinkChecker] = None,
+    stats: Optional[WriteStats] = None,
+    template: Optional[str] = None,
+    cache: Optional[BuildCache] = None,
+    output: Optional[OutputBackend] = None,
+    hints: Optional[ResourceHints] = None,
+) -> None:
+    """Generate an HTML page from markdown and a template.
+
+    A template text already read, or rewritten, replaces template_path.
+    With a build cache, a page rendered before from the same inputs is
+    reused instead of rendered. The page is written to output when given,
+    otherwise to disk. With hints, the assets and pages it references are
+    preloaded or prefetched, and recorded as Link headers.
+    """
     logger = get_logger()
     try:
-        template, markdown = read_file(template_path), read_file(src_path)
-        html = markdown_text_to_html_node(markdown).to_html()
-        title = extract_title(markdown)
-        page = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
+        if template is None:
+            template = read_file(template_path)
+        markdown = read_file(src_path)
+        key, page, targets = None, None, []
+        if cache is not None:
+            key = cache.key(markdown, template)
+            entry = cache.get_entry(key)
+            if entry is not None:
+                page = entry["output"]
+                targets = [(kind, target) for kind, target in entry["links"]]
+        if page is None:
+            metadata, body = split_front_matter(markdown)
+            node = markdown_text_to_html_node(body)
+            dependencies = static_dependencies(node)
+            targets = link_targets(node)
+            annotate_images(node, images)
+            if inliner is not None:
+                template = inliner.inline_stylesheets(template)
+                inliner.inline_images(node)
+            page_hints = hints.collect(template, node) if hints is not None else []
+            html = node.to_html()
+            title = escape_text(str(metadata.get("title") or extract_title(body)))
+            page = template.replace("{{ Title }}", title)
+            page = page.replace("{{ Content }}", html)
+            if hints is not None:
+                page = hints.add_tags(page, page_hints)
+            if cache is not None and key is not None:
+                cache.put(key, page, dependencies, targets)
+        if checker is not None:
+            checker.check(src_path, dst_path, markdown, targets)
         if src_path.endswith(".md"):
-            dst_path = dst_path.rsplit(".", 1)[0] + ".html"
-            write_file(dst_path, page)
+            if not dst_path.endswith(".html"):
+                dst_path = dst_path.rsplit(".", 1)[0] + ".html"
+            if hints is not None:
+                hints.record(dst_path, page)
+            if output is not None:
+                output.write(dst_path, page.encode("utf-8"), stats)
+            else:
+                write_file(dst_path, page, stats)
     except Exception as e:
         logger.info(e)
     logger.info(f'Generated page: from "{src_path}" to "{dst_path}"')
@@ -67,15 +130,28 @@ def generate_pages_recursive(
     template_path: str,
     current_src: str,
     current_dst: str,
+    images: Optional[ImageIndex] = None,
+    inliner: Optional[AssetInliner] = None,
+    output: Optional[OutputBackend] = None,
 ) -> None:
-    """Recursively generate HTML pages from markdown files."""
+    """Recursively generate HTML pages from markdown files into output."""
     logger = get_logger()
-    os.makedirs(current_dst, exist_ok=True)
-    for branch in os.listdir(current_src):
+    output = output if output is not None else FileSystemOutput(current_dst)
+    output.makedirs(current_dst)
+    for branch in sorted(os.listdir(current_src)):
         src_path = os.path.join(current_src, branch)
         dst_path = os.path.join(current_dst, branch)
         if os.path.isfile(src_path):
-            generate_page(template_path, src_path, dst_path)
+            generate_page(
+                template_path,
+                src_path,
+                dst_path,
+                images,
+                inliner,
+                output=output,
+            )
         elif os.path.isdir(src_path):
-            generate_pages_recursive(template_path, src_path, dst_path)
+            generate_pages_recursive(
+                template_path, src_path, dst_path, images, inliner, output
+            )
     logger.info(f'Generated all pages: from "{current_src}" to {current_dst}"')
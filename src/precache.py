@@ -0,0 +1,125 @@
+import fnmatch
+import json
+import os
+import re
+from typing import Optional
+
+from copytree import list_files
+from fsutil import WriteStats, file_digest, open_atomic, write_bytes
+from hints import LINK_HEADERS_PATH
+from logger import get_logger
+
+PRECACHE_MANIFEST_PATH = "precache-manifest.json"
+PRECACHE_STATE_VERSION = 1
+DEFAULT_MAX_FILE_SIZE = 2 * 1024 * 1024
+DEFAULT_EXCLUDE = (LINK_HEADERS_PATH,)
+REVISION_LENGTH = 16
+
+
+def globs_pattern(globs: list[str]) -> re.Pattern:
+    """Compile globs into a pattern matching names that any of them match."""
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs) or "(?!)")
+
+
+class PrecacheManifest:
+    """Revision of every file of a site, for a service worker to precache.
+
+    Files are listed by walking the output dir, following symlinks such as
+    those of static files in symlink mode, and revised with the digest
+    the build computed when it wrote them. Files the build skipped, such as
+    unchanged static copies or listings, keep the revision of the previous
+    build while their size and mtime match, and are hashed otherwise.
+    Names match the include globs and none of the exclude globs, where "*"
+    also matches "/", and files larger than max_file_size are left out.
+    """
+
+    def __init__(
+        self,
+        include: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+        state_path: Optional[str] = None,
+    ) -> None:
+        """Init an empty manifest, reusing revisions kept in state_path."""
+        self.include = globs_pattern(include or ["*"])
+        self.exclude = globs_pattern([*DEFAULT_EXCLUDE, *(exclude or [])])
+        self.max_file_size = max_file_size
+        self.state_path = state_path
+        self.files: dict[str, list] = {}
+        self.previous: dict[str, list] = {}
+        self.hashed = 0
+        self.too_large = 0
+
+    def load(self) -> None:
+        """Load the revisions of the previous build, if any."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            get_logger().info(f'Ignored precache state "{self.state_path}": {e}')
+            return
+        if data.get("version") == PRECACHE_STATE_VERSION:
+            self.previous = data["files"]
+
+    def save(self) -> None:
+        """Keep the revisions of this build for the next one."""
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        data = {"version": PRECACHE_STATE_VERSION, "files": self.files}
+        with open_atomic(self.state_path) as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+    def matches(self, name: str) -> bool:
+        """Check whether the globs keep a file name."""
+        return (
+            name != PRECACHE_MANIFEST_PATH
+            and bool(self.include.fullmatch(name))
+            and not self.exclude.fullmatch(name)
+        )
+
+    def update(self, public_dir: str, digests: dict[str, str]) -> None:
+        """Revise every kept file of public_dir, from digests by path first."""
+        self.load()
+        self.files, self.hashed, self.too_large = {}, 0, 0
+        for path in list_files(public_dir, follow_links=True):
+            name = os.path.relpath(path, public_dir).replace(os.sep, "/")
+            if not self.matches(name):
+                continue
+            stat = os.stat(path)
+            if stat.st_size > self.max_file_size:
+                self.too_large += 1
+                continue
+            digest = digests.get(path)
+            previous = self.previous.get(name)
+            if digest is None and previous is not None:
+                if previous[:2] == [stat.st_mtime_ns, stat.st_size]:
+                    digest = previous[2]
+            if digest is None:
+                digest = file_digest(path) or ""
+                self.hashed += 1
+            self.files[name] = [stat.st_mtime_ns, stat.st_size, digest]
+
+    def entries(self) -> list[dict[str, str]]:
+        """List the {"url", "revision"} entries of the manifest, by URL."""
+        return [
+            {"url": "/" + name, "revision": self.files[name][2][:REVISION_LENGTH]}
+            for name in sorted(self.files)
+        ]
+
+    def write(self, public_dir: str, stats: Optional[WriteStats] = None) -> str:
+        """Write the manifest into public_dir and save the revisions."""
+        path = os.path.join(public_dir, PRECACHE_MANIFEST_PATH)
+        data = json.dumps(self.entries(), indent=2).encode("utf-8")
+        write_bytes(path, data, stats)
+        self.save()
+        return path
+
+    def report(self) -> str:
+        """Summarize the files listed."""
+        return (
+            f"Precache manifest: {len(self.files)} files, {self.hashed} hashed, "
+            f"{self.too_large} over {self.max_file_size} bytes left out"
+        )
@@ -0,0 +1,89 @@
+import mimetypes
+import posixpath
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, cast
+from urllib.parse import unquote, urlsplit
+
+from hints import LINK_HEADERS_PATH, load_link_headers
+from logger import get_logger
+from output import MemoryOutput
+
+NOT_FOUND_PAGE = "404.html"
+
+
+def resolve_name(output: MemoryOutput, url_path: str) -> Optional[str]:
+    """Find the file of a URL path in the output, as a static server would."""
+    name = posixpath.normpath("/" + unquote(url_path)).lstrip("/")
+    candidates = [posixpath.join(name, "index.html")]
+    if not url_path.endswith("/"):
+        candidates = [name, *candidates, f"{name}.html"]
+    for candidate in candidates:
+        if output.read(candidate) is not None:
+            return candidate
+    return None
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """Serve the files of the MemoryOutput of the server."""
+
+    def send_file(self, with_body: bool) -> None:
+        """Answer with the file of the requested path, or the 404 page."""
+        server = cast("PreviewServer", self.server)
+        output = server.output
+        name = resolve_name(output, urlsplit(self.path).path)
+        status = 200
+        if name is None:
+            status, name = 404, NOT_FOUND_PAGE
+        data = output.read(name)
+        if data is None:
+            self.send_error(404)
+            return
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        if name in server.link_headers:
+            self.send_header("Link", server.link_headers[name])
+        self.end_headers()
+        if with_body:
+            self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        """Serve a file."""
+        self.send_file(True)
+
+    def do_HEAD(self) -> None:
+        """Serve the headers of a file."""
+        self.send_file(False)
+
+    def log_message(self, format: str, *args) -> None:
+        """Log requests through the build logger."""
+        get_logger().debug(f"Preview: {format % args}")
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """HTTP server of a site built into memory.
+
+    Pages are served with the Link headers of their resource hints.
+    """
+
+    def __init__(self, address: tuple[str, int], output: MemoryOutput) -> None:
+        """Init a server of output listening on address."""
+        super().__init__(address, PreviewHandler)
+        self.output = output
+        self.link_headers = load_link_headers(output.read(LINK_HEADERS_PATH))
+
+
+def serve(output: MemoryOutput, port: int, host: str = "localhost") -> None:
+    """Serve a site built into memory until interrupted."""
+    logger = get_logger()
+    with PreviewServer((host, port), output) as server:
+        logger.warning(
+            f"Serving {len(output.files)} files on http://{host}:{port}/ "
+            "(Ctrl+C to stop)"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopped preview server")
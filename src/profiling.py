@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from fsutil import open_atomic
+
+
+class Tracer:
+    """Record how long each build phase takes, as Chrome trace events."""
+
+    def __init__(self) -> None:
+        """Init a tracer whose timestamps start now."""
+        self.start = time.perf_counter()
+        self.events: list[dict] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a complete event named name."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((begin - self.start) * 1e6),
+                    "dur": round((end - begin) * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def summary(self) -> str:
+        """Describe the duration of each recorded phase."""
+        return ", ".join(
+            f"{event['name']} {event['dur'] / 1000:.1f}ms" for event in self.events
+        )
+
+    def write(self, path: str) -> None:
+        """Save the events for chrome://tracing or Perfetto."""
+        with open_atomic(path) as file:
+            json.dump({"traceEvents": self.events}, file)
+
+
+@contextmanager
+def span(tracer: Optional[Tracer], name: str) -> Iterator[None]:
+    """Time a block with tracer, or do nothing without one."""
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name):
+        yield
@@ -0,0 +1,161 @@
+import os
+import shutil
+from typing import Optional
+
+from copytree import list_files
+from logger import get_logger
+
+GENERATIONS_SUFFIX = ".generations"
+STAGING_PREFIX = ".staging-"
+
+
+class PublishError(Exception):
+    """Exception for failed publishing or rollback of a site generation."""
+
+    pass
+
+
+def generations_dir(public_dir: str) -> str:
+    """Return the directory holding the generations of public_dir."""
+    return os.path.normpath(public_dir) + GENERATIONS_SUFFIX
+
+
+def list_generations(public_dir: str) -> list[str]:
+    """List published generation names, oldest first."""
+    directory = generations_dir(public_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.isdigit())
+
+
+def current_generation(public_dir: str) -> Optional[str]:
+    """Return the path of the generation public_dir points to, if any."""
+    public_dir = os.path.normpath(public_dir)
+    if not os.path.islink(public_dir):
+        return None
+    return os.path.realpath(public_dir)
+
+
+def link_tree(src_dir: str, dst_dir: str) -> int:
+    """Hardlink every file of src_dir into dst_dir; return files linked.
+
+    Falls back to copying when the filesystem refuses hardlinks.
+    """
+    linked = 0
+    for src_path in list_files(src_dir):
+        dst_path = os.path.join(dst_dir, os.path.relpath(src_path, src_dir))
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if os.path.islink(src_path):
+            os.symlink(os.readlink(src_path), dst_path)
+            linked += 1
+            continue
+        try:
+            os.link(src_path, dst_path)
+        except OSError:
+            shutil.copy2(src_path, dst_path)
+        linked += 1
+    return linked
+
+
+def prepare_staging(public_dir: str, reuse_previous: bool = True) -> str:
+    """Create a staging dir for the next generation of public_dir.
+
+    Unless reuse_previous is False, it starts as hardlinks to the files of
+    the current generation, which writers replace rather than modify.
+    """
+    logger = get_logger()
+    directory = generations_dir(public_dir)
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.startswith(STAGING_PREFIX):
+                shutil.rmtree(os.path.join(directory, name))
+    generations = list_generations(public_dir)
+    number = int(generations[-1]) + 1 if generations else 1
+    staging = os.path.join(directory, f"{STAGING_PREFIX}{number:06d}")
+    os.makedirs(staging)
+    previous = current_generation(public_dir)
+    if previous is None and os.path.isdir(public_dir):
+        previous = public_dir
+    if reuse_previous and previous and os.path.isdir(previous):
+        linked = link_tree(previous, staging)
+        logger.info(f'Staged "{staging}" from {linked} files of "{previous}"')
+    return staging
+
+
+def remove_stale_files(staging: str, outputs: set[str]) -> int:
+    """Delete files of a staging dir that the build didn't produce."""
+    keep = {os.path.normpath(path) for path in outputs}
+    removed = 0
+    for path in list_files(staging):
+        if os.path.normpath(path) not in keep:
+            os.unlink(path)
+            removed += 1
+    return removed
+
+
+def point_to(public_dir: str, generation: str) -> None:
+    """Atomically swap the public_dir symlink to a generation dir."""
+    public_dir = os.path.normpath(public_dir)
+    parent = os.path.dirname(public_dir) or "."
+    target = os.path.relpath(generation, parent)
+    tmp_link = public_dir + ".tmp-link"
+    if os.path.lexists(tmp_link):
+        os.unlink(tmp_link)
+    os.symlink(target, tmp_link)
+    os.replace(tmp_link, public_dir)
+
+
+def adopt_directory(public_dir: str) -> None:
+    """Move a plain public_dir into the generations as its first one."""
+    public_dir = os.path.normpath(public_dir)
+    if os.path.islink(public_dir) or not os.path.isdir(public_dir):
+        return
+    directory = generations_dir(public_dir)
+    os.makedirs(directory, exist_ok=True)
+    generations = list_generations(public_dir)
+    number = int(generations[0]) - 1 if generations else 0
+    os.rename(public_dir, os.path.join(directory, f"{number:06d}"))
+    get_logger().info(f'Moved "{public_dir}" into generation {number:06d}')
+
+
+def publish(staging: str, public_dir: str, keep: int) -> str:
+    """Publish a staging dir as the live generation, keeping keep old ones."""
+    logger = get_logger()
+    name = os.path.basename(staging)[len(STAGING_PREFIX) :]
+    generation = os.path.join(os.path.dirname(staging), name)
+    os.rename(staging, generation)
+    adopt_directory(public_dir)
+    point_to(public_dir, generation)
+    logger.info(f'Published generation {name}: "{public_dir}" -> "{generation}"')
+    prune_generations(public_dir, keep)
+    return generation
+
+
+def prune_generations(public_dir: str, keep: int) -> None:
+    """Delete all but the current and the keep most recent older generations."""
+    current = current_generation(public_dir)
+    directory = generations_dir(public_dir)
+    older = [
+        os.path.join(directory, name)
+        for name in list_generations(public_dir)
+        if os.path.realpath(os.path.join(directory, name)) != current
+    ]
+    for path in older[: max(len(older) - keep, 0)]:
+        shutil.rmtree(path)
+        get_logger().info(f'Pruned generation: "{path}"')
+
+
+def rollback(public_dir: str, steps: int = 1) -> str:
+    """Point public_dir back to an older generation."""
+    current = current_generation(public_dir)
+    directory = generations_dir(public_dir)
+    paths = [os.path.join(directory, name) for name in list_generations(public_dir)]
+    resolved = [os.path.realpath(path) for path in paths]
+    if current not in resolved:
+        raise PublishError(f'"{public_dir}" doesn\'t point to a known generation')
+    index = resolved.index(current) - steps
+    if index < 0:
+        raise PublishError(f"Can't roll back {steps} generations from {current}")
+    point_to(public_dir, paths[index])
+    get_logger().info(f'Rolled back "{public_dir}" to "{paths[index]}"')
+    return paths[index]
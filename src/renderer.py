@@ -0,0 +1,81 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import TextIO
+
+from converter import markdown_text_to_html_node
+from hashing import hash_bytes
+from htmlnode import escape_text
+from metadata import heading_title, split_front_matter
+
+TEMPLATE_PLACEHOLDER_PATTERN = re.compile(r"(\{\{ Title \}\}|\{\{ Content \}\})")
+DEFAULT_TEMPLATE = "{{ Content }}"
+DEFAULT_CACHE_SIZE = 256
+
+
+class Renderer:
+    """Reusable, thread-safe markdown to HTML renderer with no file access."""
+
+    def __init__(
+        self,
+        template: str = DEFAULT_TEMPLATE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        """Init a renderer around a template, caching cache_size documents."""
+        self.parts = TEMPLATE_PLACEHOLDER_PATTERN.split(template)
+        self.cache_size = cache_size
+        self.cache: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def convert(self, markdown: str) -> tuple[str, str]:
+        """Return the escaped title and HTML body of a markdown document."""
+        key = hash_bytes(markdown.encode("utf-8")) if self.cache_size > 0 else ""
+        if key:
+            with self.lock:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache.move_to_end(key)
+                    return cached
+        metadata, body = split_front_matter(markdown)
+        title = metadata.get("title") or heading_title(body.split("\n", 1)[0]) or ""
+        result = escape_text(str(title)), markdown_text_to_html_node(body).to_html()
+        if key:
+            with self.lock:
+                self.cache[key] = result
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result
+
+    def render_html(self, markdown: str) -> str:
+        """Render a markdown document to an HTML fragment."""
+        return self.convert(markdown)[1]
+
+    def render(self, markdown: str) -> str:
+        """Render a markdown document into the template."""
+        title, html = self.convert(markdown)
+        return "".join(self.fill(title, html))
+
+    def render_to(self, markdown: str, stream: TextIO) -> None:
+        """Write a markdown document rendered into the template to a stream."""
+        title, html = self.convert(markdown)
+        for part in self.fill(title, html):
+            stream.write(part)
+
+    def fill(self, title: str, html: str) -> list[str]:
+        """Substitute the placeholders of the template."""
+        return [
+            title
+            if part == "{{ Title }}"
+            else html
+            if part == "{{ Content }}"
+            else part
+            for part in self.parts
+        ]
+
+
+def render(markdown: str) -> str:
+    """Render a markdown document to an HTML fragment with a shared renderer."""
+    return DEFAULT_RENDERER.render_html(markdown)
+
+
+DEFAULT_RENDERER = Renderer()
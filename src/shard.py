@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+from typing import Optional
+
+from copytree import list_files
+from fsutil import open_atomic
+from hashing import hash_bytes
+from hints import LINK_HEADERS_PATH
+from logger import get_logger
+from metadata import MetadataIndex
+
+SHARD_MANIFEST_NAME = ".shard-manifest.json"
+
+
+class ShardError(Exception):
+    """Exception for invalid shard specs or incomplete shard merges."""
+
+    pass
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse an "i/n" shard spec into a 1-based (index, count) pair."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError as e:
+        raise ShardError(f'Shard spec must look like "i/n", got "{spec}"') from e
+    if count < 1 or not 1 <= index <= count:
+        raise ShardError(f'Shard index must be between 1 and {count}, got "{spec}"')
+    return index, count
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """Return the 1-based shard owning a path, stable across machines."""
+    key = relative_path.replace(os.sep, "/").encode("utf-8")
+    return int(hash_bytes(key)[:16], 16) % count + 1
+
+
+def select_shard(
+    plan: list[tuple[str, str]],
+    content_dir: str,
+    shard: tuple[int, int],
+) -> list[tuple[str, str]]:
+    """Keep the planned pages whose source path belongs to the shard."""
+    index, count = shard
+    return [
+        (src_path, dst_path)
+        for src_path, dst_path in plan
+        if shard_of(os.path.relpath(src_path, content_dir), count) == index
+    ]
+
+
+def file_digest(path: str) -> str:
+    """Return the content hash of a file."""
+    with open(path, "rb") as file:
+        return hash_bytes(file.read())
+
+
+def write_shard_manifest(
+    public_dir: str,
+    shard: tuple[int, int],
+    pages: list[str],
+) -> str:
+    """Record every file of a shard output dir with the pages it rendered."""
+    manifest_path = os.path.join(public_dir, SHARD_MANIFEST_NAME)
+    files = {
+        os.path.relpath(path, public_dir).replace(os.sep, "/"): file_digest(path)
+        for path in list_files(public_dir)
+        if path != manifest_path
+    }
+    manifest = {
+        "shard": list(shard),
+        "pages": sorted(page.replace(os.sep, "/") for page in pages),
+        "files": files,
+    }
+    with open_atomic(manifest_path) as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest_path
+
+
+def read_shard_manifest(shard_dir: str) -> dict:
+    """Load the manifest written by a shard build."""
+    manifest_path = os.path.join(shard_dir, SHARD_MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        raise ShardError(f'Could not read shard manifest "{manifest_path}": {e}')
+
+
+def merge_shards(
+    shard_dirs: list[str],
+    public_dir: str,
+    content_dir: str,
+    include_drafts: bool = False,
+) -> None:
+    """Assemble shard outputs into public_dir, verifying complete coverage.
+
+    Every page of content_dir must come from a shard, except drafts unless
+    include_drafts is set, as shard builds skip them the same way. Every
+    shard is verified before public_dir is replaced. The Link headers
+    each shard wrote for its own pages are merged into a single map.
+    """
+    logger = get_logger()
+    manifests = [
+        (shard_dir, read_shard_manifest(shard_dir)) for shard_dir in shard_dirs
+    ]
+    counts = {manifest["shard"][1] for _, manifest in manifests}
+    if len(counts) != 1:
+        raise ShardError(f"Shards come from different partitions: {sorted(counts)}")
+    count = counts.pop()
+    indexes = sorted(manifest["shard"][0] for _, manifest in manifests)
+    if indexes != list(range(1, count + 1)):
+        raise ShardError(f"Expected shards 1 to {count}, got {indexes}")
+
+    rendered: set[str] = set()
+    for _, manifest in manifests:
+        rendered.update(manifest["pages"])
+    index = MetadataIndex(content_dir)
+    index.scan()
+    expected = {
+        relative_path.replace(os.sep, "/")
+        for relative_path in (
+            os.path.relpath(path, content_dir) for path in list_files(content_dir)
+        )
+        if relative_path.endswith(".md")
+        and (include_drafts or not index.is_draft(relative_path))
+    }
+    missing = sorted(expected - rendered)
+    if missing:
+        raise ShardError(f"Pages missing from every shard: {missing}")
+
+    merged: dict[str, str] = {}
+    copies = []
+    link_headers: Optional[dict[str, list[str]]] = None
+    for shard_dir, manifest in manifests:
+        for relative_path, digest in manifest["files"].items():
+            if relative_path in merged and relative_path != LINK_HEADERS_PATH:
+                if merged[relative_path] != digest:
+                    raise ShardError(
+                        f'Shards disagree on the content of "{relative_path}"'
+                    )
+                continue
+            merged[relative_path] = digest
+            src_path = os.path.join(shard_dir, relative_path)
+            if file_digest(src_path) != digest:
+                raise ShardError(f'File "{src_path}" doesn\'t match its manifest')
+            if relative_path == LINK_HEADERS_PATH:
+                with open(src_path, "r", encoding="utf-8") as file:
+                    link_headers = {**(link_headers or {}), **json.load(file)}
+                continue
+            copies.append((src_path, os.path.join(public_dir, relative_path)))
+
+    if os.path.exists(public_dir):
+        shutil.rmtree(public_dir)
+    for src_path, dst_path in copies:
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        shutil.copy2(src_path, dst_path)
+    if link_headers is not None:
+        with open_atomic(os.path.join(public_dir, LINK_HEADERS_PATH)) as file:
+            json.dump(link_headers, file, indent=2, sort_keys=True)
+    logger.info(f'Merged {count} shards into "{public_dir}": {len(rendered)} pages')
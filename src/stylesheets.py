@@ -0,0 +1,229 @@
+import json
+import os
+import posixpath
+import re
+from typing import Optional
+
+from assets import HREF_PATTERN, STYLESHEET_LINK_PATTERN, STYLESHEET_REL_PATTERN
+from fsutil import WriteStats, open_atomic
+from hashing import FileHasher, hash_bytes
+from images import resolve_static_path
+from logger import get_logger
+from output import FileSystemOutput, OutputBackend
+
+STYLESHEET_CACHE_VERSION = 1
+FINGERPRINT_LENGTH = 10
+
+CSS_IMPORT_PATTERN = re.compile(
+    r"""@import\s+(?:url\(\s*)?(["']?)([^"')\s;]+)\1\s*\)?\s*([^;]*);""",
+    re.IGNORECASE,
+)
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""", re.IGNORECASE)
+CSS_TOKEN_PATTERN = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*[\s\S]*?\*/)|(\s+)|([^"'/\s]+|/)"""
+)
+SPACE_FREE_AFTER = frozenset("{};,>:(")
+SPACE_FREE_BEFORE = frozenset("{};,>)")
+
+
+class StylesheetError(Exception):
+    """Exception for stylesheets that can't be bundled."""
+
+    pass
+
+
+def is_local_url(url: str) -> bool:
+    """Check whether a CSS url() or @import target is a path on this site."""
+    return not re.match(r"^(?:[a-z][a-z0-9+.-]*:|//|#)", url, re.IGNORECASE)
+
+
+def rebase_urls(css: str, from_url: str, to_url: str) -> str:
+    """Rewrite relative url() references of a stylesheet moved between dirs."""
+    from_dir, to_dir = posixpath.dirname(from_url), posixpath.dirname(to_url)
+    if from_dir == to_dir:
+        return css
+
+    def replace(match: re.Match) -> str:
+        quote, target = match.group(1), match.group(2)
+        if not is_local_url(target) or target.startswith("/"):
+            return match.group(0)
+        moved = posixpath.relpath(posixpath.join(from_dir, target), to_dir)
+        return f"url({quote}{moved}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and whitespace that don't change the meaning of CSS.
+
+    Strings are kept as they are, and a space is only dropped next to
+    punctuation where it can't separate two selectors or values.
+    """
+    parts: list[str] = []
+    pending_space = False
+    for string, comment, space, other in CSS_TOKEN_PATTERN.findall(css):
+        if comment:
+            continue
+        if space:
+            pending_space = True
+            continue
+        token = string or other.replace(";}", "}")
+        if token[0] == "}" and parts and parts[-1].endswith(";"):
+            parts[-1] = parts[-1][:-1]
+            if not parts[-1]:
+                parts.pop()
+        if pending_space and parts:
+            if parts[-1][-1] not in SPACE_FREE_AFTER and token[0] not in (
+                SPACE_FREE_BEFORE
+            ):
+                parts.append(" ")
+        pending_space = False
+        parts.append(token)
+    return "".join(parts)
+
+
+class StylesheetBundler:
+    """Bundle the local stylesheets of a template into fingerprinted files.
+
+    Each bundle resolves local @imports into a single minified file. It is
+    cached by the hashes of all its input files, so unchanged CSS is only
+    read to be hashed.
+    """
+
+    def __init__(
+        self,
+        static_dir: str,
+        cache_path: Optional[str] = None,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        """Init a bundler for stylesheets under static_dir."""
+        self.static_dir = static_dir
+        self.cache_path = cache_path
+        self.hasher = hasher if hasher is not None else FileHasher()
+        self.entries: dict[str, dict] = {}
+        self.bundles: dict[str, str] = {}
+        self.rebuilt = 0
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def load(self) -> None:
+        """Load previously built bundles from the cache file."""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            get_logger().info(f'Ignored stylesheet cache "{self.cache_path}": {e}')
+            return
+        if data.get("version") == STYLESHEET_CACHE_VERSION:
+            self.entries = data["entries"]
+
+    def save(self) -> None:
+        """Persist the bundles to the cache file."""
+        if not self.cache_path:
+            return
+        data = {"version": STYLESHEET_CACHE_VERSION, "entries": self.entries}
+        with open_atomic(self.cache_path) as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+    def resolve(self, url: str, inputs: dict[str, str], stack: list[str]) -> str:
+        """Inline the local @imports of a stylesheet, recording its inputs."""
+        path = resolve_static_path(url, self.static_dir)
+        if path is None or not os.path.isfile(path):
+            raise StylesheetError(f'Stylesheet "{url}" not found in static dir')
+        if url in stack:
+            raise StylesheetError(f"Circular @import: {' -> '.join([*stack, url])}")
+        inputs[url] = self.hasher.hash_file(path) or ""
+        with open(path, "r", encoding="utf-8") as file:
+            css = file.read()
+
+        def replace(match: re.Match) -> str:
+            target, media = match.group(2), match.group(3).strip()
+            if not is_local_url(target):
+                return match.group(0)
+            target_url = posixpath.normpath(
+                posixpath.join(posixpath.dirname(url), target)
+            )
+            imported = self.resolve(target_url, inputs, [*stack, url])
+            imported = rebase_urls(imported, target_url, url)
+            return f"@media {media}{{{imported}}}" if media else imported
+
+        return CSS_IMPORT_PATTERN.sub(replace, css)
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Check whether none of the inputs of a cached bundle changed."""
+        for url, digest in entry["inputs"].items():
+            path = resolve_static_path(url, self.static_dir)
+            if path is None or self.hasher.hash_file(path) != digest:
+                return False
+        return True
+
+    def bundle(self, url: str) -> str:
+        """Return the fingerprinted URL of the bundle of a stylesheet URL."""
+        entry = self.entries.get(url)
+        if entry is None or not self.is_fresh(entry):
+            inputs: dict[str, str] = {}
+            css = minify_css(self.resolve(url, inputs, []))
+            digest = hash_bytes(css.encode("utf-8"))[:FINGERPRINT_LENGTH]
+            stem, extension = posixpath.splitext(url)
+            entry = self.entries[url] = {
+                "inputs": inputs,
+                "url": f"{stem}.{digest}{extension}",
+                "css": css,
+            }
+            self.rebuilt += 1
+        self.bundles[entry["url"]] = entry["css"]
+        return entry["url"]
+
+    def rewrite_template(self, template: str) -> str:
+        """Point the local stylesheet links of a template to their bundles."""
+        logger = get_logger()
+
+        def replace(match: re.Match) -> str:
+            tag = match.group(0)
+            href = HREF_PATTERN.search(tag)
+            if not href or not STYLESHEET_REL_PATTERN.search(tag):
+                return tag
+            url = href.group(1)
+            if not url.startswith("/") or not is_local_url(url):
+                return tag
+            try:
+                bundled = self.bundle(url)
+            except (StylesheetError, UnicodeDecodeError) as e:
+                logger.warning(f'Kept stylesheet "{url}" unbundled: {e}')
+                return tag
+            return tag[: href.start(1)] + bundled + tag[href.end(1) :]
+
+        return STYLESHEET_LINK_PATTERN.sub(replace, template)
+
+    def write(
+        self,
+        output_dir: str,
+        stats: Optional[WriteStats] = None,
+        output: Optional[OutputBackend] = None,
+    ) -> dict[str, str]:
+        """Write the bundles used by the build; return their paths by URL.
+
+        A bundle is never written through a directory symlink leading out
+        of output_dir, such as into the static dir of a preview.
+        """
+        output = output if output is not None else FileSystemOutput(output_dir)
+        root = os.path.realpath(output_dir)
+        paths = {}
+        for url, css in sorted(self.bundles.items()):
+            path = paths[url] = os.path.join(output_dir, url.lstrip("/"))
+            directory = os.path.realpath(os.path.dirname(path))
+            if output.on_disk and os.path.commonpath([root, directory]) != root:
+                raise StylesheetError(
+                    f'Bundle "{path}" would be written outside of "{output_dir}"'
+                )
+            output.write(path, css.encode("utf-8"), stats)
+        return paths
+
+    def report(self) -> str:
+        """Summarize the bundles used and rebuilt."""
+        return (
+            f"Bundled {len(self.bundles)} stylesheets: "
+            f"{self.rebuilt} rebuilt, {len(self.bundles) - self.rebuilt} cached"
+        )
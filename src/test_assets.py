@@ -0,0 +1,83 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from assets import AssetInliner, inlinable_css
+from htmlnode import LeafNode, ParentNode
+
+TEMPLATE = '<head><link href="/index.css" rel="stylesheet"></head>'
+
+
+class TestAssetInliner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.write("index.css", b"body { color: red; }")
+        self.write("big.css", b"p {}" * 100)
+        png = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+        self.write(os.path.join("images", "tiny.png"), png)
+        self.write(os.path.join("images", "big.png"), png + b"\x00" * 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> None:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def test_inline_small_stylesheet(self):
+        inliner = AssetInliner(self.tmp.name, css_threshold=100)
+        want = "<head><style>body { color: red; }</style></head>"
+        self.assertEqual(want, inliner.inline_stylesheets(TEMPLATE))
+
+    def test_keep_large_stylesheet_link(self):
+        inliner = AssetInliner(self.tmp.name, css_threshold=100)
+        template = TEMPLATE.replace("index.css", "big.css")
+        self.assertEqual(template, inliner.inline_stylesheets(template))
+
+    def test_keep_missing_stylesheet_link(self):
+        inliner = AssetInliner(self.tmp.name)
+        template = TEMPLATE.replace("index.css", "missing.css")
+        self.assertEqual(template, inliner.inline_stylesheets(template))
+
+    def test_inline_tiny_images_only(self):
+        inliner = AssetInliner(self.tmp.name, image_threshold=100)
+        tiny = LeafNode("", "img", {"src": "/images/tiny.png", "alt": "a"})
+        big = LeafNode("", "img", {"src": "/images/big.png", "alt": "b"})
+        inliner.inline_images(ParentNode("p", [tiny, big]))
+        self.assertTrue(tiny.props["src"].startswith("data:image/png;base64,"))
+        self.assertEqual("/images/big.png", big.props["src"])
+
+    def test_encoded_once_and_reported_per_use(self):
+        inliner = AssetInliner(self.tmp.name, css_threshold=100)
+        for _ in range(3):
+            inliner.inline_stylesheets(TEMPLATE)
+        self.assertEqual(1, len(inliner.encoded))
+        self.assertEqual(3, inliner.requests_saved)
+        self.assertTrue(inliner.report().startswith("Inlined 1 assets: 3 requests"))
+
+    def test_disabled_thresholds(self):
+        inliner = AssetInliner(self.tmp.name, css_threshold=0, image_threshold=0)
+        self.assertEqual(TEMPLATE, inliner.inline_stylesheets(TEMPLATE))
+        self.assertEqual(0, inliner.requests_saved)
+
+
+class TestInlinableCSS(unittest.TestCase):
+    def test_plain_css(self):
+        self.assertEqual("a { color: red; }", inlinable_css(b"a { color: red; }"))
+
+    def test_relative_url_is_not_inlinable(self):
+        self.assertIsNone(inlinable_css(b"a { background: url(img/a.png); }"))
+
+    def test_root_relative_url_is_inlinable(self):
+        css = 'a { background: url("/img/a.png"); }'
+        self.assertEqual(css, inlinable_css(css.encode()))
+
+    def test_closing_style_tag_is_not_inlinable(self):
+        self.assertIsNone(inlinable_css(b"a::after { content: '</style>'; }"))
+
+
+if __name__ == "__main__":
+    unittest.main()
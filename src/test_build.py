@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site, plan_pages
+from copytree import SYMLINK, list_files
+from logger import get_logger
+
+
+class TestPlanPages(unittest.TestCase):
+    def test_sorted_markdown_pages(self):
+        with tempfile.TemporaryDirectory() as content_dir:
+            for name in ["b.md", "a.md", "notes.txt", os.path.join("sub", "index.md")]:
+                path = os.path.join(content_dir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write("# Title")
+            want = [
+                (os.path.join(content_dir, "a.md"), os.path.join("public", "a.html")),
+                (os.path.join(content_dir, "b.md"), os.path.join("public", "b.html")),
+                (
+                    os.path.join(content_dir, "sub", "index.md"),
+                    os.path.join("public", "sub", "index.html"),
+                ),
+            ]
+            self.assertListEqual(want, plan_pages(content_dir, "public"))
+
+
+class TestSymlinkBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel("WARNING")
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+        return path
+
+    def test_static_dir_is_unchanged(self):
+        template_path = self.write(
+            "template.html",
+            '<link rel="stylesheet" href="/css/site.css"><title>{{ Title }}</title>',
+        )
+        self.write("content/docs/page.md", "# Page")
+        self.write("static/docs/readme.txt", "read me")
+        self.write("static/css/site.css", "h1 { color: red }")
+        static_dir = os.path.join(self.tmp.name, "static")
+        public_dir = os.path.join(self.tmp.name, "public")
+        for _ in range(2):
+            build_site(
+                template_path,
+                os.path.join(self.tmp.name, "content"),
+                public_dir,
+                static_dir,
+                keep_generations=3,
+                static_mode=SYMLINK,
+            )
+        self.assertEqual(
+            [
+                os.path.join(static_dir, "css", "site.css"),
+                os.path.join(static_dir, "docs", "readme.txt"),
+            ],
+            list_files(static_dir),
+        )
+        bundles = [
+            name
+            for name in os.listdir(os.path.join(public_dir, "css"))
+            if name != "site.css"
+        ]
+        self.assertEqual(1, len(bundles))
+        self.assertTrue(os.path.exists(os.path.join(public_dir, "docs", "page.html")))
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel("WARNING")
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+        return path
+
+    def build(self, public_dir: str, workers: int) -> dict[str, str]:
+        build_site(
+            os.path.join(self.tmp.name, "template.html"),
+            os.path.join(self.tmp.name, "content"),
+            public_dir,
+            os.path.join(self.tmp.name, "static"),
+            workers=workers,
+        )
+        pages = {}
+        for path in list_files(public_dir):
+            with open(path, encoding="utf-8") as file:
+                pages[os.path.relpath(path, public_dir)] = file.read()
+        return pages
+
+    def test_workers_render_like_one_process(self):
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/logo.png", "png")
+        for i in range(5):
+            self.write(
+                f"content/page{i}.md",
+                f"# Page {i}\n\n[next](/page{(i + 1) % 5}.html) [gone](/gone.html)",
+            )
+        serial = self.build(os.path.join(self.tmp.name, "serial"), 1)
+        parallel = self.build(os.path.join(self.tmp.name, "parallel"), 3)
+        self.assertEqual(serial, parallel)
+        self.assertIn("page4.html", parallel)
+
+
+class TestInlineThresholds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel("WARNING")
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+        return path
+
+    def build(self, css_inline_threshold: int) -> str:
+        template_path = self.write(
+            "template.html",
+            '<link rel="stylesheet" href="/site.css"><title>{{ Title }}</title>',
+        )
+        self.write("content/index.md", "# Home")
+        self.write("static/site.css", "h1 { color: red }")
+        public_dir = os.path.join(self.tmp.name, "public")
+        build_site(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            public_dir,
+            os.path.join(self.tmp.name, "static"),
+            css_inline_threshold=css_inline_threshold,
+        )
+        with open(os.path.join(public_dir, "index.html"), encoding="utf-8") as file:
+            return file.read()
+
+    def test_default_inlines_small_stylesheets(self):
+        self.assertIn("<style>h1{color:red}</style>", self.build(14 * 1024))
+
+    def test_zero_threshold_keeps_links(self):
+        page = self.build(0)
+        self.assertNotIn("<style>", page)
+        self.assertIn('rel="stylesheet"', page)
+
+
+if __name__ == "__main__":
+    unittest.main()
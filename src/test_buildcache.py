@@ -0,0 +1,118 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from buildcache import BuildCache, static_dependencies
+from htmlnode import LeafNode, ParentNode
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "cache")
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.write_static("images/a.png", b"one")
+        self.cache = BuildCache(self.root, self.static_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_static(self, name: str, data: bytes) -> None:
+        path = os.path.join(self.static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def test_key_covers_every_input(self):
+        key = self.cache.key("# Page", "{{ Content }}")
+        self.assertEqual(key, self.cache.key("# Page", "{{ Content }}"))
+        self.assertNotEqual(key, self.cache.key("# Other", "{{ Content }}"))
+        self.assertNotEqual(key, self.cache.key("# Page", "<p>{{ Content }}</p>"))
+        other = BuildCache(self.root, self.static_dir, {"image_threshold": 0})
+        self.assertNotEqual(key, other.key("# Page", "{{ Content }}"))
+
+    def test_put_then_get(self):
+        key = self.cache.key("# Page", "{{ Content }}")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "<h1>Page</h1>", [])
+        self.assertEqual("<h1>Page</h1>", self.cache.get(key))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual("<h1>Page</h1>", BuildCache(self.root, "").get(key))
+
+    def test_changed_dependency_misses(self):
+        key = self.cache.key("![a](/images/a.png)", "{{ Content }}")
+        self.cache.put(key, "<img>", ["/images/a.png"])
+        self.assertEqual("<img>", BuildCache(self.root, self.static_dir).get(key))
+        self.write_static("images/a.png", b"two!")
+        self.assertIsNone(BuildCache(self.root, self.static_dir).get(key))
+
+    def test_prune_least_recently_used(self):
+        keys = [self.cache.key(str(i), "") for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, "x" * 100, [])
+            os.utime(self.cache.object_path(key), (i, i))
+        self.cache.get(keys[0])
+        self.cache.prune(300)
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_pack_and_unpack(self):
+        key = self.cache.key("# Page", "")
+        self.cache.put(key, "<h1>Page</h1>", [])
+        archive = os.path.join(self.tmp.name, "cache.tgz")
+        self.assertEqual(1, self.cache.pack(archive))
+        restored = BuildCache(os.path.join(self.tmp.name, "restored"), "")
+        self.assertEqual(1, restored.unpack(archive))
+        self.assertEqual("<h1>Page</h1>", restored.get(key))
+        self.assertEqual(0, restored.unpack(archive))
+
+    def test_pack_is_deterministic(self):
+        for markdown in ["# One", "# Two"]:
+            self.cache.put(self.cache.key(markdown, ""), f"<p>{markdown}</p>", [])
+        first = os.path.join(self.tmp.name, "first.tgz")
+        second = os.path.join(self.tmp.name, "second.tgz")
+        self.cache.pack(first)
+        for _, _, path in self.cache.entries():
+            os.utime(path, (1_000_000, 1_000_000))
+        self.cache.pack(second)
+        with open(first, "rb") as a, open(second, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_concurrent_writers(self):
+        key = self.cache.key("# Page", "")
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    self.cache.put(key, "<h1>Page</h1>", [])
+                    self.assertIn(self.cache.get(key), ("<h1>Page</h1>", None))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(["objects"], os.listdir(self.root))
+
+
+class TestStaticDependencies(unittest.TestCase):
+    def test_local_images(self):
+        node = ParentNode(
+            "div",
+            [
+                LeafNode("", "img", {"src": "/images/b.png"}),
+                LeafNode("", "img", {"src": "https://example.com/c.png"}),
+                LeafNode("", "img", {"src": "/images/a.png"}),
+            ],
+        )
+        self.assertEqual(["/images/a.png", "/images/b.png"], static_dependencies(node))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 import unittest
 
 from converter import (
+    MAX_LIST_DEPTH,
     BlockType,
     block_text_to_block_type,
     inline_text_to_text_nodes,
+    inline_text_to_text_nodes_unchecked,
     markdown_text_to_blocks,
     markdown_text_to_html_node,
     text_node_to_leaf_node,
@@ -105,6 +107,18 @@ and [link](https://test.com)"
         self.assertListEqual(want, got)
 
 
+class TestInlineTextToTextNodesUnchecked(unittest.TestCase):
+    def test_same_nodes_as_validated(self):
+        text = "**b**, *i*, _i_, `c`, ![img](/a.png) and [link](/b)"
+        self.assertListEqual(
+            inline_text_to_text_nodes(text), inline_text_to_text_nodes_unchecked(text)
+        )
+
+    def test_validation_stays_at_the_boundary(self):
+        with self.assertRaises(ValueError):
+            inline_text_to_text_nodes("")
+
+
 class TestMarkdownTextToBlocks(unittest.TestCase):
     def test_empty_text(self):
         text = ""
@@ -321,7 +335,15 @@ class TestMarkdownTextToHTMLNode(unittest.TestCase):
         elif type == "code":
             return ParentNode(
                 tag,
-                [LeafNode('print("Hello, World!")', type)],
+                [
+                    LeafNode(
+                        '<span class="nb">print</span><span class="o">(</span>'
+                        '<span class="s">"Hello, World!"</span>'
+                        '<span class="o">)</span>',
+                        type,
+                        {"class": "language-python"},
+                    )
+                ],
             )
         else:
             return ParentNode(
@@ -497,6 +519,121 @@ and ![image](https://image.com), and [link](https://link.com)\n\n\
         got = markdown_text_to_html_node(text)
         self.assertEqual(ParentNode("div", want), got)
 
+    def test_to_html_escapes_text(self):
+        text = "Use `a < b && c`\n\n```\nif a < b:\n```"
+        want = (
+            "<div><p>Use <code>a &lt; b &amp;&amp; c</code></p>"
+            "<pre><code>if a &lt; b:</code></pre></div>"
+        )
+        self.assertEqual(want, markdown_text_to_html_node(text).to_html())
+
+
+class TestBlockParser(unittest.TestCase):
+    def html(self, text: str) -> str:
+        return markdown_text_to_html_node(text).to_html()
+
+    def test_nested_lists(self):
+        text = "- a\n- b\n  - b1\n  - b2\n    1. deep\n- c"
+        want = (
+            "<div><ul><li>a</li><li>b<ul><li>b1</li><li>b2<ol><li>deep</li></ol>"
+            "</li></ul></li><li>c</li></ul></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_multi_paragraph_item(self):
+        text = "1. first\n\n   second\n2. two\n\nafter"
+        want = (
+            "<div><ol><li><p>first</p><p>second</p></li><li>two</li></ol>"
+            "<p>after</p></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_lazy_continuation(self):
+        text = "- item\ncontinued\n\nnext"
+        want = "<div><ul><li>item\ncontinued</li></ul><p>next</p></div>"
+        self.assertEqual(want, self.html(text))
+
+    def test_code_in_item(self):
+        text = "- item\n\n  ```\n  a < b\n\n  c\n  ```\n- next"
+        want = (
+            "<div><ul><li>item<pre><code>a &lt; b\n\nc</code></pre></li>"
+            "<li>next</li></ul></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_ordered_start_and_bullet_change(self):
+        text = "3. three\n4. four\n\n* a\n- b"
+        want = (
+            '<div><ol start="3"><li>three</li><li>four</li></ol>'
+            "<ul><li>a</li></ul><ul><li>b</li></ul></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_blocks_interrupt_paragraph(self):
+        text = "Text\n# Heading\nMore\n> quote\n- item\nEnd\n2. not a list"
+        want = (
+            "<div><p>Text</p><h1>Heading</h1><p>More</p><blockquote>quote"
+            "</blockquote><ul><li>item\nEnd\n2. not a list</li></ul></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_multiline_quote(self):
+        text = "> one\n>two\n\n```\n# not a heading\n```"
+        want = (
+            "<div><blockquote>one\ntwo</blockquote>"
+            "<pre><code># not a heading</code></pre></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_crlf_line_endings(self):
+        text = "# Title\n\n- a\n- b\n\n```\nx = 1\n\ny = 2\n```\n\ntext\nmore"
+        want = self.html(text)
+        self.assertEqual(want, self.html(text.replace("\n", "\r\n")))
+        self.assertEqual(want, self.html(text.replace("\n", "\r")))
+
+    def test_depth_is_bounded(self):
+        text = "\n".join("  " * i + "- x" for i in range(MAX_LIST_DEPTH + 10))
+        self.assertEqual(MAX_LIST_DEPTH, self.html(text).count("<ul>"))
+
+
+class TestLinkReferences(unittest.TestCase):
+    def html(self, text: str) -> str:
+        return markdown_text_to_html_node(text).to_html()
+
+    def test_definitions_after_references(self):
+        text = (
+            "See [the docs][Docs], [home][] and ![logo][l].\n\n"
+            '[docs]: /docs "Title"\n[HOME]: <https://example.com/>\n'
+            "[l]: /logo.png\n[docs]: /ignored"
+        )
+        want = (
+            '<div><p>See <a href="/docs">the docs</a>, '
+            '<a href="https://example.com/">home</a> and '
+            '<img src="/logo.png" alt="logo"/>.</p></div>'
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_undefined_labels_stay_text(self):
+        text = "a[i][j] and `x[0][1]`\n\n[k]: /k"
+        want = "<div><p>a[i][j] and <code>x[0][1]</code></p></div>"
+        self.assertEqual(want, self.html(text))
+
+    def test_references_in_code_spans_stay_code(self):
+        text = "see `x[0][1]`, [one][1] and `a [b][1] c`\n\n[1]: /one"
+        want = (
+            "<div><p>see <code>x[0][1]</code>, "
+            '<a href="/one">one</a> and <code>a [b][1] c</code></p></div>'
+        )
+        self.assertEqual(want, self.html(text))
+
+    def test_definition_in_list_and_not_in_paragraph(self):
+        text = "- [a][]\n\n  [a]: /a\n\ntext\n[b]: /b\n\n[b][]"
+        want = (
+            '<div><ul><li><a href="/a">a</a></li></ul>'
+            "<p>text\n[b]: /b</p><p>[b][]</p></div>"
+        )
+        self.assertEqual(want, self.html(text))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+
+from delta import (
+    DELTA_MEMBER_NAME,
+    build_manifest,
+    confirm_deploy,
+    diff_manifests,
+    export_delta,
+    write_delta_tar,
+)
+
+
+class TestDelta(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        self.write("index.html", "home")
+        self.write("about.html", "about")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> None:
+        path = os.path.join(self.public_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+    def test_first_export_adds_everything(self):
+        delta = export_delta(self.public_dir, self.manifest_path)
+        self.assertEqual(["about.html", "index.html"], delta.upload_paths())
+        self.assertEqual({}, delta.removed)
+        self.assertEqual(4, delta.added["index.html"]["size"])
+
+    def test_export_without_manifest(self):
+        export_delta(self.public_dir, self.manifest_path)
+        confirm_deploy(self.manifest_path)
+        delta = export_delta(self.public_dir, None)
+        self.assertEqual(["about.html", "index.html"], delta.upload_paths())
+        self.assertEqual(
+            [], export_delta(self.public_dir, self.manifest_path).upload_paths()
+        )
+
+    def test_delta_against_previous_manifest(self):
+        export_delta(self.public_dir, self.manifest_path)
+        self.assertTrue(confirm_deploy(self.manifest_path))
+        self.write("index.html", "home v2")
+        self.write("blog/post.html", "post")
+        os.unlink(os.path.join(self.public_dir, "about.html"))
+        delta_path = os.path.join(self.tmp.name, "delta.json")
+        export_delta(self.public_dir, self.manifest_path, delta_path)
+        with open(delta_path, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(["blog/post.html"], list(data["added"]))
+        self.assertEqual(["index.html"], list(data["changed"]))
+        self.assertEqual(["about.html"], list(data["removed"]))
+        self.assertEqual(11, data["upload_bytes"])
+
+    def test_unchanged_build_is_empty(self):
+        export_delta(self.public_dir, self.manifest_path)
+        confirm_deploy(self.manifest_path)
+        delta = export_delta(self.public_dir, self.manifest_path)
+        self.assertEqual([], delta.upload_paths())
+
+    def test_unconfirmed_delta_is_exported_again(self):
+        export_delta(self.public_dir, self.manifest_path)
+        delta = export_delta(self.public_dir, self.manifest_path)
+        self.assertEqual(["about.html", "index.html"], delta.upload_paths())
+        self.assertTrue(confirm_deploy(self.manifest_path))
+        self.assertFalse(confirm_deploy(self.manifest_path))
+
+    def test_same_content_rewrite_is_unchanged(self):
+        previous = build_manifest(self.public_dir)
+        self.write("index.html", "home")
+        delta = diff_manifests(previous, build_manifest(self.public_dir))
+        self.assertEqual({}, delta.changed)
+
+    def test_tar_contains_delta_and_changed_files(self):
+        previous = build_manifest(self.public_dir)
+        self.write("index.html", "home v2")
+        delta = diff_manifests(previous, build_manifest(self.public_dir))
+        buffer = io.BytesIO()
+        write_delta_tar(self.public_dir, delta, buffer)
+        buffer.seek(0)
+        with tarfile.open(fileobj=buffer) as tar:
+            self.assertEqual([DELTA_MEMBER_NAME, "index.html"], tar.getnames())
+            member = tar.extractfile("index.html")
+            assert member is not None
+            self.assertEqual(b"home v2", member.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
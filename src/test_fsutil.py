@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+from copytree import HARDLINK, SYMLINK, copy_tree_recursive
+from fsutil import WriteStats, copy_file, write_bytes
+
+
+class TestWriteBytes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_new_file(self):
+        stats = WriteStats()
+        self.assertTrue(write_bytes(self.path, b"<p>hi</p>", stats))
+        with open(self.path, "rb") as file:
+            self.assertEqual(b"<p>hi</p>", file.read())
+        self.assertEqual([1, 9], stats.written)
+
+    def test_skips_identical_content(self):
+        write_bytes(self.path, b"<p>hi</p>")
+        inode = os.stat(self.path).st_ino
+        stats = WriteStats()
+        self.assertFalse(write_bytes(self.path, b"<p>hi</p>", stats))
+        self.assertEqual(inode, os.stat(self.path).st_ino)
+        self.assertEqual([1, 9], stats.skipped)
+        self.assertEqual([0, 0], stats.written)
+
+    def test_rewrites_changed_content(self):
+        write_bytes(self.path, b"<p>hi</p>")
+        self.assertTrue(write_bytes(self.path, b"<p>ho</p>"))
+        with open(self.path, "rb") as file:
+            self.assertEqual(b"<p>ho</p>", file.read())
+
+
+class TestCopyFile(unittest.TestCase):
+    def test_copies_content_and_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = os.path.join(tmp, "src.bin"), os.path.join(tmp, "dst.bin")
+            data = os.urandom(300_000)
+            with open(src, "wb") as file:
+                file.write(data)
+            os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+            copy_file(src, dst)
+            with open(dst, "rb") as file:
+                self.assertEqual(data, file.read())
+            self.assertEqual(1_000_000_000, os.stat(dst).st_mtime_ns)
+            self.assertFalse(os.path.samefile(src, dst))
+
+
+class TestCopyTreeDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.src, "images"))
+        for name, data in [("a.png", b"same"), ("images/b.png", b"same")]:
+            with open(os.path.join(self.src, name), "wb") as file:
+                file.write(data)
+        with open(os.path.join(self.src, "c.css"), "wb") as file:
+            file.write(b"other")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hardlinks_duplicates(self):
+        stats = WriteStats()
+        copy_tree_recursive(self.src, self.dst, stats)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.dst, "a.png"),
+                os.path.join(self.dst, "images", "b.png"),
+            )
+        )
+        self.assertEqual([2, 9], stats.written)
+        self.assertEqual([1, 4], stats.linked)
+
+    def test_skips_unchanged_copies(self):
+        copy_tree_recursive(self.src, self.dst)
+        stats = WriteStats()
+        copy_tree_recursive(self.src, self.dst, stats)
+        self.assertEqual([0, 0], stats.written)
+        self.assertEqual(3, stats.skipped[0])
+
+    def test_hardlink_mode_links_sources(self):
+        copy_tree_recursive(self.src, self.dst, mode=HARDLINK)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.src, "c.css"), os.path.join(self.dst, "c.css")
+            )
+        )
+
+    def test_symlink_mode_links_files(self):
+        copy_tree_recursive(self.src, self.dst, mode=SYMLINK)
+        self.assertFalse(os.path.islink(os.path.join(self.dst, "images")))
+        self.assertEqual(
+            os.path.abspath(os.path.join(self.src, "images", "b.png")),
+            os.readlink(os.path.join(self.dst, "images", "b.png")),
+        )
+        self.assertTrue(os.path.islink(os.path.join(self.dst, "c.css")))
+
+    def test_symlink_mode_replaces_linked_dirs(self):
+        os.makedirs(self.dst)
+        os.symlink(
+            os.path.abspath(os.path.join(self.src, "images")),
+            os.path.join(self.dst, "images"),
+        )
+        copy_tree_recursive(self.src, self.dst, mode=SYMLINK)
+        self.assertFalse(os.path.islink(os.path.join(self.dst, "images")))
+        self.assertEqual(["b.png"], os.listdir(os.path.join(self.src, "images")))
+
+    def test_copy_replaces_preview_symlinks(self):
+        copy_tree_recursive(self.src, self.dst, mode=SYMLINK)
+        copy_tree_recursive(self.src, self.dst)
+        self.assertFalse(os.path.islink(os.path.join(self.dst, "c.css")))
+        self.assertFalse(os.path.islink(os.path.join(self.dst, "images")))
+        self.assertEqual(["b.png"], os.listdir(os.path.join(self.src, "images")))
+
+
+if __name__ == "__main__":
+    unittest.main()
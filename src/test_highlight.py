@@ -0,0 +1,81 @@
+import unittest
+
+from highlight import Highlighter, highlight, json_lexer, python_lexer, shell_lexer
+
+
+class TestPythonLexer(unittest.TestCase):
+    def test_classes(self):
+        code = (
+            "@cache\ndef add(a, b=1):  # sum\n    return a + b if True else len('x')\n"
+        )
+        got = [(c, t) for c, t in python_lexer(code) if c]
+        self.assertIn(("nd", "cache"), got)
+        self.assertIn(("k", "def"), got)
+        self.assertIn(("nf", "add"), got)
+        self.assertIn(("m", "1"), got)
+        self.assertIn(("c", "# sum"), got)
+        self.assertIn(("kc", "True"), got)
+        self.assertIn(("nb", "len"), got)
+        self.assertIn(("s", "'x'"), got)
+
+    def test_round_trip_preserves_text(self):
+        code = 'class A:\n    """Doc."""\n\n    x = [1,\n         2]\n'
+        self.assertEqual(code, "".join(text for _, text in python_lexer(code)))
+
+    def test_unicode_line_separators_keep_text(self):
+        code = 'x = "a\u2028b\x1cc\x85d"\ny = 1\n'
+        got = python_lexer(code)
+        self.assertEqual(code, "".join(text for _, text in got))
+        self.assertIn(("s", '"a\u2028b\x1cc\x85d"'), got)
+
+    def test_incomplete_code_keeps_text(self):
+        code = "print((1,\n"
+        self.assertEqual(code, "".join(text for _, text in python_lexer(code)))
+
+
+class TestRegexLexers(unittest.TestCase):
+    def test_shell(self):
+        got = [(c, t) for c, t in shell_lexer('echo "$HOME" | grep x # done') if c]
+        want = [("nb", "echo"), ("s", '"$HOME"'), ("o", "|"), ("c", "# done")]
+        self.assertListEqual(want, got)
+
+    def test_json(self):
+        got = [(c, t) for c, t in json_lexer('{"a": [1, true, "b"]}') if c]
+        self.assertIn(("nt", '"a"'), got)
+        self.assertIn(("m", "1"), got)
+        self.assertIn(("kc", "true"), got)
+        self.assertIn(("s", '"b"'), got)
+
+
+class TestHighlighter(unittest.TestCase):
+    def test_escapes_html(self):
+        want = '<span class="nt">&lt;a</span> <span class="na">href</span>='
+        html = highlight('<a href="/">&amp;</a>', "html")
+        assert html is not None
+        self.assertTrue(html.startswith(want))
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("fmt.Println()", "go"))
+
+    def test_snippet_cache(self):
+        calls = []
+        highlighter = Highlighter()
+        highlighter.register(["txt"], lambda code: calls.append(code) or [("", code)])
+        first = highlighter.highlight("a < b", "txt")
+        second = highlighter.highlight("a < b", "TXT")
+        self.assertEqual("a &lt; b", first)
+        self.assertIs(first, second)
+        self.assertListEqual(["a < b"], calls)
+
+    def test_snippet_cache_is_bounded(self):
+        calls = []
+        highlighter = Highlighter(cache_size=2)
+        highlighter.register(["txt"], lambda code: calls.append(code) or [("", code)])
+        for code in ["a", "b", "a", "c", "a", "b"]:
+            highlighter.highlight(code, "txt")
+        self.assertEqual(2, len(highlighter.cache))
+        self.assertListEqual(["a", "b", "c", "b"], calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
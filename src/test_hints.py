@@ -0,0 +1,86 @@
+import json
+import os
+import unittest
+
+from hints import LINK_HEADERS_PATH, ResourceHints, load_link_headers
+from htmlnode import LeafNode, ParentNode
+from output import MemoryOutput
+
+TEMPLATE = (
+    '<head><link href="/index.css" rel="stylesheet"></head><body>{{ Content }}</body>'
+)
+
+
+def page_node() -> ParentNode:
+    return ParentNode(
+        "div",
+        [
+            LeafNode("", "img", {"src": "/images/a.png", "loading": "lazy"}),
+            LeafNode("", "img", {"src": "data:image/png;base64,AA=="}),
+            LeafNode("", "img", {"src": "/images/b.png"}),
+            LeafNode("", "img", {"src": "/images/c.png"}),
+            LeafNode("Post", "a", {"href": "/blog/post#top"}),
+            LeafNode("Image", "a", {"href": "/images/a.png"}),
+            LeafNode("Out", "a", {"href": "https://example.com/"}),
+            LeafNode("Home", "a", {"href": "/"}),
+        ],
+    )
+
+
+class TestResourceHints(unittest.TestCase):
+    def test_collect(self):
+        node = page_node()
+        self.assertEqual(
+            [
+                ("preload", "/index.css", "style"),
+                ("preload", "/images/a.png", "image"),
+                ("preload", "/images/b.png", "image"),
+                ("prefetch", "/blog/post", ""),
+                ("prefetch", "/", ""),
+            ],
+            ResourceHints().collect(TEMPLATE, node),
+        )
+        self.assertEqual("eager", node.children[0].props["loading"])
+        self.assertNotIn("loading", node.children[3].props)
+
+    def test_tags_and_headers(self):
+        hints = ResourceHints(max_images=1, max_pages=1)
+        page = hints.add_tags(TEMPLATE, hints.collect(TEMPLATE, page_node()))
+        self.assertIn(
+            '<link rel="preload" href="/index.css" as="style">'
+            '<link rel="preload" href="/images/a.png" as="image">'
+            '<link rel="prefetch" href="/blog/post"></head>',
+            page,
+        )
+        hints.record(os.path.join("public", "index.html"), page)
+        self.assertEqual(
+            {
+                os.path.join("public", "index.html"): [
+                    "</index.css>; rel=preload; as=style",
+                    "</images/a.png>; rel=preload; as=image",
+                    "</blog/post>; rel=prefetch",
+                ]
+            },
+            hints.headers,
+        )
+
+    def test_write_link_headers(self):
+        hints = ResourceHints()
+        hints.headers[os.path.join("public", "blog", "index.html")] = [
+            "</index.css>; rel=preload; as=style",
+            "</>; rel=prefetch",
+        ]
+        output = MemoryOutput("public")
+        hints.write("public", output)
+        data = output.read(LINK_HEADERS_PATH)
+        self.assertEqual(["blog/index.html"], list(json.loads(data or b"{}").keys()))
+        self.assertEqual(
+            {
+                "blog/index.html": "</index.css>; rel=preload; as=style, </>; rel=prefetch"
+            },
+            load_link_headers(data),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import (
+    HTMLNode,
+    LeafNode,
+    Markup,
+    ParentNode,
+    escape_attribute,
+    escape_text,
+)
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -191,6 +198,39 @@ class TestParentNode(unittest.TestCase):
         got = parent_node.to_html()
         self.assertEqual(want, got)
 
+    def test_iter_nodes_document_order(self):
+        bold = LeafNode(tag="b", value="bold")
+        paragraph = ParentNode(tag="p", children=[bold, LeafNode(value="normal")])
+        root = ParentNode(tag="div", children=[paragraph, LeafNode(value="end")])
+        got = [node.value or node.tag for node in root.iter_nodes()]
+        self.assertListEqual(["div", "p", "bold", "normal", "end"], got)
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual('a &lt;b&gt; &amp; "c"', escape_text('a <b> & "c"'))
+
+    def test_escape_text_fast_path_returns_same_string(self):
+        text = "nothing special here"
+        self.assertIs(text, escape_text(text))
+
+    def test_escape_attribute(self):
+        self.assertEqual("/a?b=1&amp;c=&quot;d&quot;", escape_attribute('/a?b=1&c="d"'))
+
+    def test_markup_is_not_escaped_twice(self):
+        markup = Markup("<span>&amp;</span>")
+        self.assertIs(markup, escape_text(markup))
+        self.assertIs(markup, escape_attribute(markup))
+
+    def test_leaf_node_escapes_value_and_props(self):
+        leaf_node = LeafNode("1 < 2", "a", {"href": "/?a=1&b=2"})
+        want = '<a href="/?a=1&amp;b=2">1 &lt; 2</a>'
+        self.assertEqual(want, leaf_node.to_html())
+
+    def test_leaf_node_keeps_markup_value(self):
+        leaf_node = LeafNode(Markup("<b>safe</b>"), "code")
+        self.assertEqual("<code><b>safe</b></code>", leaf_node.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from images import (
+    ImageIndex,
+    annotate_images,
+    image_size,
+    resolve_static_path,
+)
+
+
+def make_png(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + sof
+
+
+class TestImageSize(unittest.TestCase):
+    def test_png(self):
+        self.assertEqual((640, 480), image_size(make_png(640, 480)))
+
+    def test_jpeg_skips_app_segments(self):
+        self.assertEqual((1280, 720), image_size(make_jpeg(1280, 720)))
+
+    def test_gif(self):
+        data = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 4
+        self.assertEqual((32, 16), image_size(data))
+
+    def test_webp_lossy(self):
+        frame = b"\x00\x00\x00" + b"\x9d\x01\x2a" + struct.pack("<HH", 300, 200)
+        data = b"RIFF" + b"\x00" * 4 + b"WEBPVP8 " + b"\x00" * 4 + frame
+        self.assertEqual((300, 200), image_size(data))
+
+    def test_webp_lossless(self):
+        bits = (300 - 1) | ((200 - 1) << 14)
+        body = b"\x2f" + bits.to_bytes(4, "little") + b"\x00" * 5
+        data = b"RIFF" + b"\x00" * 4 + b"WEBPVP8L" + b"\x00" * 4 + body
+        self.assertEqual((300, 200), image_size(data))
+
+    def test_webp_extended(self):
+        body = b"\x00" * 4 + (299).to_bytes(3, "little") + (199).to_bytes(3, "little")
+        data = b"RIFF" + b"\x00" * 4 + b"WEBPVP8X" + b"\x00" * 4 + body
+        self.assertEqual((300, 200), image_size(data))
+
+    def test_unknown_format(self):
+        self.assertIsNone(image_size(b"not an image at all"))
+
+    def test_static_basenji(self):
+        static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
+        with open(os.path.join(static_dir, "images", "basenji.jpg"), "rb") as file:
+            data = file.read()
+        self.assertEqual((1280, 720), image_size(data))
+
+
+class TestResolveStaticPath(unittest.TestCase):
+    def test_root_relative(self):
+        want = os.path.join(os.path.abspath("static"), "images", "a.png")
+        self.assertEqual(want, resolve_static_path("/images/a.png?v=1", "static"))
+
+    def test_external_and_relative(self):
+        for src in ["https://test.com/a.png", "//cdn/a.png", "images/a.png"]:
+            self.assertIsNone(resolve_static_path(src, "static"))
+
+    def test_escape_static_dir(self):
+        self.assertIsNone(resolve_static_path("/../secret.png", "static"))
+
+
+class TestAnnotateImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, "images"))
+        with open(os.path.join(self.tmp.name, "images", "a.png"), "wb") as file:
+            file.write(make_png(40, 20))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_adds_dimensions_and_loading_hints(self):
+        img = LeafNode("", "img", {"src": "/images/a.png", "alt": "a"})
+        annotate_images(ParentNode("p", [img]), ImageIndex(self.tmp.name))
+        want = '<img src="/images/a.png" alt="a" width="40" height="20" loading="lazy" decoding="async"/>'
+        self.assertEqual(want, img.to_html())
+
+    def test_unknown_image_keeps_loading_hints(self):
+        img = LeafNode("", "img", {"src": "/images/missing.png", "alt": "a"})
+        annotate_images(ParentNode("p", [img]), ImageIndex(self.tmp.name))
+        self.assertNotIn("width", img.props)
+        self.assertEqual("lazy", img.props["loading"])
+
+    def test_index_is_keyed_by_hash_and_persisted(self):
+        cache_path = os.path.join(self.tmp.name, "cache", "images.json")
+        index = ImageIndex(self.tmp.name, cache_path)
+        self.assertEqual((40, 20), index.dimensions("/images/a.png"))
+        index.save()
+        reloaded = ImageIndex(self.tmp.name, cache_path)
+        self.assertEqual(index.sizes, reloaded.sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()
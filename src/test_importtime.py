@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_MS = 250
+# Modules that only some builds need are imported inside the functions that
+# use them, so the CLI starts without loading them; list each one here.
+LAZY_MODULES = [
+    "concurrent.futures",
+    "cProfile",
+    "gzip",
+    "http.server",
+    "mimetypes",
+    "tarfile",
+    "tomllib",
+    "highlight",
+    "zipfile",
+]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import a module in a fresh interpreter; return cumulative microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_heavy_modules_load_lazily(self):
+        times = import_times("main")
+        self.assertEqual([], [name for name in LAZY_MODULES if name in times])
+
+    def test_cli_import_budget(self):
+        # Best of three, so a busy machine doesn't fail the budget.
+        best = min(import_times("main")["main"] for _ in range(3))
+        self.assertLess(best / 1000, IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
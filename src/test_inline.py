@@ -3,9 +3,11 @@ import unittest
 from inline import (
     extract_markdown_images,
     extract_markdown_links,
+    normalize_label,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
+    split_nodes_reference_link,
 )
 from textnode import TextNode, TextType
 
@@ -228,5 +230,51 @@ and ![image](https://image.jpeg)",
         self.assertListEqual(want, got)
 
 
+class TestSplitNodesReferenceLink(unittest.TestCase):
+    def test_defined_labels(self):
+        old_nodes = [TextNode("A [b][ B  c ] and ![d][] [e][f]", TextType.NORMAL)]
+        definitions = {"b c": "/b", "d": "/d.png"}
+        want = [
+            TextNode("A ", TextType.NORMAL),
+            TextNode("b", TextType.LINK, "/b"),
+            TextNode(" and ", TextType.NORMAL),
+            TextNode("d", TextType.IMAGE, "/d.png"),
+            TextNode(" [e][f]", TextType.NORMAL),
+        ]
+        self.assertListEqual(want, split_nodes_reference_link(old_nodes, definitions))
+
+    def test_normalize_label(self):
+        self.assertEqual("the docs", normalize_label(" The\n  DOCS "))
+
+
+class TestSpans(unittest.TestCase):
+    def test_split_nodes_share_source(self):
+        text = "A [link](https://a.com) with **bold** and ![img](b.png)"
+        nodes = split_nodes_link(split_nodes_image([TextNode(text, TextType.NORMAL)]))
+        nodes = split_nodes_delimiter(nodes, TextType.BOLD, "**")
+        self.assertTrue(all(node.source is text for node in nodes))
+        want = [
+            TextNode("A ", TextType.NORMAL),
+            TextNode("link", TextType.LINK, "https://a.com"),
+            TextNode(" with ", TextType.NORMAL),
+            TextNode("bold", TextType.BOLD),
+            TextNode(" and ", TextType.NORMAL),
+            TextNode("img", TextType.IMAGE, "b.png"),
+        ]
+        self.assertListEqual(want, nodes)
+
+    def test_repeated_links(self):
+        text = " ".join("[same](/same)" for _ in range(3))
+        nodes = split_nodes_link([TextNode(text, TextType.NORMAL)])
+        want = [
+            TextNode("same", TextType.LINK, "/same"),
+            TextNode(" ", TextType.NORMAL),
+            TextNode("same", TextType.LINK, "/same"),
+            TextNode(" ", TextType.NORMAL),
+            TextNode("same", TextType.LINK, "/same"),
+        ]
+        self.assertListEqual(want, nodes)
+
+
 if __name__ == "__main__":
     unittest.main()
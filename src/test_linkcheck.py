@@ -0,0 +1,77 @@
+import unittest
+
+from converter import markdown_text_to_html_node
+from htmlnode import LeafNode, ParentNode
+from linkcheck import BrokenReference, LinkChecker, link_targets
+
+URLS = ["/index.html", "/subdir/index.html", "/images/basenji.jpg", "/index.css"]
+
+
+class TestLinkChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = LinkChecker("public", URLS)
+
+    def check(self, src_path: str, dst_path: str, markdown: str) -> None:
+        targets = link_targets(markdown_text_to_html_node(markdown))
+        self.checker.check(src_path, dst_path, markdown, targets)
+
+    def test_index_contains_directory_aliases(self):
+        for url in ["/", "/index.html", "/subdir", "/subdir/", "/subdir/index.html"]:
+            self.assertIn(url, self.checker.urls)
+
+    def test_valid_references(self):
+        markdown = "# Title\n\n[Home](/) [Sub](/subdir) ![a](/images/basenji.jpg)"
+        self.check("content/index.md", "public/index.html", markdown)
+        self.assertListEqual([], self.checker.failures)
+
+    def test_broken_references_with_line_numbers(self):
+        markdown = "# Title\n\n[Missing](/missing)\n\n![a](/images/none.jpg)"
+        self.check("content/index.md", "public/index.html", markdown)
+        want = [
+            BrokenReference("content/index.md", 3, "/missing", "link"),
+            BrokenReference("content/index.md", 5, "/images/none.jpg", "image"),
+        ]
+        self.assertListEqual(want, self.checker.failures)
+        self.assertEqual(
+            'content/index.md:3: broken link "/missing"', self.checker.report()[0]
+        )
+
+    def test_relative_references(self):
+        markdown = "[Home](../index.html) [Self](index.html) [Bad](../nope.html)"
+        self.check("content/subdir/index.md", "public/subdir/index.html", markdown)
+        self.assertListEqual(
+            ["../nope.html"], [f.target for f in self.checker.failures]
+        )
+
+    def test_ignored_references(self):
+        markdown = "[a](#) [b](https://test.com) [c](mailto:a@b.c) [d](/#top)"
+        self.check("content/index.md", "public/index.html", markdown)
+        self.assertListEqual([], self.checker.failures)
+
+    def test_skip_code_blocks(self):
+        markdown = "```\n[Missing](/missing)\n```"
+        self.check("content/index.md", "public/index.html", markdown)
+        self.assertListEqual([], self.checker.failures)
+
+    def test_skip_code_spans(self):
+        markdown = "Write `[Missing](/missing)` for links."
+        node = ParentNode("p", [LeafNode("[Missing](/missing)", "code")])
+        self.checker.check(
+            "content/index.md", "public/index.html", markdown, link_targets(node)
+        )
+        self.assertListEqual([], self.checker.failures)
+
+    def test_reference_links(self):
+        markdown = "# Title\n\n[Home][home] [Gone][gone]\n\n[home]: /\n[gone]: /gone"
+        self.check("content/index.md", "public/index.html", markdown)
+        want = [BrokenReference("content/index.md", 6, "/gone", "link")]
+        self.assertListEqual(want, self.checker.failures)
+
+    def test_repeated_targets_keep_their_lines(self):
+        markdown = "[a](/missing)\n\n[b](/missing)"
+        self.check("content/index.md", "public/index.html", markdown)
+        self.assertListEqual([1, 3], [f.line for f in self.checker.failures])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import io
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+from fsutil import WriteStats
+from listings import (
+    ListingError,
+    feed_listing,
+    generate_listings,
+    page_url,
+    paginate,
+    plan_listings,
+    write_feed,
+)
+from metadata import MetadataIndex
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestPagination(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual("/blog/a.html", page_url("blog/a.md"))
+        self.assertEqual("/blog/", page_url("blog/index.md"))
+
+    def test_paginate(self):
+        items = [(f"/p{i}.html", f"P{i}", "") for i in range(5)]
+        listings = paginate("archive", "Archive", items, 2)
+        paths = [listing.path for listing in listings]
+        want = [
+            "archive/index.html",
+            "archive/page/2/index.html",
+            "archive/page/3/index.html",
+        ]
+        self.assertListEqual(want, paths)
+        self.assertEqual("/archive/page/2/", listings[0].next_url)
+        self.assertEqual("/archive/", listings[1].previous_url)
+        self.assertIsNone(listings[2].next_url)
+
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        self.state_path = os.path.join(self.tmp.name, "cache", "listings.json")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        with open(self.template_path, "w", encoding="utf-8") as file:
+            file.write(TEMPLATE)
+        self.write("index.md", "# Home\n")
+        self.write("blog/a.md", "---\ndate: 2025-01-01\ntags: [dogs]\n---\n# A\n")
+        self.write("blog/b.md", "---\ndate: 2025-02-01\ntags: [cats]\n---\n# B & C\n")
+        self.index = MetadataIndex(self.content_dir)
+        self.index.scan()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> None:
+        path = os.path.join(self.content_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+    def generate(self, stats: Optional[WriteStats] = None) -> int:
+        listings = [*plan_listings(self.index), feed_listing(self.index)]
+        return generate_listings(
+            self.template_path,
+            listings,
+            self.public_dir,
+            self.state_path,
+            "https://a.com",
+            stats=stats,
+        )
+
+    def test_planned_listings(self):
+        paths = [listing.path for listing in plan_listings(self.index)]
+        want = [
+            "blog/index.html",
+            "tags/cats/index.html",
+            "tags/dogs/index.html",
+            "archive/index.html",
+        ]
+        self.assertListEqual(want, paths)
+
+    def test_colliding_tag_slugs(self):
+        self.write("blog/c.md", "---\ntags: [Dogs!]\n---\n# C\n")
+        self.index.scan()
+        with self.assertLogs(level="WARNING"):
+            paths = [listing.path for listing in plan_listings(self.index)]
+        self.assertIn("tags/dogs/index.html", paths)
+        self.assertIn("tags/dogs-2/index.html", paths)
+
+    def test_listing_html(self):
+        self.generate()
+        with open(os.path.join(self.public_dir, "blog", "index.html")) as file:
+            html = file.read()
+        self.assertIn("<title>Blog</title>", html)
+        self.assertIn('<li><a href="/blog/b.html">B &amp; C</a> <time', html)
+        self.assertLess(html.index("/blog/b.html"), html.index("/blog/a.html"))
+
+    def test_only_changed_listings_are_regenerated(self):
+        self.assertEqual(5, self.generate())
+        self.assertEqual(0, self.generate())
+        self.write("blog/b.md", "---\ndate: 2025-02-01\ntags: [cats]\n---\n# New B\n")
+        self.index.scan()
+        self.assertEqual(4, self.generate())
+
+    def test_files_are_counted(self):
+        stats = WriteStats()
+        self.generate(stats)
+        self.assertEqual(5, stats.written[0])
+        self.generate(stats)
+        self.assertEqual([5, stats.written[1]], stats.skipped)
+        self.assertIn(os.path.join(self.public_dir, "feed.xml"), stats.digests)
+
+    def test_corrupt_state_is_ignored(self):
+        self.generate()
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            file.write("{")
+        self.assertEqual(5, self.generate())
+
+    def test_changed_file_is_regenerated(self):
+        self.generate()
+        path = os.path.join(self.public_dir, "blog", "index.html")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("stale")
+        self.assertEqual(1, self.generate())
+        with open(path, encoding="utf-8") as file:
+            self.assertIn("<title>Blog</title>", file.read())
+
+    def test_feed(self):
+        feed = io.StringIO()
+        write_feed(feed, "Feed", "https://a.com", feed_listing(self.index).items)
+        xml = feed.getvalue()
+        self.assertIn("<updated>2025-02-01T00:00:00Z</updated>", xml)
+        self.assertIn('<link href="https://a.com/blog/b.html"/>', xml)
+
+    def test_feed_needs_site_url(self):
+        with self.assertRaises(ListingError):
+            generate_listings(
+                self.template_path, [feed_listing(self.index)], self.public_dir
+            )
+
+    def test_changed_site_url_regenerates_feed(self):
+        self.generate()
+        listings = [feed_listing(self.index)]
+        args = (self.template_path, listings, self.public_dir, self.state_path)
+        self.assertEqual(1, generate_listings(*args, "https://b.com"))
+        with open(os.path.join(self.public_dir, "feed.xml")) as file:
+            self.assertIn("https://b.com/blog/b.html", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
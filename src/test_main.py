@@ -0,0 +1,99 @@
+import logging
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from main import parse_args
+
+
+class TestParseArgs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp.name, "site.toml")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def config(self, text: str) -> None:
+        with open(self.config_path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_defaults(self):
+        args = parse_args(["--config", os.devnull])
+        self.assertEqual("content/", args.content)
+        self.assertEqual("public", args.output)
+        self.assertEqual(1, args.workers)
+        self.assertFalse(args.clean)
+        self.assertEqual(logging.INFO, args.log_level)
+
+    def test_config_sets_defaults(self):
+        self.config('output = "dist"\nworkers = 4\nclean = true\nshard = "2/3"\n')
+        args = parse_args(["--config", self.config_path])
+        self.assertEqual("dist", args.output)
+        self.assertEqual(4, args.workers)
+        self.assertTrue(args.clean)
+        self.assertEqual((2, 3), args.shard)
+
+    def test_command_line_overrides_config(self):
+        self.config('output = "dist"\nverbosity = "warning"\n')
+        args = parse_args(["--config", self.config_path, "--output", "www", "-v"])
+        self.assertEqual("www", args.output)
+        self.assertEqual(logging.DEBUG, args.log_level)
+
+    def test_unknown_config_key(self):
+        self.config("colour = true\n")
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--config", self.config_path])
+
+    def test_config_values_are_parsed(self):
+        self.config(
+            'workers = "4"\nstatic-mode = "hardlink"\nprecache-include = ["*.html"]\n'
+            "drafts = false\n"
+        )
+        args = parse_args(["--config", self.config_path])
+        self.assertEqual(4, args.workers)
+        self.assertEqual("hardlink", args.static_mode)
+        self.assertEqual(["*.html"], args.precache_include)
+        self.assertFalse(args.drafts)
+        self.config("workers = 0\n")
+        args = parse_args(["--config", self.config_path])
+        self.assertEqual(os.cpu_count() or 1, args.workers)
+
+    def test_invalid_config_values(self):
+        for text in [
+            'static-mode = "bogus"\n',
+            "workers = -1\n",
+            'workers = "many"\n',
+            "clean = 1\n",
+            "output = false\n",
+            'verbosity = "loud"\n',
+        ]:
+            self.config(text)
+            with self.subTest(text), redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(["--config", self.config_path])
+
+    def test_site_url(self):
+        args = parse_args(["--config", os.devnull, "--site-url", "https://a.com/"])
+        self.assertEqual("https://a.com", args.site_url)
+        for url in ["a.com", "https://", "ftp://a.com"]:
+            with self.subTest(url), redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(["--config", os.devnull, "--site-url", url])
+
+    def test_inline_thresholds(self):
+        self.assertEqual(14, parse_args(["--config", os.devnull]).inline_css_max_size)
+        self.config("inline-css-max-size = 0\ninline-image-max-size = 8\n")
+        args = parse_args(["--config", self.config_path])
+        self.assertEqual(0, args.inline_css_max_size)
+        self.assertEqual(8, args.inline_image_max_size)
+
+    def test_zero_workers_means_one_per_cpu(self):
+        args = parse_args(["--config", os.devnull, "--workers", "0"])
+        self.assertEqual(os.cpu_count() or 1, args.workers)
+
+
+if __name__ == "__main__":
+    unittest.main()
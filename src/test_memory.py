@@ -0,0 +1,73 @@
+import gc
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from bench_memory import write_corpus
+from build import build_site
+from logger import get_logger
+from memory import RENDER_GC_THRESHOLDS, memory_report, render_gc
+
+# Peak traced memory allowed for a small site, and for each page added:
+# what the indexes keep of a page, far below a rendered page of the corpus.
+BASE_BUDGET = 2 * 2**20
+PAGE_BUDGET = 4 * 2**10
+PARAGRAPHS = 20
+
+
+class TestRenderGc(unittest.TestCase):
+    def test_tunes_and_restores(self):
+        thresholds = gc.get_threshold()
+        with render_gc():
+            self.assertEqual(RENDER_GC_THRESHOLDS, gc.get_threshold())
+            self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertEqual(thresholds, gc.get_threshold())
+        self.assertEqual(0, gc.get_freeze_count())
+
+    def test_disabled(self):
+        thresholds = gc.get_threshold()
+        with render_gc(False):
+            self.assertEqual(thresholds, gc.get_threshold())
+            self.assertEqual(0, gc.get_freeze_count())
+
+    def test_memory_report(self):
+        self.assertTrue(memory_report().startswith("Peak memory: "))
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel("WARNING")
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.tmp.cleanup()
+
+    def peak(self, pages: int) -> int:
+        """Return the peak traced memory of a low_memory build of pages."""
+        root = os.path.join(self.tmp.name, str(pages))
+        template_path, content_dir, static_dir = write_corpus(root, pages, PARAGRAPHS)
+        tracemalloc.start()
+        try:
+            build_site(
+                template_path,
+                content_dir,
+                os.path.join(root, "public"),
+                static_dir,
+                low_memory=True,
+            )
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_pages_are_released(self):
+        small, large = self.peak(25), self.peak(100)
+        self.assertLess(small, BASE_BUDGET)
+        self.assertLess((large - small) / 75, PAGE_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
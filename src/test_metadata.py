@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from metadata import (
+    FrontMatterError,
+    MetadataIndex,
+    parse_value,
+    read_header,
+    split_front_matter,
+)
+
+PAGE = """---
+title: "A: title"
+date: 2025-01-02
+tags: [dogs, basenji]
+draft: false
+order: 2
+---
+
+# Ignored heading
+
+Body text.
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse_value(self):
+        self.assertEqual(3, parse_value(" 3 "))
+        self.assertEqual(True, parse_value("true"))
+        self.assertEqual("x y", parse_value("'x y'"))
+        self.assertEqual(["a", "b"], parse_value("[a, 'b']"))
+        self.assertEqual("2025-01-02", parse_value("2025-01-02"))
+
+    def test_split_front_matter(self):
+        metadata, body = split_front_matter(PAGE)
+        want = {
+            "title": "A: title",
+            "date": "2025-01-02",
+            "tags": ["dogs", "basenji"],
+            "draft": False,
+            "order": 2,
+        }
+        self.assertEqual(want, metadata)
+        self.assertTrue(body.startswith("# Ignored heading"))
+
+    def test_split_crlf_front_matter(self):
+        metadata, body = split_front_matter(PAGE.replace("\n", "\r\n"))
+        self.assertEqual(split_front_matter(PAGE), (metadata, body))
+
+    def test_without_front_matter(self):
+        self.assertEqual(({}, "# Title"), split_front_matter("# Title"))
+
+    def test_unclosed_front_matter(self):
+        with self.assertRaises(FrontMatterError):
+            split_front_matter("---\ntitle: x\n# Title")
+
+    def test_invalid_line(self):
+        with self.assertRaises(FrontMatterError):
+            split_front_matter("---\nnot a pair\n---\n")
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.write("index.md", "# Home\n")
+        self.write(os.path.join("blog", "a.md"), PAGE)
+        self.write(os.path.join("blog", "b.md"), "---\ndate: 2025-03-01\n---\n# B\n")
+        self.write(
+            os.path.join("blog", "c.md"), "---\ndraft: true\ntags: [dogs]\n---\n"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> None:
+        path = os.path.join(self.content_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+    def test_read_header_without_front_matter(self):
+        path = os.path.join(self.content_dir, "index.md")
+        self.assertEqual({"title": "Home"}, read_header(path))
+
+    def test_read_header_title_from_heading(self):
+        path = os.path.join(self.content_dir, "blog", "b.md")
+        self.assertEqual({"date": "2025-03-01", "title": "B"}, read_header(path))
+
+    def test_pages_order_tags_and_drafts(self):
+        index = MetadataIndex(self.content_dir)
+        index.scan()
+        paths = [path for path, _ in index.pages("blog")]
+        self.assertListEqual(["blog/a.md", "blog/b.md"], paths)
+        tagged = [path for path, _ in index.pages(tag="dogs", include_drafts=True)]
+        self.assertListEqual(["blog/a.md", "blog/c.md"], tagged)
+        self.assertTrue(index.is_draft("blog/c.md"))
+
+    def test_scan_is_incremental_and_persisted(self):
+        cache_path = os.path.join(self.tmp.name, "cache", "metadata.json")
+        index = MetadataIndex(self.content_dir, cache_path)
+        self.assertEqual(4, len(index.scan()))
+        index.save()
+        reloaded = MetadataIndex(self.content_dir, cache_path)
+        self.assertListEqual([], reloaded.scan())
+        os.remove(os.path.join(self.content_dir, "blog", "c.md"))
+        reloaded.scan()
+        self.assertNotIn("blog/c.md", reloaded.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
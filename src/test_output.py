@@ -0,0 +1,146 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from build import build_site
+from copytree import copytree
+from fsutil import WriteStats
+from output import MemoryOutput, OutputError, ZipOutput
+from page import generate_pages_recursive
+from preview import resolve_name
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestMemoryOutput(unittest.TestCase):
+    def test_write_and_read(self):
+        output = MemoryOutput("public")
+        stats = WriteStats()
+        self.assertTrue(output.write(os.path.join("public", "a.html"), b"a", stats))
+        self.assertFalse(output.write(os.path.join("public", "a.html"), b"a", stats))
+        self.assertEqual(b"a", output.read("a.html"))
+        self.assertTrue(output.exists(os.path.join("public", "a.html")))
+        self.assertEqual(([1, 1], [1, 1]), (stats.written, stats.skipped))
+
+    def test_open_writes_on_close(self):
+        output = MemoryOutput("public")
+        with output.open(os.path.join("public", "feed.xml")) as file:
+            file.write("<feed/>")
+        self.assertEqual(b"<feed/>", output.read("feed.xml"))
+
+    def test_rejects_paths_outside_root(self):
+        output = MemoryOutput("public")
+        with self.assertRaises(OutputError):
+            output.write(os.path.join("static", "a.css"), b"")
+
+
+class TestZipOutput(unittest.TestCase):
+    def zip_site(self) -> bytes:
+        buffer = io.BytesIO()
+        output = ZipOutput("public", buffer)
+        output.write(os.path.join("public", "index.html"), b"<h1>Home</h1>")
+        output.write(os.path.join("public", "css", "site.css"), b"h1{}")
+        output.close()
+        return buffer.getvalue()
+
+    def test_members(self):
+        with zipfile.ZipFile(io.BytesIO(self.zip_site())) as archive:
+            self.assertEqual(["index.html", "css/site.css"], archive.namelist())
+            self.assertEqual(b"<h1>Home</h1>", archive.read("index.html"))
+
+    def test_same_site_same_zip(self):
+        self.assertEqual(self.zip_site(), self.zip_site())
+
+    def test_changed_duplicate_member(self):
+        output = ZipOutput("public", io.BytesIO())
+        output.write(os.path.join("public", "a.html"), b"a")
+        self.assertFalse(output.write(os.path.join("public", "a.html"), b"a"))
+        with self.assertRaises(OutputError):
+            output.write(os.path.join("public", "a.html"), b"b")
+
+
+class TestBuildIntoMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+        return path
+
+    def test_pages_and_static_files(self):
+        template_path = self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post.md", "# Post")
+        self.write("static/css/site.css", "h1 {}")
+        output = MemoryOutput(self.public_dir)
+        copytree(os.path.join(self.tmp.name, "static"), self.public_dir, output=output)
+        generate_pages_recursive(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            self.public_dir,
+            output=output,
+        )
+        self.assertEqual(
+            ["blog/post.html", "css/site.css", "index.html"], sorted(output.files)
+        )
+        self.assertIn(b"<title>Home</title>", output.files["index.html"])
+        self.assertFalse(os.path.exists(self.public_dir))
+
+    def test_build_saves_no_incremental_state(self):
+        template_path = self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "---\ndate: 2025-01-01\n---\n# Home")
+        self.write("static/css/site.css", "h1 {}")
+        cache_dir = os.path.join(self.tmp.name, ".cache")
+        output = MemoryOutput(self.public_dir)
+        build_site(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            self.public_dir,
+            os.path.join(self.tmp.name, "static"),
+            cache_dir=cache_dir,
+            output=output,
+            site_url="https://example.com",
+        )
+        self.assertIn("feed.xml", output.files)
+        self.assertEqual([], os.listdir(cache_dir) if os.path.isdir(cache_dir) else [])
+
+    def test_feed_needs_site_url(self):
+        template_path = self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "---\ndate: 2025-01-01\n---\n# Home")
+        self.write("static/css/site.css", "h1 {}")
+        output = MemoryOutput(self.public_dir)
+        build_site(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            self.public_dir,
+            os.path.join(self.tmp.name, "static"),
+            output=output,
+        )
+        self.assertIn("archive/index.html", output.files)
+        self.assertNotIn("feed.xml", output.files)
+
+
+class TestResolveName(unittest.TestCase):
+    def test_static_server_paths(self):
+        output = MemoryOutput("public")
+        for name in ["index.html", "blog/index.html", "about.html"]:
+            output.write(os.path.join("public", name), b"")
+        self.assertEqual("index.html", resolve_name(output, "/"))
+        self.assertEqual("blog/index.html", resolve_name(output, "/blog/"))
+        self.assertEqual("blog/index.html", resolve_name(output, "/blog"))
+        self.assertEqual("about.html", resolve_name(output, "/about"))
+        self.assertIsNone(resolve_name(output, "/missing"))
+        self.assertIsNone(resolve_name(output, "/../etc/passwd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from buildcache import BuildCache
+from linkcheck import LinkChecker
+from output import MemoryOutput
+from page import generate_page
+from renderer import Renderer
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestGeneratePage(unittest.TestCase):
+    def test_title_is_escaped(self):
+        markdown = "---\ntitle: A </title><script>alert(1)</script>\n---\n# Home"
+        with tempfile.TemporaryDirectory() as tmp:
+            src_path = os.path.join(tmp, "index.md")
+            with open(src_path, "w", encoding="utf-8") as file:
+                file.write(markdown)
+            output = MemoryOutput(os.path.join(tmp, "public"))
+            generate_page(
+                "",
+                src_path,
+                os.path.join(tmp, "public", "index.html"),
+                template=TEMPLATE,
+                output=output,
+            )
+        page = (output.read("index.html") or b"").decode("utf-8")
+        self.assertNotIn("<script>", page)
+        self.assertEqual(Renderer(TEMPLATE).render(markdown), page)
+
+    def test_cached_page_links_are_checked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src_path = os.path.join(tmp, "index.md")
+            with open(src_path, "w", encoding="utf-8") as file:
+                file.write("# Home\n\n[Gone][gone]\n\n[gone]: /gone")
+            public_dir = os.path.join(tmp, "public")
+            cache = BuildCache(os.path.join(tmp, "cache"), tmp)
+            checkers = [LinkChecker(public_dir, ["/index.html"]) for _ in range(2)]
+            for checker in checkers:
+                generate_page(
+                    "",
+                    src_path,
+                    os.path.join(public_dir, "index.html"),
+                    checker=checker,
+                    template=TEMPLATE,
+                    cache=cache,
+                    output=MemoryOutput(public_dir),
+                )
+        self.assertEqual(1, cache.hits)
+        for checker in checkers:
+            self.assertListEqual(["/gone"], [f.target for f in checker.failures])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from copytree import SYMLINK
+from fsutil import WriteStats, write_bytes
+from hashing import hash_bytes
+from hints import LINK_HEADERS_PATH
+from logger import get_logger
+from precache import PRECACHE_MANIFEST_PATH, REVISION_LENGTH, PrecacheManifest
+
+
+class TestPrecacheManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        self.state_path = os.path.join(self.tmp.name, ".cache", "precache.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.public_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_globs_and_size_cap(self):
+        for name in ["index.html", "docs/a.html", "images/big.png", "notes.txt"]:
+            self.write(name, b"x" * (4096 if name.endswith(".png") else 1))
+        self.write(LINK_HEADERS_PATH, b"{}")
+        precache = PrecacheManifest(
+            ["*.html", "images/*"], ["docs/*"], max_file_size=1024
+        )
+        precache.update(self.public_dir, {})
+        self.assertEqual(["index.html"], list(precache.files))
+        self.assertEqual(1, precache.too_large)
+
+    def test_follows_symlinks(self):
+        self.write("index.html", b"<h1>Home</h1>")
+        assets = os.path.join(self.tmp.name, "assets")
+        os.makedirs(assets)
+        with open(os.path.join(assets, "app.js"), "wb") as file:
+            file.write(b"run()")
+        os.symlink(assets, os.path.join(self.public_dir, "assets"))
+        os.symlink(self.public_dir, os.path.join(assets, "loop"))
+        os.symlink(
+            os.path.join(assets, "app.js"), os.path.join(self.public_dir, "main.js")
+        )
+        precache = PrecacheManifest()
+        precache.update(self.public_dir, {})
+        self.assertEqual(
+            ["assets/app.js", "index.html", "main.js"], sorted(precache.files)
+        )
+        self.assertEqual(hash_bytes(b"run()"), precache.files["main.js"][2])
+
+    def test_revisions_from_digests_then_state(self):
+        stats = WriteStats()
+        page_path = os.path.join(self.public_dir, "index.html")
+        os.makedirs(self.public_dir)
+        write_bytes(page_path, b"<h1>Home</h1>", stats)
+        self.write("site.css", b"h1 {}")
+        precache = PrecacheManifest(state_path=self.state_path)
+        precache.update(self.public_dir, stats.digests)
+        precache.write(self.public_dir)
+        self.assertEqual(1, precache.hashed)
+        with open(os.path.join(self.public_dir, PRECACHE_MANIFEST_PATH)) as file:
+            self.assertEqual(
+                [
+                    {
+                        "url": "/index.html",
+                        "revision": hash_bytes(b"<h1>Home</h1>")[:REVISION_LENGTH],
+                    },
+                    {
+                        "url": "/site.css",
+                        "revision": hash_bytes(b"h1 {}")[:REVISION_LENGTH],
+                    },
+                ],
+                json.load(file),
+            )
+        precache = PrecacheManifest(state_path=self.state_path)
+        precache.update(self.public_dir, {})
+        self.assertEqual(0, precache.hashed)
+        self.write("site.css", b"h1 { color: red }")
+        precache.update(self.public_dir, {})
+        self.assertEqual(1, precache.hashed)
+
+
+class TestBuildPrecache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel("WARNING")
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+        return path
+
+    def test_full_build(self):
+        template_path = self.write("template.html", "<title>{{ Title }}</title>")
+        self.write("content/index.md", "# Home")
+        self.write("static/site.css", "h1 {}")
+        public_dir = os.path.join(self.tmp.name, "public")
+        build_site(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            public_dir,
+            os.path.join(self.tmp.name, "static"),
+            precache=PrecacheManifest(exclude=["*.xml"]),
+        )
+        with open(os.path.join(public_dir, PRECACHE_MANIFEST_PATH)) as file:
+            urls = [entry["url"] for entry in json.load(file)]
+        self.assertEqual(["/index.html", "/site.css"], urls)
+
+    def test_symlink_build(self):
+        template_path = self.write("template.html", "<title>{{ Title }}</title>")
+        self.write("content/index.md", "# Home")
+        self.write("static/js/app.js", "run()")
+        public_dir = os.path.join(self.tmp.name, "public")
+        build_site(
+            template_path,
+            os.path.join(self.tmp.name, "content"),
+            public_dir,
+            os.path.join(self.tmp.name, "static"),
+            static_mode=SYMLINK,
+            precache=PrecacheManifest(exclude=["*.xml"]),
+        )
+        self.assertTrue(os.path.islink(os.path.join(public_dir, "js", "app.js")))
+        with open(os.path.join(public_dir, PRECACHE_MANIFEST_PATH)) as file:
+            entries = json.load(file)
+        self.assertEqual(
+            [
+                {"url": "/index.html", "revision": entries[0]["revision"]},
+                {
+                    "url": "/js/app.js",
+                    "revision": hash_bytes(b"run()")[:REVISION_LENGTH],
+                },
+            ],
+            entries,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
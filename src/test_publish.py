@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from fsutil import open_atomic
+from publish import (
+    PublishError,
+    list_generations,
+    prepare_staging,
+    publish,
+    remove_stale_files,
+    rollback,
+)
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, files: dict[str, str], keep: int = 2) -> str:
+        staging = prepare_staging(self.public_dir)
+        for name, data in files.items():
+            with open_atomic(os.path.join(staging, name)) as file:
+                file.write(data)
+        remove_stale_files(staging, {os.path.join(staging, name) for name in files})
+        return publish(staging, self.public_dir, keep)
+
+    def read(self, name: str) -> str:
+        with open(os.path.join(self.public_dir, name), encoding="utf-8") as file:
+            return file.read()
+
+    def test_publish_swaps_symlink(self):
+        self.build({"index.html": "v1"})
+        self.assertTrue(os.path.islink(self.public_dir))
+        self.assertEqual("v1", self.read("index.html"))
+        self.build({"index.html": "v2"})
+        self.assertEqual("v2", self.read("index.html"))
+
+    def test_unchanged_files_are_hardlinked_and_old_generation_is_intact(self):
+        first = self.build({"a.html": "a", "b.html": "b1"})
+        staging = prepare_staging(self.public_dir)
+        self.assertEqual(
+            os.stat(os.path.join(first, "a.html")).st_ino,
+            os.stat(os.path.join(staging, "a.html")).st_ino,
+        )
+        with open_atomic(os.path.join(staging, "b.html")) as file:
+            file.write("b2")
+        with open(os.path.join(first, "b.html"), encoding="utf-8") as file:
+            self.assertEqual("b1", file.read())
+
+    def test_stale_files_are_removed(self):
+        self.build({"a.html": "a", "b.html": "b"})
+        self.build({"a.html": "a"})
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "b.html")))
+
+    def test_prune_and_rollback(self):
+        for version in range(4):
+            self.build({"index.html": f"v{version}"}, keep=2)
+        self.assertListEqual(
+            ["000002", "000003", "000004"], list_generations(self.public_dir)
+        )
+        rollback(self.public_dir)
+        self.assertEqual("v2", self.read("index.html"))
+        rollback(self.public_dir)
+        with self.assertRaises(PublishError):
+            rollback(self.public_dir)
+
+    def test_adopt_plain_directory(self):
+        os.makedirs(self.public_dir)
+        with open(os.path.join(self.public_dir, "old.html"), "w") as file:
+            file.write("old")
+        self.build({"index.html": "new"})
+        rollback(self.public_dir)
+        self.assertEqual("old", self.read("old.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import io
+import threading
+import unittest
+
+from renderer import Renderer, render
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestRenderer(unittest.TestCase):
+    def test_render_fragment(self):
+        self.assertEqual(
+            "<div><p>some <b>bold</b> text</p></div>", render("some **bold** text")
+        )
+
+    def test_render_into_template(self):
+        renderer = Renderer(TEMPLATE)
+        self.assertEqual(
+            "<title>Hello</title><main><div><h1>Hello</h1><p>text</p></div></main>",
+            renderer.render("# Hello\n\ntext"),
+        )
+
+    def test_front_matter_title_is_escaped(self):
+        renderer = Renderer(TEMPLATE)
+        html = renderer.render('---\ntitle: "A <b>"\n---\ntext')
+        self.assertTrue(html.startswith("<title>A &lt;b&gt;</title>"))
+
+    def test_crlf_front_matter(self):
+        renderer = Renderer(TEMPLATE)
+        text = "---\ntitle: Hello\n---\n# Body\n\ntext\n"
+        html = renderer.render(text.replace("\n", "\r\n"))
+        self.assertTrue(html.startswith("<title>Hello</title>"))
+        self.assertEqual(renderer.render(text), html)
+
+    def test_render_to_stream(self):
+        renderer = Renderer(TEMPLATE)
+        stream = io.StringIO()
+        renderer.render_to("# Hello\n\ntext", stream)
+        self.assertEqual(renderer.render("# Hello\n\ntext"), stream.getvalue())
+
+    def test_cache_is_bounded(self):
+        renderer = Renderer(cache_size=2)
+        for text in ["a", "b", "c", "a"]:
+            renderer.render_html(text)
+        self.assertEqual(2, len(renderer.cache))
+
+    def test_shared_across_threads(self):
+        renderer = Renderer(TEMPLATE, cache_size=4)
+        documents = [f"# Page {i}\n\n*item* {i}" for i in range(20)]
+        want = [Renderer(TEMPLATE, cache_size=0).render(d) for d in documents]
+        failures = []
+
+        def work():
+            for _ in range(5):
+                if [renderer.render(d) for d in documents] != want:
+                    failures.append(True)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], failures)
+
+
+if __name__ == "__main__":
+    unittest.main()
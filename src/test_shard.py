@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from hints import LINK_HEADERS_PATH
+from shard import (
+    ShardError,
+    merge_shards,
+    parse_shard,
+    select_shard,
+    shard_of,
+    write_shard_manifest,
+)
+
+
+class TestParseShard(unittest.TestCase):
+    def test_valid_spec(self):
+        self.assertEqual((2, 4), parse_shard("2/4"))
+
+    def test_invalid_specs(self):
+        for spec in ["", "1", "a/b", "0/4", "5/4", "1/0"]:
+            with self.assertRaises(ShardError):
+                parse_shard(spec)
+
+
+class TestSelectShard(unittest.TestCase):
+    def test_partition_is_stable_and_complete(self):
+        plan = [(f"content/page{i}.md", f"public/page{i}.html") for i in range(50)]
+        shards = [select_shard(plan, "content", (i, 3)) for i in range(1, 4)]
+        self.assertEqual(sorted(plan), sorted(sum(shards, [])))
+        self.assertEqual(shard_of("page7.md", 3), shard_of("page7.md", 3))
+        self.assertTrue(all(shards))
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.tmp, "content")
+        for name in ["a.md", "b.md"]:
+            self.write(os.path.join(self.content_dir, name), "# Title")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path: str, data: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+    def make_shard(self, index: int, pages: list[str]) -> str:
+        shard_dir = os.path.join(self.tmp, f"shard{index}")
+        self.write(os.path.join(shard_dir, "index.css"), "body {}")
+        for page in pages:
+            html_path = os.path.join(shard_dir, page.replace(".md", ".html"))
+            self.write(html_path, page)
+        headers = {
+            page.replace(".md", ".html"): ["</x.png>; rel=preload"] for page in pages
+        }
+        self.write(os.path.join(shard_dir, LINK_HEADERS_PATH), json.dumps(headers))
+        write_shard_manifest(shard_dir, (index, 2), pages)
+        return shard_dir
+
+    def test_merge_complete_shards(self):
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, ["b.md"])]
+        public_dir = os.path.join(self.tmp, "public")
+        merge_shards(shard_dirs, public_dir, self.content_dir)
+        self.assertListEqual(
+            ["_link-headers.json", "a.html", "b.html", "index.css"],
+            sorted(os.listdir(public_dir)),
+        )
+
+    def test_link_headers_are_merged(self):
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, ["b.md"])]
+        public_dir = os.path.join(self.tmp, "public")
+        merge_shards(shard_dirs, public_dir, self.content_dir)
+        with open(
+            os.path.join(public_dir, LINK_HEADERS_PATH), encoding="utf-8"
+        ) as file:
+            self.assertListEqual(["a.html", "b.html"], sorted(json.load(file)))
+
+    def test_missing_page(self):
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, [])]
+        with self.assertRaises(ShardError):
+            merge_shards(shard_dirs, os.path.join(self.tmp, "public"), self.content_dir)
+
+    def test_drafts_are_not_expected(self):
+        self.write(
+            os.path.join(self.content_dir, "draft.md"), "---\ndraft: true\n---\n"
+        )
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, ["b.md"])]
+        public_dir = os.path.join(self.tmp, "public")
+        merge_shards(shard_dirs, public_dir, self.content_dir)
+        self.assertFalse(os.path.exists(os.path.join(public_dir, "draft.html")))
+        with self.assertRaises(ShardError):
+            merge_shards(shard_dirs, public_dir, self.content_dir, include_drafts=True)
+
+    def test_failed_merge_keeps_public_dir(self):
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, ["b.md"])]
+        public_dir = os.path.join(self.tmp, "public")
+        merge_shards(shard_dirs, public_dir, self.content_dir)
+        self.write(os.path.join(shard_dirs[1], "b.html"), "changed")
+        with self.assertRaises(ShardError):
+            merge_shards(shard_dirs, public_dir, self.content_dir)
+        self.assertListEqual(
+            ["_link-headers.json", "a.html", "b.html", "index.css"],
+            sorted(os.listdir(public_dir)),
+        )
+
+    def test_missing_shard(self):
+        shard_dirs = [self.make_shard(1, ["a.md", "b.md"])]
+        with self.assertRaises(ShardError):
+            merge_shards(shard_dirs, os.path.join(self.tmp, "public"), self.content_dir)
+
+    def test_tampered_file(self):
+        shard_dirs = [self.make_shard(1, ["a.md"]), self.make_shard(2, ["b.md"])]
+        self.write(os.path.join(shard_dirs[1], "b.html"), "changed")
+        with self.assertRaises(ShardError):
+            merge_shards(shard_dirs, os.path.join(self.tmp, "public"), self.content_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from stylesheets import StylesheetBundler, StylesheetError, minify_css, rebase_urls
+
+TEMPLATE = '<head><link href="/css/site.css" rel="stylesheet"></head>'
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_strips_comments_and_whitespace(self):
+        css = "/* top */\nh1 ,\nh2 {\n  color: red ;\n  margin: 0 auto;\n}\n"
+        self.assertEqual("h1,h2{color:red;margin:0 auto}", minify_css(css))
+
+    def test_keeps_strings_and_descendant_pseudo_classes(self):
+        css = 'a :hover { content: "a  /* b */ ;}" }'
+        self.assertEqual('a :hover{content:"a  /* b */ ;}"}', minify_css(css))
+
+    def test_keeps_spaces_in_values(self):
+        css = ".g { width: calc(100% - 2px); grid-area: 1 / 2; }"
+        self.assertEqual(".g{width:calc(100% - 2px);grid-area:1 / 2}", minify_css(css))
+
+
+class TestRebaseUrls(unittest.TestCase):
+    def test_rebase_relative_urls(self):
+        css = 'a { background: url("img/a.png") } b { background: url(/b.png) }'
+        self.assertEqual(
+            'a { background: url("parts/img/a.png") } b { background: url(/b.png) }',
+            rebase_urls(css, "/css/parts/x.css", "/css/site.css"),
+        )
+
+
+class TestStylesheetBundler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, "stylesheets.json")
+        self.write("css/site.css", '@import "parts/base.css";\nh1 { color: red; }\n')
+        self.write("css/parts/base.css", "body { margin: 0; }\n")
+        self.write("css/print.css", "nav { display: none; }\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: str) -> None:
+        path = os.path.join(self.static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+    def test_bundle_resolves_imports(self):
+        bundler = StylesheetBundler(self.static_dir)
+        url = bundler.bundle("/css/site.css")
+        self.assertRegex(url, r"^/css/site\.[0-9a-f]{10}\.css$")
+        self.assertEqual("body{margin:0}h1{color:red}", bundler.bundles[url])
+
+    def test_import_with_media_query(self):
+        self.write("css/site.css", "@import url('print.css') print;\n")
+        bundler = StylesheetBundler(self.static_dir)
+        url = bundler.bundle("/css/site.css")
+        self.assertEqual("@media print{nav{display:none}}", bundler.bundles[url])
+
+    def test_rewrite_template_and_write(self):
+        bundler = StylesheetBundler(self.static_dir)
+        template = bundler.rewrite_template(TEMPLATE)
+        url = bundler.bundle("/css/site.css")
+        self.assertEqual(TEMPLATE.replace("/css/site.css", url), template)
+        public_dir = os.path.join(self.tmp.name, "public")
+        paths = bundler.write(public_dir)
+        with open(paths[url], encoding="utf-8") as file:
+            self.assertEqual("body{margin:0}h1{color:red}", file.read())
+
+    def test_write_refuses_links_out_of_output(self):
+        bundler = StylesheetBundler(self.static_dir)
+        bundler.bundle("/css/site.css")
+        public_dir = os.path.join(self.tmp.name, "public")
+        os.makedirs(public_dir)
+        os.symlink(
+            os.path.join(self.static_dir, "css"), os.path.join(public_dir, "css")
+        )
+        with self.assertRaises(StylesheetError):
+            bundler.write(public_dir)
+        self.assertEqual(
+            ["parts", "print.css", "site.css"],
+            sorted(os.listdir(os.path.join(self.static_dir, "css"))),
+        )
+
+    def test_circular_import_keeps_link(self):
+        self.write("css/parts/base.css", '@import "../site.css";\n')
+        bundler = StylesheetBundler(self.static_dir)
+        self.assertEqual(TEMPLATE, bundler.rewrite_template(TEMPLATE))
+
+    def test_cache_by_input_hashes(self):
+        bundler = StylesheetBundler(self.static_dir, self.cache_path)
+        first = bundler.bundle("/css/site.css")
+        bundler.save()
+
+        cached = StylesheetBundler(self.static_dir, self.cache_path)
+        self.assertEqual(first, cached.bundle("/css/site.css"))
+        self.assertEqual(0, cached.rebuilt)
+
+        self.write("css/parts/base.css", "body { margin: 1px; }\n")
+        changed = StylesheetBundler(self.static_dir, self.cache_path)
+        self.assertNotEqual(first, changed.bundle("/css/site.css"))
+        self.assertEqual(1, changed.rebuilt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -82,6 +82,18 @@ class TestTextNode(unittest.TestCase):
         got = repr(text_node)
         self.assertEqual(want, got)
 
+    def test_span_materializes_text(self):
+        text_node = TextNode("a **bold** text", TextType.BOLD, start=4, end=8)
+        self.assertEqual(text_node.text, "bold")
+        self.assertEqual(text_node, TextNode("bold", TextType.BOLD))
+
+    def test_text_setter_replaces_span(self):
+        text_node = TextNode("a **bold** text", TextType.BOLD, start=4, end=8)
+        text_node.text = "new"
+        self.assertEqual(
+            (text_node.source, text_node.start, text_node.end), ("new", 0, 3)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -14,19 +14,39 @@ class TextType(Enum):
 
 
 class TextNode:
-    """Container for text with style and optional URL."""
+    """Container for text with style and optional URL.
+
+    The text may be a (start, end) span of a larger source string, so that
+    splitting inline markdown doesn't copy it; it is sliced when read.
+    """
 
     def __init__(
         self,
         text: str,
         text_type: TextType,
         url: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None,
     ) -> None:
-        """Init a TextNode with content, style, and optional URL."""
-        self.text = text
+        """Init a TextNode with content, style, optional URL and span."""
+        self.source = text
+        self.start = start
+        self.end = end if end is not None else len(text)
         self.text_type = text_type
         self.url = url if url is not None else ""
 
+    @property
+    def text(self) -> str:
+        """Return the text of the node, slicing its source only if needed."""
+        if self.start == 0 and self.end == len(self.source):
+            return self.source
+        return self.source[self.start : self.end]
+
+    @text.setter
+    def text(self, text: str) -> None:
+        """Replace the text of the node with a standalone string."""
+        self.source, self.start, self.end = text, 0, len(text)
+
     def __eq__(self, other: object) -> bool:
         """Check TextNode equality by comparing text, type, and URL."""
         if not isinstance(other, TextNode):